@@ -0,0 +1,6 @@
+"""
+Benchmarks for Colour Match.
+
+Run each benchmark from the top folder of the game, for example:
+	python -m benchmarks.startup
+"""
\ No newline at end of file
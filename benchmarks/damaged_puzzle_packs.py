@@ -0,0 +1,143 @@
+"""
+Check that damaged puzzle packs are rejected before a puzzle is played.
+
+Writes a pack of easy puzzles, then opens copies of it that are cut short,
+have the wrong magic, version or difficulty, have puzzles taller than the
+board, or have block codes the puzzles' difficulty doesn't use, and starts
+a game from each. Exits with status 1 if a damaged pack's game starts,
+fails with an error other than ValueError or places any of its blocks, or
+the undamaged pack's game doesn't start.
+"""
+import os
+import sys
+import tempfile
+
+import benchmarks.helpers
+from colour_match import ColourMatch
+from puzzle_pack import PuzzlePack, write_pack
+from settings import Settings
+
+# Between the codes of the colours used on easy and the special blocks.
+UNKNOWN_CODE = 0x20
+
+
+def easy_puzzles(settings, number_of_puzzles):
+	"""Make puzzles of three rows using the three colours of easy."""
+	for number in range(number_of_puzzles):
+		yield [[(x + y + number) % 3 + 1
+				for x in range(settings.blocks_per_row)] for y in range(3)]
+
+
+def damaged_packs(data, settings, number_of_puzzles):
+	"""
+	Return (description, data, puzzle number) for damaged copies of a pack,
+	with the number of a puzzle that is damaged.
+	"""
+	header_size = PuzzlePack.header_format.size
+	index_entry_size = PuzzlePack.index_entry_format.size
+	last = number_of_puzzles - 1
+	packs = []
+
+	for length in (0, header_size - 1, header_size + index_entry_size - 1,
+				   len(data) - 1):
+		packs.append((f"cut short to {length} bytes", data[:length], last))
+
+	def changed(offset, value):
+		damaged = bytearray(data)
+		damaged[offset] = value
+		return bytes(damaged)
+
+	packs.append(("wrong magic", changed(0, 0), 0))
+	packs.append(("unknown version", changed(4, PuzzlePack.version + 1), 0))
+	packs.append(("unknown difficulty", changed(5, 7), 0))
+	# Number of rows comes after the offset in the first index entry.
+	packs.append(("puzzle taller than the board",
+				  changed(header_size + 8, settings.blocks_per_column + 1),
+				  0))
+	# Last block of the pack is in the last puzzle.
+	packs.append(("block of a colour easy doesn't use",
+				  changed(len(data) - 1, 4), last))
+	packs.append(("unknown block code", changed(len(data) - 1, UNKNOWN_CODE),
+				  last))
+	return packs
+
+
+def play_pack(filename, puzzle_number):
+	"""
+	Start a game of a puzzle from a pack, chosen on hard, and return the
+	game and an error if it couldn't be set up. Raises ValueError if the
+	pack can't be opened.
+	"""
+	settings = Settings()
+	settings.puzzle_pack_filename = filename
+	settings.puzzle_number = puzzle_number
+	settings.autosave = False
+	settings.submission_filename = None
+	cm = ColourMatch(settings)
+	settings.game_active = True
+	settings.difficulty = "hard"
+	settings.difficulty_selected = True
+	try:
+		# First update runs the game's setup.
+		cm._update_game()
+	except ValueError as error:
+		return cm, error
+	return cm, None
+
+
+def main():
+	settings = Settings()
+	# Enough puzzles that the first can claim more rows than the board
+	#	without going past the end of the pack.
+	number_of_puzzles = 6
+	failures = 0
+
+	with tempfile.TemporaryDirectory() as folder:
+		filename = os.path.join(folder, "pack.bin")
+		write_pack(filename, settings.blocks_per_row,
+				   settings.blocks_per_column, "easy",
+				   easy_puzzles(settings, number_of_puzzles),
+				   number_of_puzzles)
+		with open(filename, 'rb') as file_object:
+			data = file_object.read()
+
+		packs = damaged_packs(data, settings, number_of_puzzles)
+		for description, damaged, puzzle_number in packs:
+			with open(filename, 'wb') as file_object:
+				file_object.write(damaged)
+			try:
+				cm, error = play_pack(filename, puzzle_number)
+			except ValueError:
+				# Pack couldn't be opened.
+				continue
+			except Exception as error:
+				problem = f"raised {error!r}"
+			else:
+				cm.puzzle_pack.close()
+				if not error:
+					problem = "was played"
+				elif any(cm.grid.values()):
+					problem = "placed some of its blocks"
+				else:
+					continue
+			print(f"  FAILED: pack with {description} {problem}")
+			failures += 1
+
+		with open(filename, 'wb') as file_object:
+			file_object.write(data)
+		for puzzle_number in range(number_of_puzzles):
+			cm, error = play_pack(filename, puzzle_number)
+			cm.puzzle_pack.close()
+			if (error or not cm.setup_completed
+				or cm.settings.difficulty != "easy"):
+				print(f"  FAILED: undamaged puzzle {puzzle_number} wasn't "
+					  f"played at easy")
+				failures += 1
+
+	print(f"Damaged puzzle packs checked: {len(packs)}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Check that damaged saved games are rejected without changing the game.
+
+Saves part of a game, then restores copies of the save that are cut short,
+have the wrong magic or version, or have block codes that aren't blocks.
+Exits with status 1 if any of them is restored, fails with an error other
+than the ones the game handles when resuming, or changes the game.
+"""
+import random
+import struct
+import sys
+
+import pygame
+
+from benchmarks.helpers import start_game
+from save_file import SaveFile
+
+# Between the standard block codes and the special block codes.
+UNKNOWN_CODE = 0x20
+
+
+def damaged_saves(save_file, data):
+	"""Return (description, data) for damaged copies of a save."""
+	settings = save_file.settings
+	grid_offset = save_file.header_format.size + save_file.state_format.size
+	buffer_offset = (grid_offset
+					 + settings.blocks_per_row * settings.blocks_per_column)
+	current_offset = (buffer_offset
+					  + settings.buffer_size * save_file.buffer_block_format.size)
+	saves = []
+
+	for length in (0, save_file.header_format.size - 1, grid_offset + 10,
+				   buffer_offset + 1, current_offset + 1, len(data) - 1):
+		saves.append((f"cut short to {length} bytes", data[:length]))
+
+	def changed(offset, value):
+		damaged = bytearray(data)
+		damaged[offset] = value
+		return bytes(damaged)
+
+	saves.append(("wrong magic", changed(0, 0)))
+	saves.append(("unknown version", changed(4, SaveFile.version + 1)))
+	saves.append(("unknown grid block code",
+				  changed(buffer_offset - 1, UNKNOWN_CODE)))
+	saves.append(("empty buffer block", changed(buffer_offset, 0)))
+	saves.append(("unknown buffer block code",
+				  changed(buffer_offset, UNKNOWN_CODE)))
+	saves.append(("empty current block", changed(current_offset, 0)))
+	saves.append(("unknown current block code",
+				  changed(current_offset, UNKNOWN_CODE)))
+	return saves
+
+
+def game_unchanged(save_file, data):
+	"""Return True if the game is still the one saved as data."""
+	try:
+		return save_file.to_bytes() == data
+	except Exception:
+		# Half restored games can't always be saved.
+		return False
+
+
+def main():
+	random.seed(1)
+	cm = start_game()
+	cm.rng.seed(1)
+
+	# Play part of a game so there is a pile to save.
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+	for tick in range(3000):
+		if tick % 10 == 0:
+			event = pygame.event.Event(pygame.KEYDOWN,
+									   key = random.choice(keys))
+			cm._check_keydown_events(event)
+		cm._update_game()
+
+	save_file = SaveFile(cm, "unused_saved_game.bin")
+	data = save_file.to_bytes()
+
+	failures = 0
+	for description, damaged in damaged_saves(save_file, data):
+		try:
+			save_file.restore(damaged)
+		except (ValueError, struct.error):
+			if game_unchanged(save_file, data):
+				continue
+			problem = "changed the game"
+		except Exception as error:
+			problem = f"raised {error!r}"
+		else:
+			problem = "was restored"
+		print(f"  FAILED: save with {description} {problem}")
+		failures += 1
+		# Put the game back for the next check.
+		save_file.restore(data)
+
+	save_file.restore(data)
+	if not game_unchanged(save_file, data):
+		print("  FAILED: undamaged save didn't restore the same game")
+		failures += 1
+
+	print(f"Damaged saved games checked: "
+		  f"{len(damaged_saves(save_file, data))}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
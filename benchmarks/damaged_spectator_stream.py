@@ -0,0 +1,189 @@
+"""
+Check that a spectator rejects a damaged stream without crashing.
+
+Streams part of a game to a spectator socket and keeps the bytes sent, then
+serves copies of them that are cut short, have the wrong magic, version or
+message kind, start with a delta, or have block codes or grid positions
+that don't exist, to a SpectatorClient each. Exits with status 1 if a
+damaged stream is followed to its end, the client fails with an error
+other than ValueError or struct.error, or the undamaged stream doesn't
+leave the client with the game's board.
+"""
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+import pygame
+
+from benchmarks.helpers import start_game
+from block_codes import get_block_code
+from settings import Settings
+from spectator import (DELTA, stream_header_format,
+					   message_header_format, tick_format, count_format)
+from spectator_client import SpectatorClient
+
+# Between the standard block codes and the special block codes.
+UNKNOWN_CODE = 0x20
+
+
+def record_stream(ticks):
+	"""
+	Play a game streamed to a spectator socket. Returns the bytes sent to
+	the spectator and the codes of the game's board at the end.
+	"""
+	random.seed(1)
+	settings = Settings()
+	settings.spectator_address = ('127.0.0.1', 0)
+	cm = start_game(settings)
+	spectator = socket.create_connection(cm.spectator_server.address)
+
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+	for tick in range(ticks):
+		if tick % 10 == 0:
+			event = pygame.event.Event(pygame.KEYDOWN,
+									   key = random.choice(keys))
+			cm._check_keydown_events(event)
+		cm._update_game()
+		# Give the server time to accept the spectator before it misses
+		#	the first keyframe it asked for.
+		if tick == 0:
+			time.sleep(0.1)
+
+	# Everything is sent once nothing has arrived for a while.
+	stream = bytearray()
+	spectator.settimeout(0.5)
+	try:
+		while True:
+			data = spectator.recv(65536)
+			if not data:
+				break
+			stream += data
+	except socket.timeout:
+		pass
+	spectator.close()
+	cm.spectator_server.stop()
+
+	board = bytes(get_block_code(settings, cm.grid[(x, y)])
+				  for y in range(settings.blocks_per_column)
+				  for x in range(settings.blocks_per_row))
+	return bytes(stream), board
+
+
+def find_messages(stream):
+	"""Return (offset, kind) for each message in a stream."""
+	messages = []
+	offset = stream_header_format.size
+	while offset < len(stream):
+		length, kind = message_header_format.unpack_from(stream, offset)
+		messages.append((offset, kind))
+		offset += message_header_format.size + length
+	return messages
+
+
+def damaged_streams(stream):
+	"""Return (description, data) for damaged copies of a stream."""
+	buffer_size = Settings().buffer_size
+	messages = find_messages(stream)
+	keyframe = messages[0][0] + message_header_format.size
+	# Current block code comes after the tick and the score.
+	current_block = keyframe + 8
+	# Last byte of a keyframe is a grid block code.
+	grid_code = messages[1][0] - 1
+
+	def count_offset(offset):
+		"""Return where the count of a delta at an offset is."""
+		return (offset + message_header_format.size + tick_format.size
+				+ buffer_size)
+
+	# First change of the first delta that changes the board.
+	delta = next(offset for offset, kind in messages if kind == DELTA
+				 and count_format.unpack_from(stream, count_offset(offset))[0])
+	change = count_offset(delta) + count_format.size
+	streams = []
+
+	for length in (2, stream_header_format.size + 2, keyframe + 10,
+				   len(stream) - 1):
+		streams.append((f"cut short to {length} bytes", stream[:length]))
+
+	def changed(offset, value):
+		damaged = bytearray(stream)
+		damaged[offset] = value
+		return bytes(damaged)
+
+	streams.append(("wrong magic", changed(0, 0)))
+	streams.append(("unknown version", changed(4, 2)))
+	streams.append(("unknown message kind", changed(keyframe - 1, 9)))
+	streams.append(("delta before the first keyframe",
+					stream[:stream_header_format.size]
+					+ stream[messages[1][0]:]))
+	streams.append(("unknown current block code",
+					changed(current_block, UNKNOWN_CODE)))
+	streams.append(("unknown grid block code",
+					changed(grid_code, UNKNOWN_CODE)))
+	streams.append(("delta off the board", changed(change, 200)))
+	streams.append(("unknown code in a delta",
+					changed(change + 4, UNKNOWN_CODE)))
+	return streams
+
+
+def send_stream(server_socket, stream):
+	"""Send a stream to the spectator that connects, then disconnect."""
+	connection, address = server_socket.accept()
+	try:
+		connection.sendall(stream)
+	except OSError:
+		# Spectator stopped following the stream.
+		pass
+	connection.close()
+
+
+def follow_stream(stream):
+	"""Serve a stream to a spectator client and return the client."""
+	server_socket = socket.create_server(('127.0.0.1', 0))
+	# Stream is sent on its own thread as it is more than the socket holds.
+	sender = threading.Thread(target = send_stream,
+							  args = (server_socket, stream))
+	sender.start()
+	client = SpectatorClient(server_socket.getsockname())
+	try:
+		while client.receive():
+			pass
+	finally:
+		client.close()
+		sender.join()
+		server_socket.close()
+	return client
+
+
+def main():
+	stream, board = record_stream(ticks = 3000)
+	failures = 0
+
+	streams = damaged_streams(stream)
+	for description, damaged in streams:
+		try:
+			follow_stream(damaged)
+		except (ValueError, struct.error):
+			continue
+		except Exception as error:
+			problem = f"raised {error!r}"
+		else:
+			problem = "was followed"
+		print(f"  FAILED: stream with {description} {problem}")
+		failures += 1
+
+	client = follow_stream(stream)
+	if bytes(client.grid) != board:
+		print("  FAILED: undamaged stream didn't give the game's board")
+		failures += 1
+
+	print(f"Damaged spectator streams checked: {len(streams)}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
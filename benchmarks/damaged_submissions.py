@@ -0,0 +1,89 @@
+"""
+Check that damaged score submissions are rejected without crashing.
+
+Plays a few games to make score submissions, then verifies copies of them
+that are cut short, have the wrong magic, version or difficulty, or press
+keys that don't exist, and reads a submissions file that is cut short.
+Exits with status 1 if any damaged submission is accepted or crashes the
+verifier, or the genuine submissions aren't accepted after them.
+"""
+import sys
+
+import benchmarks.helpers
+from benchmarks.verify_scores import change_header, make_submissions
+from score_submission import ScoreSubmission, split_submissions
+from verify_scores import ScoreVerifier
+
+
+def damaged_submissions(data):
+	"""Return (description, data) for damaged copies of a submission."""
+	header_size = ScoreSubmission.header_format.size
+	key_event_size = ScoreSubmission.key_event_format.size
+	submissions = []
+
+	for length in (0, header_size - 1, header_size + 1,
+				   len(data) - key_event_size):
+		submissions.append((f"cut short to {length} bytes", data[:length]))
+
+	submissions.append(("wrong magic", change_header(data, 0, b'XXXX')))
+	submissions.append(("unknown version",
+						change_header(data, 1, ScoreSubmission.version + 1)))
+	submissions.append(("unknown difficulty", change_header(data, 2, 7)))
+
+	# Key index is the last byte of each key event.
+	damaged = bytearray(data)
+	damaged[header_size + key_event_size - 1] = 255
+	submissions.append(("unknown key", bytes(damaged)))
+	return submissions
+
+
+def main():
+	# Only games with key presses have key events to damage.
+	submissions = [data for data in make_submissions(games = 4, ticks = 5000,
+													 press_every = 50,
+													 seed = 1)
+				   if ScoreSubmission.header_format.unpack_from(data, 0)[-1]]
+	verifier = ScoreVerifier()
+	failures = 0
+	checked = 0
+
+	for data in submissions:
+		for description, damaged in damaged_submissions(data):
+			checked += 1
+			try:
+				claimed, reproduced = verifier.verify(damaged)
+			except Exception as error:
+				print(f"  FAILED: submission with {description} raised "
+					  f"{error!r}")
+				failures += 1
+				continue
+			if claimed is not None and claimed == reproduced:
+				print(f"  FAILED: submission with {description} was accepted")
+				failures += 1
+
+	# A file of submissions that ends part way through one can't be split.
+	submissions_file = b''.join(submissions)
+	for length in (len(submissions_file) - 1,
+				   len(submissions_file) - len(submissions[-1]) + 1):
+		checked += 1
+		try:
+			split_submissions(submissions_file[:length])
+		except ValueError:
+			continue
+		print(f"  FAILED: submissions file cut short to {length} bytes "
+			  f"was read")
+		failures += 1
+
+	for data in submissions:
+		claimed, reproduced = verifier.verify(data)
+		if claimed is None or claimed != reproduced:
+			print("  FAILED: genuine submission rejected after damaged ones")
+			failures += 1
+
+	print(f"Damaged score submissions checked: {checked}")
+	if failures:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
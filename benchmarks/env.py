@@ -0,0 +1,53 @@
+"""
+Check the agent environment steps boards at its target rate.
+
+Exits with status 1 if fewer board steps per second than
+Settings.env_steps_target are played.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from settings import Settings
+from colour_match_env import ColourMatchEnv
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--boards", type = int, default = 1024,
+						help = "number of boards to play at once")
+	parser.add_argument("--steps", type = int, default = 2000,
+						help = "number of steps to time")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	settings = Settings()
+	env = ColourMatchEnv(args.boards, settings)
+	env.reset(args.seed)
+	rng = np.random.default_rng(args.seed)
+
+	# Random actions, as an agent early in its training would play.
+	actions = rng.integers(0, 4, (args.steps, args.boards))
+
+	start = time.perf_counter()
+	games_ended = 0
+	for step in range(args.steps):
+		observation, rewards, dones, info = env.step(actions[step])
+		games_ended += len(info["final_scores"])
+	elapsed = time.perf_counter() - start
+
+	steps_per_second = args.boards * args.steps / elapsed
+	target = settings.env_steps_target
+	print(f"Agent environment ({args.boards} boards, "
+		  f"{games_ended} games ended):")
+	print(f"  {steps_per_second:.0f} board steps per second (target {target})")
+
+	if steps_per_second < target:
+		print("  FAILED: below the board steps per second target")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Check work the game doesn't depend on is done in leftover frame time.
+
+Runs the game's main loop on the title screen, then shows the instructions
+and the high scores and plays games with random key presses, timing each
+frame against Settings.frame_budget_ms. The same frames are then run
+without deferring any work, so it is all done when it is first needed,
+for comparison. Exits with status 1 if more than 1% of frames go over
+budget, deferred work is still waiting at the end, or blocks or text had
+to be made during a frame because they weren't prepared ahead of need.
+"""
+import argparse
+import random
+import sys
+import time
+
+import benchmarks.helpers
+import pygame
+
+from colour_match import ColourMatch
+from settings import Settings
+
+
+def run_frames(cm, frames, defer, frame_times):
+	"""Run frames of the game's main loop, as ColourMatch.run_game() does."""
+	for frame in range(frames):
+		start = time.perf_counter()
+		cm.frame_scheduler.start_frame()
+		cm._check_events()
+		cm._update_game()
+		cm._update_screen()
+		if defer:
+			cm.frame_scheduler.run_deferred()
+		frame_times.append(time.perf_counter() - start)
+
+
+def play(frames, press_every, seed, defer):
+	"""
+	Play through the game's screens and return the game, the frame times,
+	whether text was ready before the screens showing it and the blocks
+	created while games were being played.
+	"""
+	random.seed(seed)
+	settings = Settings()
+	settings.autosave = False
+	settings.particle_effects = False
+	cm = ColourMatch(settings)
+	cm.score_submission = None
+	cm.rng.seed(seed)
+	if not defer:
+		# Nothing is prepared ahead of need.
+		cm.frame_scheduler.tasks.clear()
+	frame_times = []
+
+	# Title screen, then the instructions and the high scores.
+	run_frames(cm, 60, defer, frame_times)
+	text_ready = (cm.instruction_card is not None
+				  and cm.sb.high_score_images is not None
+				  and cm.next_blocks.msg_tuples is not None)
+	for screen in ("display_instructions", "display_high_scores"):
+		setattr(settings, screen, True)
+		run_frames(cm, 10, defer, frame_times)
+		setattr(settings, screen, False)
+
+	settings.game_active = True
+	settings.difficulty = "hard"
+	settings.difficulty_selected = True
+	blocks_created = cm.block_pool.blocks_created
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+	for frame in range(frames):
+		if not settings.game_active:
+			cm._restart_game()
+			settings.game_active = True
+			settings.difficulty_selected = True
+		if frame % press_every == 0 and cm.setup_completed:
+			pygame.event.post(pygame.event.Event(pygame.KEYDOWN,
+												 key = random.choice(keys)))
+		run_frames(cm, 1, defer, frame_times)
+	blocks_created = cm.block_pool.blocks_created - blocks_created
+
+	cm.io_worker.stop()
+	return cm, frame_times, text_ready, blocks_created
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--frames", type = int, default = 5000,
+						help = "number of frames to play games for")
+	parser.add_argument("--press-every", type = int, default = 10,
+						help = "frames between key presses")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	budget = Settings().frame_budget_ms / 1000
+	results = {}
+	for defer in (True, False):
+		results[defer] = play(args.frames, args.press_every, args.seed,
+							  defer)
+	cm, frame_times, text_ready, blocks_created = results[True]
+
+	for defer, title in ((True, "Work deferred to leftover frame time:"),
+						 (False, "Work done when first needed:")):
+		game, times, ready, created = results[defer]
+		slowest = sorted(times)[-5:]
+		print(title)
+		print(f"  slowest frames (ms): "
+			  + " ".join(f"{frame_time * 1000:.2f}" for frame_time in slowest))
+		print(f"  text ready before it was shown: {ready}")
+		print(f"  {created} blocks created while playing")
+	for line in cm.frame_scheduler.get_report():
+		print(line)
+
+	over_budget = sum(frame_time > budget for frame_time in frame_times)
+	failed = False
+	if over_budget > len(frame_times) / 100:
+		print(f"  FAILED: {over_budget} frames went over budget")
+		failed = True
+	if cm.frame_scheduler.tasks:
+		print("  FAILED: deferred work was still waiting at the end")
+		failed = True
+	if blocks_created or not text_ready:
+		print("  FAILED: blocks or text weren't prepared ahead of need")
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
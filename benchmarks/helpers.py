@@ -0,0 +1,23 @@
+"""Shared code for setting up games to benchmark."""
+import os
+
+# Benchmarks run without opening a window.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from colour_match import ColourMatch
+
+
+def start_game(settings = None, difficulty = "hard"):
+	"""Create a game and set it up as if the player had chosen to play."""
+	cm = ColourMatch(settings)
+	# Don't write saved games or submit scores while benchmarking.
+	cm.settings.autosave = False
+	cm.score_submission = None
+	cm.settings.game_active = True
+	cm.settings.difficulty = difficulty
+	cm.settings.difficulty_selected = True
+
+	# First update runs the game's setup.
+	cm._update_game()
+	return cm
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+Check how long scripted arrow key presses take to show on the screen.
+
+Runs the game's main loop while pressing the left and right keys at points
+part way through frames, as a player would, and traces each press from the
+time it was posted to the display.flip() that shows it. Exits with status 1
+if 99% of presses don't show within Settings.input_latency_target_ms.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+from benchmarks.helpers import start_game
+from settings import Settings
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--frames", type = int, default = 3000,
+						help = "number of frames to run the game for")
+	parser.add_argument("--press-every", type = int, default = 5,
+						help = "frames between key presses")
+	parser.add_argument("--large-board", action = "store_true",
+						help = "use the 200x200 large board")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	settings = Settings()
+	if args.large_board:
+		settings.set_large_board()
+	settings.trace_input_latency = True
+	cm = start_game(settings)
+	cm.rng.seed(args.seed)
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	for frame in range(args.frames):
+		# Presses land before or after the game is updated, to wait in the
+		#	queue for different parts of a frame.
+		press = frame % args.press_every == 0
+		press_before_update = random.random() < 0.5
+		cm._check_events()
+		if press and press_before_update:
+			post_key_press(random.choice(keys))
+		cm._update_game()
+		if press and not press_before_update:
+			post_key_press(random.choice(keys))
+		cm._update_screen()
+
+	for line in cm.latency_tracer.get_report():
+		print(line)
+
+	median, p99 = cm.latency_tracer.get_percentiles("total", (50, 99))
+	target = settings.input_latency_target_ms
+	print(f"  99% of key presses shown within {p99:.2f} ms "
+		  f"(target {target} ms)")
+	if p99 > target:
+		print("  FAILED: key presses took longer than the target to show")
+		sys.exit(1)
+
+
+def post_key_press(key):
+	"""Post a key press stamped with the time it was pressed."""
+	pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key = key,
+		pressed_time = time.perf_counter()))
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
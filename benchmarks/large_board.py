@@ -0,0 +1,98 @@
+"""
+Check the large board stress mode runs at its frames per second target.
+
+Also counts the pile blocks given a new screen position in each frame.
+Exits with status 1 if the game runs below Settings.large_board_fps_target,
+or if any blocks were placed again in a frame where the pile hadn't changed.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+import board_events
+from benchmarks.helpers import start_game
+from settings import Settings
+
+
+class PileChanges:
+	"""Count the board events that move blocks in the pile."""
+
+	def __init__(self):
+		"""Initialise the count of changes to the pile."""
+		self.changes = 0
+
+	def board_changed(self, events):
+		"""Count the events in a batch that move blocks in the pile."""
+		self.changes += sum(event[0] in board_events.position_kinds
+							or event[0] == board_events.ROW_PUSHED
+							for event in events)
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--frames", type = int, default = 1000,
+						help = "number of frames to time")
+	parser.add_argument("--starting-rows", type = int, default = 100,
+						help = "rows in the starting pile (half the board)")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	settings = Settings()
+	settings.set_large_board()
+	settings.starting_rows = args.starting_rows
+	cm = start_game(settings)
+	pile_changes = PileChanges()
+	cm.board_events.subscribe(pile_changes)
+
+	# Move the falling block left and right as a player would.
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	# Blocks are placed when the pile is next checked, which for a new row
+	#	is in the frame after it was pushed.
+	placed_while_still = 0
+	still_frames = 0
+	changed_last_frame = True
+	placed = placed_at_start = cm.pile_index.blocks_placed
+
+	start = time.perf_counter()
+	for frame in range(args.frames):
+		if frame % 10 == 0:
+			event = pygame.event.Event(pygame.KEYDOWN,
+									   key = random.choice(keys))
+			cm._check_keydown_events(event)
+		changes = pile_changes.changes
+		cm._update_game()
+		cm._update_screen()
+		changed = pile_changes.changes > changes
+		if not changed and not changed_last_frame:
+			still_frames += 1
+			placed_while_still += cm.pile_index.blocks_placed - placed
+		changed_last_frame = changed
+		placed = cm.pile_index.blocks_placed
+	elapsed = time.perf_counter() - start
+
+	fps = args.frames / elapsed
+	target = settings.large_board_fps_target
+	print(f"Large board ({settings.blocks_per_row}x"
+		  f"{settings.blocks_per_column}, {args.starting_rows} rows of blocks):")
+	print(f"  {fps:.1f} frames per second (target {target})")
+	print(f"  {placed - placed_at_start} blocks placed, "
+		  f"{placed_while_still} in {still_frames} frames with a still pile")
+
+	failed = False
+	if fps < target:
+		print("  FAILED: below the frames per second target")
+		failed = True
+	if placed_while_still:
+		print("  FAILED: blocks were placed while the pile was still")
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
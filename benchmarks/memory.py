@@ -0,0 +1,279 @@
+"""
+Measure the game's memory use and check it against a saved baseline.
+
+Python memory is measured with tracemalloc. The pixels of pygame surfaces
+are allocated by SDL, where tracemalloc can't see them, so the memory of
+surfaces is counted from their sizes. Reports the memory of each Block
+(standard and special) and each Button, of whole games with an empty
+board, a full board and the large board, and of a long soak of games
+restarted one after another, which should leave nothing behind.
+
+Exits with status 1 if a figure has grown past the baseline in
+memory_baseline.json, memory keeps growing from game to game of the soak,
+or blocks are still alive after a restart that the block pool doesn't
+hold. Run with --update-baseline to save the figures as the new baseline.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from benchmarks.helpers import start_game
+from block import Block
+from button import Button
+from colour_match import ColourMatch
+from settings import Settings
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__),
+							 'memory_baseline.json')
+
+
+def surface_bytes(surface):
+	"""Return the bytes used by a surface's pixels."""
+	return surface.get_pitch() * surface.get_height()
+
+
+def block_surface_bytes(block):
+	"""Return the bytes of a block's image, hit boxes and label."""
+	total = sum(surface_bytes(surface) for surface in
+				(block.image, block.left_hit_box, block.right_hit_box,
+				 block.bottom_hit_box))
+	if block.special:
+		total += surface_bytes(block.label_image)
+	return total
+
+
+def game_surface_bytes(cm):
+	"""Return the bytes of every surface a game holds."""
+	blocks = [block for block in cm.grid.values() if block]
+	blocks += cm.buffer + cm.block_pool.free_blocks
+	if cm.current_block:
+		blocks.append(cm.current_block)
+	total = sum(block_surface_bytes(block) for block in blocks)
+	total += surface_bytes(cm.screen) + surface_bytes(cm.pile_layer.image)
+	for button in vars(cm).values():
+		if isinstance(button, Button) and button.msg_tuples:
+			total += sum(surface_bytes(image)
+						 for image, rect in button.msg_tuples)
+	return total
+
+
+def python_bytes():
+	"""Return the Python memory in use after collecting garbage."""
+	gc.collect()
+	return tracemalloc.get_traced_memory()[0]
+
+
+def process_rss():
+	"""Return the process's resident memory in bytes, if it can be read."""
+	try:
+		with open('/proc/self/statm') as file_object:
+			resident_pages = int(file_object.read().split()[1])
+	except OSError:
+		return None
+	return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure_objects(make_object, number):
+	"""
+	Make a number of objects and return the Python memory of each one and
+	the objects.
+	"""
+	before = python_bytes()
+	objects = [make_object() for count in range(number)]
+	per_object = (python_bytes() - before) / number
+	return per_object, objects
+
+
+def measure_per_object(cm, number):
+	"""Return figures for the memory of each Block and Button."""
+	figures = {}
+
+	python, blocks = measure_objects(lambda: Block(cm, cm.settings.RED),
+									 number)
+	figures["block python"] = python
+	figures["block surfaces"] = block_surface_bytes(blocks[0])
+	del blocks
+
+	def make_special_block():
+		block = Block(cm, cm.settings.RED)
+		block.set_special(2, 3)
+		return block
+	# Special blocks share their font through the fonts module.
+	python, blocks = measure_objects(make_special_block, number)
+	figures["special block python"] = python
+	figures["special block surfaces"] = block_surface_bytes(blocks[0])
+	del blocks
+
+	def make_button():
+		button = Button(cm, ["Button", "text"])
+		button.prep_msg(button.msg)
+		return button
+	python, buttons = measure_objects(make_button, number)
+	figures["button python"] = python
+	figures["button surfaces"] = sum(surface_bytes(image)
+									 for image, rect in buttons[0].msg_tuples)
+	del buttons
+
+	return figures
+
+
+def measure_game(name, make_game):
+	"""Return figures for the memory of a game made by make_game."""
+	before = python_bytes()
+	cm = make_game()
+	cm._update_screen()
+	figures = {
+		f"{name} python": python_bytes() - before,
+		f"{name} surfaces": game_surface_bytes(cm),
+	}
+	rss = process_rss()
+	print(f"  {name}: {figures[f'{name} python'] / 1e6:.2f} MB Python, "
+		  f"{figures[f'{name} surfaces'] / 1e6:.2f} MB surfaces"
+		  + (f", process resident {rss / 1e6:.1f} MB" if rss else ""))
+
+	cm.io_worker.stop()
+	return figures
+
+
+def make_full_game(settings):
+	"""Start a game with the board full apart from the top two rows."""
+	settings.starting_rows = settings.blocks_per_column - 2
+	cm = start_game(settings)
+	settings.new_row_time_limit = float('inf')
+	return cm
+
+
+def soak(games, seed):
+	"""
+	Play games to the end, restarting after each one, and return the
+	Python memory after each restart and the number of blocks still alive
+	after each restart.
+	"""
+	random.seed(seed)
+	cm = start_game()
+	cm.rng.seed(seed)
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	memory = []
+	leaked_blocks = []
+	for game in range(games):
+		# Fast blocks and new rows so each game soon fills the board.
+		cm.settings.block_speed = 10
+		cm.settings.new_row_time_limit = 100
+		frame = 0
+		while not (cm.settings.game_over or cm.settings.game_won):
+			if frame % 3 == 0:
+				event = pygame.event.Event(pygame.KEYDOWN,
+										   key = random.choice(keys))
+				cm._check_keydown_events(event)
+			cm._update_game()
+			if frame % 10 == 0:
+				cm._update_screen()
+			frame += 1
+
+		cm._restart_game()
+		cm.settings.difficulty = "hard"
+		cm.settings.difficulty_selected = True
+
+		# The pool holds a different number of blocks after each game, so
+		#	it is emptied to leave no blocks in the game at all.
+		cm.block_pool.free_blocks.clear()
+		memory.append(python_bytes())
+		leaked_blocks.append(sum(isinstance(thing, Block)
+								 for thing in gc.get_objects()))
+		# Start the next game.
+		cm._update_game()
+
+	cm.io_worker.stop()
+	return memory, leaked_blocks
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--objects", type = int, default = 1000,
+						help = "number of each object to measure")
+	parser.add_argument("--games", type = int, default = 20,
+						help = "number of games in the soak")
+	parser.add_argument("--tolerance", type = float, default = 0.1,
+						help = "fraction a figure may grow past the baseline")
+	parser.add_argument("--max-growth", type = int, default = 4096,
+						help = "bytes the soak may grow by for each game")
+	parser.add_argument("--update-baseline", action = "store_true",
+						help = "save the figures as the new baseline")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	tracemalloc.start()
+	figures = {}
+
+	cm = start_game()
+	figures.update(measure_per_object(cm, args.objects))
+	cm.io_worker.stop()
+	del cm
+	print("Memory of each object (Python + surfaces):")
+	for name in ["block", "special block", "button"]:
+		print(f"  {name}: {figures[f'{name} python']:.0f} + "
+			  f"{figures[f'{name} surfaces']} bytes")
+
+	print("Memory of whole games:")
+	figures.update(measure_game("empty", lambda: ColourMatch(Settings())))
+	figures.update(measure_game("full", lambda: make_full_game(Settings())))
+	large_board = Settings()
+	large_board.set_large_board()
+	figures.update(measure_game("large board",
+								lambda: make_full_game(large_board)))
+
+	# Memory can grow over the first games as caches and the block pool
+	#	fill, so growth is measured from the second restart on. It varies
+	#	from game to game, so the growth is the slope of a line fitted to
+	#	it.
+	memory, leaked_blocks = soak(args.games, args.seed)
+	growth = np.polyfit(np.arange(len(memory) - 1), memory[1:], 1)[0]
+	print(f"Soak of {args.games} games:")
+	print(f"  Python memory after each restart: {min(memory) / 1e6:.2f} MB "
+		  f"to {max(memory) / 1e6:.2f} MB ({growth:.0f} bytes per game)")
+	print(f"  most blocks alive after a restart: "
+		  f"{max(leaked_blocks)}")
+
+	failed = False
+	if growth > args.max_growth:
+		print(f"  FAILED: memory grows by more than {args.max_growth} "
+			  "bytes per game")
+		failed = True
+	if max(leaked_blocks) > 0:
+		print("  FAILED: blocks are kept alive after the game restarts")
+		failed = True
+
+	if args.update_baseline:
+		with open(BASELINE_FILE, 'w') as file_object:
+			json.dump({name: round(value) for name, value in figures.items()},
+					  file_object, indent = 4)
+			file_object.write("\n")
+		print(f"Saved the baseline to {BASELINE_FILE}")
+	else:
+		with open(BASELINE_FILE) as file_object:
+			baseline = json.load(file_object)
+		print("Compared with the baseline:")
+		for name, value in figures.items():
+			limit = baseline[name] * (1 + args.tolerance) + 1024
+			status = "ok" if value <= limit else "GREW"
+			print(f"  {name}: {value:.0f} bytes "
+				  f"(baseline {baseline[name]}) {status}")
+			if value > limit:
+				failed = True
+		if failed:
+			print("  FAILED: memory use has grown")
+
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Check four boards in one window run at their frames per second target.
+
+Exits with status 1 if the boards run below
+Settings.multi_board_fps_target.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+import benchmarks.helpers
+from multi_board import MultiBoard
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--boards", type = int, default = 4)
+	parser.add_argument("--frames", type = int, default = 2000,
+						help = "number of frames to time")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	multi_board = MultiBoard(args.boards, "hard", practice = True)
+
+	# Run the setup of every board before timing.
+	multi_board._update_boards()
+
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	start = time.perf_counter()
+	for frame in range(args.frames):
+		if frame % 10 == 0:
+			event = pygame.event.Event(pygame.KEYDOWN,
+									   key = random.choice(keys))
+			multi_board._send_key(event)
+		multi_board._start_frame()
+		multi_board._update_boards()
+		multi_board._update_screen()
+		multi_board._run_deferred()
+	elapsed = time.perf_counter() - start
+
+	fps = args.frames / elapsed
+	target = multi_board.settings.multi_board_fps_target
+	print(f"{args.boards} boards in one window:")
+	print(f"  {fps:.1f} frames per second (target {target})")
+
+	if fps < target:
+		print("  FAILED: below the frames per second target")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
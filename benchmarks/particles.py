@@ -0,0 +1,97 @@
+"""
+Check the particles of a blast that clears the whole board don't drop
+frames.
+
+Fills the board, removes every block as a special block whose blast covers
+all of it would, then times drawing every frame until the blast's
+particles are gone. Does the same for a colour wipe of one colour. The
+game's own work removing the blocks isn't timed, only starting the effect
+and drawing the frames. Exits with status 1 if any frame takes longer than
+a frame at Settings.particle_fps_target.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+import particles
+from benchmarks.helpers import start_game
+from settings import Settings
+
+
+def time_effect(settings, kind, colour = None):
+	"""
+	Fill a board, remove its blocks for an effect of the kind given (only
+	those of one colour for a colour wipe) and time the frames drawn until
+	the effect ends. Returns the slowest frame time in seconds, the number
+	of particles the effect had and the pool.
+	"""
+	cm = start_game(settings)
+	# The benchmark moves the particles itself instead of the game.
+	pool = cm.particles
+	cm.particles = None
+
+	positions = []
+	colours = []
+	for position, block in cm.grid.items():
+		if block and colour in (None, block.colour):
+			positions.append(position)
+			colours.append(block.colour)
+			cm._remove_block(position)
+	centre = (settings.blocks_per_row // 2, settings.blocks_per_column // 2)
+	cm._draw_screen()
+
+	slowest_frame = 0
+	for frame in range(settings.particle_lifetime + 1):
+		start = time.perf_counter()
+		if frame == 0:
+			pool.add_effect(kind, positions, colours, centre = centre)
+		pool.update()
+		cm._draw_screen()
+		pool.draw(cm.screen)
+		pygame.display.flip()
+		slowest_frame = max(slowest_frame, time.perf_counter() - start)
+		if frame == 0:
+			number_of_particles = pool.number_alive
+	return slowest_frame, number_of_particles, pool
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--large-board", action = "store_true",
+						help = "use the 200x200 large board")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	settings = Settings()
+	if args.large_board:
+		settings.set_large_board()
+	# Fill the board apart from the rows the falling block starts in.
+	settings.starting_rows = settings.blocks_per_column - 2
+	target = settings.particle_fps_target
+	print(f"Particle effects on a {settings.blocks_per_row}x"
+		  f"{settings.blocks_per_column} board "
+		  f"(at most {settings.particle_capacity} particles):")
+
+	failed = False
+	for name, kind, colour in [("full board blast", particles.BLAST, None),
+							   ("colour wipe", particles.COLOUR_WIPE,
+								settings.RED)]:
+		slowest_frame, number_of_particles, pool = time_effect(
+													settings, kind, colour)
+		print(f"  {name}: slowest frame {slowest_frame * 1000:.2f} ms, "
+			  f"{number_of_particles} particles, "
+			  f"{pool.effects_dropped} effects dropped")
+		if slowest_frame > 1 / target:
+			failed = True
+
+	if failed:
+		print(f"  FAILED: a frame took longer than 1/{target} of a second")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Check opening a puzzle pack and reading its puzzles doesn't depend on the
+size of the pack.
+
+Writes packs of random puzzles of increasing size, then times opening each
+pack and reading random puzzles from it, and measures the Python memory
+in use after opening it and reading the puzzles. Also times making
+puzzles from seeded games with make_puzzles.py. Exits with status 1 if the
+largest pack takes much longer to open or uses more memory than the
+smallest.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import benchmarks.helpers
+from make_puzzles import PuzzleMaker
+from puzzle_pack import PuzzlePack, write_pack
+from settings import Settings
+
+
+def random_puzzles(number_of_puzzles, settings, rng):
+	"""Make puzzles of random blocks, each with one to ten rows."""
+	for number in range(number_of_puzzles):
+		yield [[rng.randint(0, len(settings.block_colours))
+				for x in range(settings.blocks_per_row)]
+			   for y in range(rng.randint(1, 10))]
+
+
+def time_pack(filename, reads, rng):
+	"""
+	Return the median time to open a pack, the mean time to read a random
+	puzzle from it and the Python memory in use with the pack open after
+	reading the puzzles.
+	"""
+	open_times = []
+	for repeat in range(20):
+		start = time.perf_counter()
+		pack = PuzzlePack(filename)
+		open_times.append(time.perf_counter() - start)
+		pack.close()
+
+	pack = PuzzlePack(filename)
+	start = time.perf_counter()
+	for read in range(reads):
+		rows = pack.get_rows(rng.randrange(len(pack)))
+	read_time = (time.perf_counter() - start) / reads
+	pack.close()
+
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	pack = PuzzlePack(filename)
+	for read in range(reads):
+		rows = pack.get_rows(rng.randrange(len(pack)))
+	memory = tracemalloc.get_traced_memory()[0] - before
+	tracemalloc.stop()
+	pack.close()
+	return statistics.median(open_times), read_time, memory
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--sizes", type = int, nargs = "+",
+						default = [1000, 10000, 100000],
+						help = "numbers of puzzles in the packs")
+	parser.add_argument("--reads", type = int, default = 1000,
+						help = "random puzzles to read from each pack")
+	parser.add_argument("--made-puzzles", type = int, default = 100,
+						help = "puzzles to make from seeded games")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	rng = random.Random(args.seed)
+	settings = Settings()
+	results = []
+	with tempfile.TemporaryDirectory() as folder:
+		print("Puzzle packs (open, read a puzzle, memory after reading):")
+		for size in args.sizes:
+			filename = os.path.join(folder, f"pack_{size}.bin")
+			# Random puzzles use every colour.
+			write_pack(filename, settings.blocks_per_row,
+					   settings.blocks_per_column, "hard",
+					   random_puzzles(size, settings, rng), size)
+			open_time, read_time, memory = time_pack(filename, args.reads,
+													 rng)
+			results.append((open_time, memory))
+			print(f"  {size} puzzles ({os.path.getsize(filename) / 1e6:.1f} "
+				  f"MB): {open_time * 1e6:.1f} us, {read_time * 1e6:.1f} us, "
+				  f"{memory} bytes")
+
+		filename = os.path.join(folder, "made.bin")
+		maker = PuzzleMaker()
+		start = time.perf_counter()
+		write_pack(filename, settings.blocks_per_row,
+				   settings.blocks_per_column, maker.difficulty,
+				   maker.make_puzzles(args.made_puzzles, args.seed),
+				   args.made_puzzles)
+		elapsed = time.perf_counter() - start
+		print(f"Made {args.made_puzzles} puzzles from seeded games at "
+			  f"{args.made_puzzles / elapsed:.0f} puzzles per second")
+
+	(smallest_open, smallest_memory), (largest_open, largest_memory) = (
+													results[0], results[-1])
+	failed = False
+	# Allow for timer noise on packs that open in a few microseconds.
+	if largest_open > 2 * smallest_open + 50e-6:
+		print("  FAILED: the largest pack takes longer to open")
+		failed = True
+	if largest_memory > smallest_memory + 1024:
+		print("  FAILED: the largest pack uses more memory")
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
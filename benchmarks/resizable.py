@@ -0,0 +1,62 @@
+"""
+Measure drawing the game scaled to windows of different sizes.
+
+Times preparing the images for each window size, as happens when the
+window is resized, then the time to draw each frame at that size.
+"""
+import argparse
+import random
+import time
+
+import pygame
+
+from benchmarks.helpers import start_game
+from render_snapshot import SnapshotPublisher
+from settings import Settings
+from snapshot_renderer import SnapshotRenderer
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--frames", type = int, default = 500,
+						help = "number of frames to time at each size")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	settings = Settings()
+	settings.resizable_window = True
+	cm = start_game(settings)
+	cm.rng.seed(args.seed)
+	publisher = SnapshotPublisher(cm)
+	renderer = SnapshotRenderer(cm, cm.window)
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	print(f"Drawing a {settings.screen_width}x{settings.screen_height} "
+		  "board scaled to fit the window:")
+	for window_size in [(700, 700), (350, 350), (1400, 1400), (2100, 1200)]:
+		window = pygame.Surface(window_size)
+		start = time.perf_counter()
+		renderer.resize(window)
+		resize_ms = (time.perf_counter() - start) * 1000
+
+		draw_time = 0
+		for frame in range(args.frames):
+			if frame % 10 == 0:
+				event = pygame.event.Event(pygame.KEYDOWN,
+										   key = random.choice(keys))
+				cm._check_keydown_events(event)
+			cm._update_game()
+			publisher.publish(cm.game_ticks)
+			start = time.perf_counter()
+			renderer.draw(publisher.get_snapshot())
+			draw_time += time.perf_counter() - start
+		frame_ms = draw_time * 1000 / args.frames
+
+		print(f"  {window_size[0]}x{window_size[1]} "
+			  f"(blocks of {renderer.block_size} pixels): "
+			  f"resize {resize_ms:.1f} ms, draw {frame_ms:.3f} ms per frame")
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Time saving and resuming an in-progress game.
+
+Exits with status 1 if saving or resuming takes longer than --max-ms on
+average, as games are saved every time a block lands.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pygame
+
+from benchmarks.helpers import start_game
+from save_file import SaveFile
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--repeats", type = int, default = 500)
+	parser.add_argument("--ticks", type = int, default = 5000,
+						help = "frames to play before saving")
+	parser.add_argument("--max-ms", type = float, default = 3.0)
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	cm = start_game()
+	cm.rng.seed(args.seed)
+
+	# Play part of a game so there is a pile to save.
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+	for tick in range(args.ticks):
+		if tick % 10 == 0:
+			event = pygame.event.Event(pygame.KEYDOWN,
+									   key = random.choice(keys))
+			cm._check_keydown_events(event)
+		cm._update_game()
+
+	with tempfile.TemporaryDirectory() as directory:
+		save_file = SaveFile(cm, os.path.join(directory, 'saved_game.bin'))
+
+		# Saving only queues the file for the game's background I/O worker.
+		start = time.perf_counter()
+		for repeat in range(args.repeats):
+			save_file.save()
+		save_ms = (time.perf_counter() - start) * 1000 / args.repeats
+
+		start = time.perf_counter()
+		cm.io_worker.flush()
+		flush_ms = (time.perf_counter() - start) * 1000
+
+		start = time.perf_counter()
+		for repeat in range(args.repeats):
+			save_file.load()
+		load_ms = (time.perf_counter() - start) * 1000 / args.repeats
+
+		size = os.path.getsize(save_file.filename)
+
+	print(f"Saved game of {size} bytes:")
+	print(f"  save:   {save_ms:.3f} ms (max {args.max_ms} ms)")
+	print(f"  waiting for background writes: {flush_ms:.3f} ms")
+	print(f"  resume: {load_ms:.3f} ms (max {args.max_ms} ms)")
+
+	if save_ms > args.max_ms or load_ms > args.max_ms:
+		print("  FAILED: slower than the maximum time")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Measure the time from starting the game to its first frame on screen.
+
+Starts are timed with a named font, first with the font cache removed
+before every start so the system fonts are searched, then with the cache
+the last of those starts wrote. The games are started in a temporary
+directory, so the player's own font cache, saves and high scores are
+neither used nor changed. Exits with status 1 if the median start with
+the font cache takes longer than Settings.startup_time_target_ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Hide pygame's greeting here and in the games started, which are given
+#	this environment. The video driver is only set for the started games.
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import fonts
+from settings import Settings
+
+# Code run in a new Python process for each measurement so that every start
+#	is a genuine cold start. Timing begins before pygame is imported. The
+#	font name is passed as the first argument.
+CHILD_CODE = """
+import sys
+import time
+start = time.perf_counter()
+from settings import Settings
+from colour_match import ColourMatch
+settings = Settings()
+settings.font_name = sys.argv[1] or None
+cm = ColourMatch(settings)
+cm._update_screen()
+print(time.perf_counter() - start)
+"""
+
+
+def time_start(env, font_name, directory):
+	"""
+	Start the game in a new process in a directory and return seconds to
+	first frame.
+	"""
+	result = subprocess.run([sys.executable, "-c", CHILD_CODE, font_name],
+							env = env, cwd = directory, capture_output = True,
+							text = True, check = True)
+	return float(result.stdout.split()[-1])
+
+
+def time_starts(env, font_name, runs, directory, font_cache):
+	"""
+	Time a number of starts in a directory, with or without the font cache
+	in that directory.
+	"""
+	cache_file = os.path.join(directory, fonts.FONT_CACHE_FILE)
+	times = []
+	for run in range(runs):
+		if not font_cache and os.path.exists(cache_file):
+			os.remove(cache_file)
+		times.append(time_start(env, font_name, directory))
+	return times
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--runs", type = int, default = 10,
+						help = "number of starts to time with and without "
+							   "the font cache")
+	parser.add_argument("--font-name", default = "arial",
+						help = "system font the game is started with")
+	parser.add_argument("--display", action = "store_true",
+						help = "use the real display instead of SDL's dummy")
+	args = parser.parse_args()
+
+	env = dict(os.environ)
+	if not args.display:
+		env["SDL_VIDEODRIVER"] = "dummy"
+	# The games are started outside the repository, so are given its path.
+	repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	env["PYTHONPATH"] = os.pathsep.join(
+		[repository] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+
+	# The last start without the font cache writes the cache that the
+	#	starts with it use.
+	results = {}
+	with tempfile.TemporaryDirectory() as directory:
+		for font_cache in (False, True):
+			results[font_cache] = time_starts(env, args.font_name, args.runs,
+											  directory, font_cache)
+
+	print(f"Time to first frame over {args.runs} starts with the "
+		  f"'{args.font_name}' font:")
+	for font_cache, title in ((False, "without the font cache"),
+							  (True, "with the font cache")):
+		times = results[font_cache]
+		print(f"  {title}: median {statistics.median(times) * 1000:.1f} ms,"
+			  f" min {min(times) * 1000:.1f} ms,"
+			  f" max {max(times) * 1000:.1f} ms")
+
+	target = Settings().startup_time_target_ms
+	median_ms = statistics.median(results[True]) * 1000
+	print(f"  target with the font cache: {target} ms")
+	if median_ms > target:
+		print("  FAILED: the game took too long to start")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
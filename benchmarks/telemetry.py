@@ -0,0 +1,72 @@
+"""
+Measure the cost of logging game events and of querying a large log.
+
+Writes a log of made-up games, timing each event recorded, then times
+summarising every game in the log. Exits with status 1 if recording an
+event takes longer than --max-us on average.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.helpers import start_game
+import telemetry
+from telemetry import Telemetry
+from telemetry_query import TelemetryLog, summarise
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--games", type = int, default = 100000,
+						help = "number of games to write to the log")
+	parser.add_argument("--max-us", type = float, default = 5.0)
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	cm = start_game()
+	filename = os.path.join(tempfile.mkdtemp(), 'telemetry.bin')
+	log_writer = Telemetry(cm, filename)
+
+	# Each made-up game has the events of a short game.
+	kinds = ([telemetry.LANDING] * 12 + [telemetry.MATCH] * 6
+			 + [telemetry.ROW_PUSH] * 6 + [telemetry.SPEED_UP]
+			 + [telemetry.SPECIAL_1, telemetry.SPECIAL_2])
+
+	number_of_events = 0
+	start = time.perf_counter()
+	for game in range(args.games):
+		log_writer.start_game("hard")
+		for kind in kinds:
+			cm.game_ticks += 100
+			log_writer.record(kind, 3)
+		log_writer.record(telemetry.GAME_OVER, 50)
+		number_of_events += len(kinds) + 2
+	log_writer.flush()
+	record_us = (time.perf_counter() - start) * 1e6 / number_of_events
+
+	cm.io_worker.flush()
+	size = os.path.getsize(filename)
+
+	start = time.perf_counter()
+	log = TelemetryLog(filename)
+	lines = summarise(log)
+	log.close()
+	query_s = time.perf_counter() - start
+	os.remove(filename)
+
+	print(f"Telemetry log of {args.games} games ({number_of_events} events, "
+		  f"{size / 1e6:.1f} MB):")
+	print(f"  record: {record_us:.2f} us per event (max {args.max_us} us)")
+	print(f"  query:  {query_s:.3f} s to summarise every game")
+
+	if record_us > args.max_us:
+		print("  FAILED: slower than the maximum time")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
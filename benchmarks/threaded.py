@@ -0,0 +1,70 @@
+"""
+Check the threaded simulation keeps its tick rate while frames are slow.
+
+Draws snapshots with a delay added to every frame, as if presenting them
+were slow, while keys are pressed. Exits with status 1 if the simulation
+falls more than --max-ms behind its ticks or takes longer than --max-ms to
+handle a key press.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+from benchmarks.helpers import start_game
+from settings import Settings
+from simulation_thread import SimulationThread
+from snapshot_renderer import SnapshotRenderer
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--seconds", type = float, default = 3.0,
+						help = "time to run the game for")
+	parser.add_argument("--frame-ms", type = float, default = 50.0,
+						help = "extra time taken by every frame")
+	parser.add_argument("--max-ms", type = float, default = 20.0)
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	random.seed(args.seed)
+	settings = Settings()
+	cm = start_game(settings)
+	simulation_thread = SimulationThread(cm, settings.simulation_tick_rate)
+	renderer = SnapshotRenderer(cm)
+	keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+	simulation_thread.start()
+	start = time.perf_counter()
+	frames = 0
+	while time.perf_counter() - start < args.seconds:
+		simulation_thread.queue_event(
+			pygame.event.Event(pygame.KEYDOWN, key = random.choice(keys)))
+		renderer.draw(simulation_thread.get_snapshot())
+		time.sleep(args.frame_ms / 1000)
+		frames += 1
+	simulation_thread.stop()
+	elapsed = time.perf_counter() - start
+
+	if simulation_thread.error:
+		raise simulation_thread.error
+
+	tick_rate = simulation_thread.ticks / elapsed
+	lateness_ms = simulation_thread.max_lateness * 1000
+	latency_ms = simulation_thread.max_input_latency * 1000
+	print(f"Threaded simulation with {args.frame_ms:.0f} ms frames "
+		  f"({frames / elapsed:.1f} frames per second):")
+	print(f"  {tick_rate:.1f} ticks per second "
+		  f"(target {settings.simulation_tick_rate})")
+	print(f"  latest tick:   {lateness_ms:.2f} ms (max {args.max_ms} ms)")
+	print(f"  slowest input: {latency_ms:.2f} ms (max {args.max_ms} ms)")
+
+	if lateness_ms > args.max_ms or latency_ms > args.max_ms:
+		print("  FAILED: slower than the maximum time")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
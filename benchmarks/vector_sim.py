@@ -0,0 +1,53 @@
+"""
+Check the vectorised simulation steps boards at its target rate.
+
+Exits with status 1 if fewer board steps per second than
+Settings.vector_sim_steps_target are played.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from settings import Settings
+from vector_sim import VectorSim
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--boards", type = int, default = 1024,
+						help = "number of boards to play at once")
+	parser.add_argument("--steps", type = int, default = 300,
+						help = "number of steps to time")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	settings = Settings()
+	sim = VectorSim(args.boards, settings, seed = args.seed)
+	rng = np.random.default_rng(args.seed)
+
+	start = time.perf_counter()
+	games_ended = 0
+	for step in range(args.steps):
+		# Drop the blocks into random columns and start new games on the
+		#	boards that have ended, as a training loop would.
+		sim.step(rng.integers(0, sim.columns, args.boards))
+		ended = np.flatnonzero(sim.game_over | sim.game_won)
+		games_ended += len(ended)
+		sim.reset(ended)
+	elapsed = time.perf_counter() - start
+
+	steps_per_second = args.boards * args.steps / elapsed
+	target = settings.vector_sim_steps_target
+	print(f"Vectorised simulation ({args.boards} boards of "
+		  f"{sim.columns}x{sim.rows}, {games_ended} games ended):")
+	print(f"  {steps_per_second:.0f} board steps per second (target {target})")
+
+	if steps_per_second < target:
+		print("  FAILED: below the board steps per second target")
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
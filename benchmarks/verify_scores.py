@@ -0,0 +1,199 @@
+"""
+Check submitted scores are verified fast enough, and only when genuine.
+
+Plays games with random key presses to make score submissions, then
+verifies them all on a pool of processes and reports the submissions
+verified each minute by each process. Some of the submissions have their
+score raised by one, and these must all be rejected. The first few are
+also played a tick at a time to check fast forwarding leaves the game in
+exactly the same state, and forged copies of them with a difficulty that
+doesn't exist or more ticks than the game lasted are verified. Exits with
+status 1 if a genuine score is rejected, a raised one is accepted, fast
+forwarding changes the game, a forged submission isn't rejected quickly,
+or fewer than Settings.verify_scores_per_minute_target submissions are
+verified each minute by each process.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pygame
+
+import benchmarks.helpers
+from colour_match import ColourMatch
+from score_submission import ScoreSubmission
+from settings import Settings
+from verify_scores import ScoreVerifier, verify_submissions
+
+
+def make_submissions(games, ticks, press_every, seed):
+	"""
+	Play games with a key pressed on average every press_every ticks and
+	return the submission of each game.
+	"""
+	random.seed(seed)
+	settings = Settings()
+	settings.autosave = False
+	settings.particle_effects = False
+	cm = ColourMatch(settings)
+	keys = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN]
+
+	submissions = []
+	for game in range(games):
+		settings.difficulty = random.choice(["easy", "medium", "hard"])
+		settings.difficulty_selected = True
+		for tick in range(ticks):
+			if not settings.game_active:
+				break
+			if tick and random.random() < 1 / press_every:
+				key = random.choice(keys)
+				cm._handle_event(pygame.event.Event(pygame.KEYDOWN,
+													key = key))
+				if key == pygame.K_DOWN:
+					cm._handle_event(pygame.event.Event(pygame.KEYUP,
+														key = key))
+			cm._update_game()
+
+		# Every game is submitted, not just those with high scores.
+		submission = cm.score_submission
+		submission.recording = False
+		submission.score = cm.stats.score
+		submissions.append(submission.to_bytes())
+		cm._restart_game()
+
+	cm.io_worker.stop()
+	return submissions
+
+
+def change_header(data, index, value):
+	"""Return a submission with a value in its header changed."""
+	header_format = ScoreSubmission.header_format
+	header = list(header_format.unpack_from(data, 0))
+	header[index] = value
+	return header_format.pack(*header) + data[header_format.size:]
+
+
+def raise_score(data):
+	"""Return a submission with its score raised by one."""
+	# Score comes after the seed in the header.
+	score = ScoreSubmission.header_format.unpack_from(data, 0)[7]
+	return change_header(data, 7, score + 1)
+
+
+def check_forged(submissions):
+	"""
+	Verify forged copies of submissions, and return True if they are all
+	rejected within a second each.
+	"""
+	verifier = ScoreVerifier()
+	for data in submissions:
+		ticks = ScoreSubmission.header_format.unpack_from(data, 0)[8]
+		# Difficulty and number of ticks come after the version and the
+		#	score respectively.
+		for forged in (change_header(data, 2, 7),
+					   change_header(data, 8, 2 ** 32 - 1),
+					   change_header(data, 8, ticks + 1000000)):
+			start = time.perf_counter()
+			claimed, reproduced = verifier.verify(forged)
+			if (time.perf_counter() - start > 1
+				or (claimed is not None and claimed == reproduced)):
+				return False
+	return True
+
+
+def check_fast_forward(submissions):
+	"""
+	Play submissions a tick at a time and fast forwarded, and return True
+	if both leave the game in the same state.
+	"""
+	verifier = ScoreVerifier()
+	cm_game = verifier.cm_game
+	submission = verifier.submission
+	for data in submissions:
+		states = []
+		for fast_forward in (False, True):
+			submission.from_bytes(data)
+			cm_game._restart_game()
+			submission.start_playback()
+			if fast_forward:
+				submission.play_ticks(0, submission.ticks)
+			else:
+				for tick in range(submission.ticks):
+					submission.play_tick(tick)
+			states.append((cm_game.save_file.to_bytes(), cm_game.game_ticks))
+		if states[0] != states[1]:
+			return False
+	return True
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--games", type = int, default = 100,
+						help = "number of submissions to verify")
+	parser.add_argument("--ticks", type = int, default = 30000,
+						help = "most ticks each game lasts")
+	parser.add_argument("--press-every", type = int, default = 100,
+						help = "average ticks between key presses")
+	parser.add_argument("--workers", type = int, default = os.cpu_count(),
+						help = "processes to verify the submissions on")
+	parser.add_argument("--raised-every", type = int, default = 5,
+						help = "raise the score of one in this many "
+							   "submissions")
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	submissions = make_submissions(args.games, args.ticks, args.press_every,
+								   args.seed)
+	raised = set(range(0, args.games, args.raised_every))
+	for number in raised:
+		submissions[number] = raise_score(submissions[number])
+
+	start = time.perf_counter()
+	results = verify_submissions(submissions, args.workers)
+	elapsed = time.perf_counter() - start
+	per_minute = len(submissions) / elapsed * 60 / args.workers
+
+	wrongly_rejected = 0
+	wrongly_accepted = 0
+	for number, (claimed, reproduced) in enumerate(results):
+		accepted = claimed is not None and claimed == reproduced
+		if number in raised and accepted:
+			wrongly_accepted += 1
+		elif number not in raised and not accepted:
+			wrongly_rejected += 1
+	genuine = [data for number, data in enumerate(submissions[:10])
+			   if number not in raised]
+	fast_forward_same = check_fast_forward(genuine)
+	forged_rejected = check_forged(genuine)
+
+	target = Settings().verify_scores_per_minute_target
+	print(f"Verified {len(submissions)} submissions of up to {args.ticks} "
+		  f"ticks on {args.workers} processes in {elapsed:.2f} s:")
+	print(f"  {per_minute:.0f} submissions per minute per process "
+		  f"(target {target})")
+	print(f"  {len(raised)} raised scores, {wrongly_accepted} accepted; "
+		  f"{wrongly_rejected} genuine scores rejected")
+	print(f"  fast forwarding leaves the same state: {fast_forward_same}")
+	print(f"  forged submissions rejected: {forged_rejected}")
+
+	failed = False
+	if wrongly_accepted or wrongly_rejected:
+		print("  FAILED: scores were accepted or rejected wrongly")
+		failed = True
+	if not fast_forward_same:
+		print("  FAILED: fast forwarding changed the game")
+		failed = True
+	if not forged_rejected:
+		print("  FAILED: forged submissions weren't rejected quickly")
+		failed = True
+	if per_minute < target:
+		print("  FAILED: submissions were verified too slowly")
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
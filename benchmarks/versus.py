@@ -0,0 +1,79 @@
+"""
+Check a versus game over a socket stays in step and rolls back quickly.
+
+Hosts a versus game on this process and plays it against a stand-in player
+run by versus.py on another process, which holds the keys it sends back
+for a number of ticks so that the host keeps having to roll back and play
+ticks again. The host plays at random too. Exits with status 1 if the two
+computers' games go out of step, or a rollback takes longer than a frame
+at Settings.versus_fps_target.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import benchmarks.helpers
+from settings import Settings
+from versus import LockstepVersus, host_game, listen_for_player
+
+
+def main():
+	parser = argparse.ArgumentParser(description = __doc__)
+	parser.add_argument("--ticks", type = int, default = 4800,
+						help = "number of ticks to play")
+	parser.add_argument("--lag-ticks", type = int, default = 16,
+						help = "ticks the stand-in player holds its keys "
+							   "back for")
+	parser.add_argument("--difficulty", default = "hard",
+						choices = ["easy", "medium", "hard"])
+	parser.add_argument("--port", type = int, default = 5051)
+	parser.add_argument("--seed", type = int, default = 1)
+	args = parser.parse_args()
+
+	settings = Settings()
+	server_socket = listen_for_player(args.port)
+	bot = subprocess.Popen([sys.executable, "versus.py", "--join",
+							f"localhost:{args.port}", "--bot",
+							"--lag-ticks", str(args.lag_ticks)],
+						   cwd = os.path.dirname(os.path.dirname(
+													os.path.abspath(__file__))))
+	connection = host_game(server_socket, args.seed,
+						   settings.versus_input_delay, args.difficulty)
+
+	# The host plays at random as well, without showing its window.
+	versus = LockstepVersus(connection, 0, args.seed,
+							difficulty = args.difficulty, bot = True)
+	versus.run_game(args.ticks)
+	connection.close()
+	bot.wait()
+
+	frame_time = 1 / settings.versus_fps_target
+	print(f"Versus game of {versus.tick} ticks against a player lagging "
+		  f"{args.lag_ticks} ticks:")
+	print(f"  {versus.rollbacks} rollbacks playing {versus.ticks_replayed} "
+		  f"ticks again")
+	print(f"  longest rollback {versus.longest_rollback} ticks, slowest "
+		  f"{versus.max_rollback_time * 1000:.2f} ms (a frame is "
+		  f"{frame_time * 1000:.2f} ms)")
+	print(f"  {versus.checksums_matched} checksums matched, "
+		  f"{versus.rows_sent} garbage rows sent")
+	scores = [cm_game.stats.score for cm_game, offset in versus.boards]
+	print(f"  scores {scores}")
+
+	failed = False
+	if bot.returncode != 0:
+		print("  FAILED: the other player's game stopped with an error")
+		failed = True
+	if versus.checksums_matched == 0:
+		print("  FAILED: no checksums were compared")
+		failed = True
+	if versus.max_rollback_time > frame_time:
+		print("  FAILED: a rollback took longer than a frame")
+		failed = True
+	if failed:
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
\ No newline at end of file
@@ -1,15 +1,21 @@
-import random
-
 import pygame
 
+import fonts
+
 class Block:
 	"""Class to represent the basic block in the game."""
 
-	def __init__(self, cm_game):
-		"""Initialise the blocks properties."""
+	def __init__(self, cm_game, colour = None, reset = True):
+		"""
+		Initialise the blocks properties. If a colour is given the block
+		is a standard block of that colour, else the colour is random.
+		Blocks made ahead of need aren't reset until they are used, so
+		making them doesn't take values from the game's random numbers.
+		"""
 		# Set attributes from rest of game that block needs to access.
 		self.cm_game = cm_game
 		self.settings = self.cm_game.settings
+		self.rng = self.cm_game.rng
 		self.screen = self.cm_game.screen
 		self.screen_rect = self.screen.get_rect()
 		self.screen_width, self.screen_height = self.screen_rect.size
@@ -19,33 +25,47 @@ class Block:
 									 self.settings.block_height))
 		self.rect = self.image.get_rect()
 
-		# Random chance to create a "special" block,
-		#	else give the block a standard colour.
-		special_chance = random.uniform(0, 1)
-		if special_chance > 0.9:
+		# Create hit boxes for detecting collisions between blocks.
+		self._create_hit_boxes()
+
+		# Give the block its colour and starting position.
+		if reset:
+			self.reset(colour)
+
+	def reset(self, colour = None):
+		"""
+		Give the block a new colour and starting position. Called when the
+		block is first created and when a recycled block is reused.
+		"""
+		# Use the colour given for the block. Otherwise random chance to
+		#	create a "special" block, else give the block a standard colour.
+		if colour:
+			self.special = False
+			self.colour = colour
+			self.image.fill(self.colour)
+		elif self.rng.uniform(0, 1) > 0.9:
 			self.special = True
 			self._apply_special_block()
 		else:
 			self.special = False
-			self.colour = random.choice(self.settings.colour_list)
+			self.colour = self.rng.choice(self.settings.colour_list)
 			self.image.fill(self.colour)
 
 		# Give block its starting position:
 		#	 top of the screen, at a random horizonal position.
-		self.rect.y = 0
+		self.rect.topleft = (0, 0)
 
 		# Choose random position at discrete intervals based on block width
 		# 	so blocks line up in columns correctly.
 		#	(Block at self.settings.blocks_per_row would be just off right of
 		#	screen so reduce range by 1 to avoid this)
-		self.random_start_position = random.randint(
+		self.random_start_position = self.rng.randint(
 										0, (self.settings.blocks_per_row - 1))
 
 		# Create float to track block's vertical position more accurately.
 		self.y = float(self.rect.y)
 
-		# Create hit boxes for detecting collisions between blocks.
-		self._create_hit_boxes()
+		self.align_hit_boxes()
 
 	def update(self):
 		"""Update the blocks vertical position."""
@@ -100,14 +120,26 @@ class Block:
 		self.right_hit_box_rect.midleft = self.rect.midright
 		self.bottom_hit_box_rect.midtop = self.rect.midbottom
 
-	def _apply_special_block(self):
-		"""Apply attributes for special blocks."""
+	def set_special(self, special_type, blast_radius = None):
+		"""
+		Make this a special block of the given type, e.g. when restoring a
+		saved game. Type 2 blocks need their blast radius.
+		"""
+		self.special = True
+		self._apply_special_block(special_type, blast_radius)
+
+	def _apply_special_block(self, special_type = None, blast_radius = None):
+		"""
+		Apply attributes for special blocks. The type and blast radius are
+		chosen at random unless they are given.
+		"""
 		self.colour = (255, 255, 255)
 		self.image.fill(self.colour)
 
 		# Decide if type 1 or type 2 special block.
-		type_chance = random.uniform(0, 1)
-		if type_chance > 0.5:
+		if special_type:
+			self.special_type = special_type
+		elif self.rng.uniform(0, 1) > 0.5:
 			self.special_type = 1
 		else:
 			self.special_type = 2
@@ -115,11 +147,15 @@ class Block:
 		if self.special_type == 1:
 			self.text = "D"
 		elif self.special_type == 2:
-			self.blast_radius = random.randint(2, 5)
+			if blast_radius:
+				self.blast_radius = blast_radius
+			else:
+				self.blast_radius = self.rng.randint(2, 5)
 			self.text = str(self.blast_radius)
 
 		self.text_colour = (0, 0, 0)
-		self.font = pygame.font.SysFont(None, 48)
+		self.font = fonts.get_font(self.settings.font_name,
+								 self.settings.block_font_size)
 
 		self.label_image = self.font.render(self.text, True, self.text_colour,
 											self.colour)
@@ -0,0 +1,74 @@
+import pygame
+
+import fonts
+from block_codes import SPECIAL
+
+class BlockAtlas:
+	"""
+	Class to hold one image with a picture of every kind of block, so that
+	many blocks can be drawn from the same image with Surface.blits().
+	"""
+
+	# Text on the special blocks: "D" blocks and blast radius 2 to 5 blocks.
+	special_block_texts = ["D", "2", "3", "4", "5"]
+
+	def __init__(self, settings, block_size = None):
+		"""
+		Draw every kind of block into the atlas image. The blocks are drawn
+		at the given size in pixels, e.g. for a window that has been
+		resized, else at the size in the settings.
+		"""
+		self.settings = settings
+		block_width = self.settings.block_width
+		block_height = self.settings.block_height
+		font_size = self.settings.block_font_size
+		if block_size:
+			font_size = max(1, font_size * block_size // block_width)
+			block_width = block_height = block_size
+
+		number_of_kinds = (len(self.settings.block_colours)
+						   + len(self.special_block_texts))
+		self.image = pygame.Surface((block_width * number_of_kinds,
+									 block_height))
+
+		# Dictionary of the area of the image for each kind of block,
+		#	keyed by colour for standard blocks and text for special blocks.
+		self.areas = {}
+
+		for number, colour in enumerate(self.settings.block_colours):
+			area = pygame.Rect(number * block_width, 0,
+							   block_width, block_height)
+			self.image.fill(colour, area)
+			self.areas[colour] = area
+
+		# Special blocks are white with black text, as drawn by Block.
+		special_colour = (255, 255, 255)
+		text_colour = (0, 0, 0)
+		font = fonts.get_font(self.settings.font_name, font_size)
+		first_special = len(self.settings.block_colours)
+		for number, text in enumerate(self.special_block_texts, first_special):
+			area = pygame.Rect(number * block_width, 0,
+							   block_width, block_height)
+			self.image.fill(special_colour, area)
+			label_image = font.render(text, True, text_colour, special_colour)
+			label_image_rect = label_image.get_rect()
+			label_image_rect.center = area.center
+			# Draw label through a subsurface so it can't spill into the
+			#	areas of other blocks.
+			self.image.subsurface(area).blit(label_image,
+				label_image_rect.move(-area.x, -area.y))
+			self.areas[text] = area
+
+	def get_area(self, block):
+		"""Return the area of the atlas image that shows the block."""
+		if block.special:
+			return self.areas[block.text]
+		return self.areas[block.colour]
+
+	def get_code_area(self, code):
+		"""Return the area of the atlas image for a block code."""
+		if code == SPECIAL:
+			return self.areas["D"]
+		if code > SPECIAL:
+			return self.areas[str(code - SPECIAL)]
+		return self.areas[self.settings.block_colours[code - 1]]
\ No newline at end of file
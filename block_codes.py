@@ -0,0 +1,50 @@
+"""
+Codes that store the kind of a block in a single byte, used to store
+boards compactly, e.g. in saved games.
+"""
+
+# Code for a grid position with no block in it.
+EMPTY = 0
+
+# Standard blocks are 1 plus the index of their colour in
+#	settings.block_colours.
+
+# Type 1 ("D") special blocks. Type 2 special blocks are this code plus
+#	their blast radius.
+SPECIAL = 0x40
+
+
+def is_block_code(settings, code):
+	"""Return True if a code is EMPTY or the code of a kind of block."""
+	return code <= len(settings.block_colours) or code >= SPECIAL
+
+
+def get_block_code(settings, block):
+	"""Return the code for a block, or EMPTY if there is no block."""
+	if not block:
+		return EMPTY
+	if block.special:
+		if block.special_type == 1:
+			return SPECIAL
+		return SPECIAL + block.blast_radius
+	return settings.block_colours.index(block.colour) + 1
+
+
+def make_block(cm_game, code):
+	"""
+	Return a block from the game's block pool for a code. Raises ValueError
+	if the code isn't the code of a block.
+	"""
+	if code == EMPTY:
+		return None
+	if not is_block_code(cm_game.settings, code):
+		raise ValueError(f"Unknown block code: {code}")
+	if code >= SPECIAL:
+		block = cm_game.block_pool.get_block(colour = (255, 255, 255))
+		if code == SPECIAL:
+			block.set_special(1)
+		else:
+			block.set_special(2, code - SPECIAL)
+		return block
+	return cm_game.block_pool.get_block(
+								colour = cm_game.settings.block_colours[code - 1])
\ No newline at end of file
@@ -0,0 +1,80 @@
+from block import Block
+
+class BlockPool:
+	"""
+	Class to recycle blocks that have left the game so they can be reused
+	instead of creating new blocks (and their surfaces) all the time.
+	"""
+
+	def __init__(self, cm_game):
+		"""Initialise the pool and its statistics."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+
+		# Blocks waiting to be reused.
+		self.free_blocks = []
+
+		# Free blocks to keep ready so blocks don't need creating during a
+		#	frame: enough for a new game's pile, a new row and the buffer.
+		self.spare_blocks = min(
+			(self.settings.starting_rows + 1) * self.settings.blocks_per_row
+			+ self.settings.buffer_size, self.settings.block_pool_size)
+
+		# Statistics for how blocks have been supplied and returned.
+		self.blocks_created = 0
+		self.blocks_reused = 0
+		self.blocks_released = 0
+		self.blocks_discarded = 0
+		self.blocks_prefetched = 0
+
+	def get_block(self, colour = None):
+		"""
+		Return a block ready to enter the game, reusing a free block if
+		there is one. Takes the same colour argument as Block.
+		"""
+		if self.free_blocks:
+			block = self.free_blocks.pop()
+			block.reset(colour)
+			self.blocks_reused += 1
+		else:
+			block = Block(self.cm_game, colour)
+			self.blocks_created += 1
+
+		block.in_pool = False
+		return block
+
+	def release_block(self, block):
+		"""Return a block that is no longer in the game to the pool."""
+		# Ignore blocks that have already been returned to the pool.
+		if getattr(block, 'in_pool', False):
+			return
+
+		block.in_pool = True
+		if len(self.free_blocks) < self.settings.block_pool_size:
+			self.free_blocks.append(block)
+			self.blocks_released += 1
+		else:
+			# Pool is full so leave the block to be garbage collected.
+			self.blocks_discarded += 1
+
+	def needs_spare_blocks(self):
+		"""Return True if fewer than spare_blocks free blocks are ready."""
+		return len(self.free_blocks) < self.spare_blocks
+
+	def make_spare_block(self):
+		"""Create a block ahead of need and add it to the free blocks."""
+		block = Block(self.cm_game, reset = False)
+		block.in_pool = True
+		self.free_blocks.append(block)
+		self.blocks_prefetched += 1
+
+	def get_stats(self):
+		"""Return a dictionary of the pool's statistics."""
+		return {
+			'created': self.blocks_created,
+			'reused': self.blocks_reused,
+			'released': self.blocks_released,
+			'discarded': self.blocks_discarded,
+			'prefetched': self.blocks_prefetched,
+			'free': len(self.free_blocks),
+			}
\ No newline at end of file
@@ -0,0 +1,63 @@
+# Kinds of change made to a game's board. Each event is a tuple of its kind
+#	followed by its values.
+CELL_SET = 0			# Grid position and the block put there.
+CELL_CLEARED = 1		# Grid position and the block taken from it.
+BLOCK_FELL = 2			# Position fallen from, position landed in and block.
+BLOCK_FALLING = 3		# Grid position and the block that started to fall.
+ROW_PUSHED = 4			# No values. Every block moves up one row.
+SPECIAL_ACTIVATED = 5	# Special type and number of blocks it removed.
+SCORE_CHANGED = 6		# Points added to the score.
+
+# Kinds of event that change the grid position given as their first value.
+position_kinds = (CELL_SET, CELL_CLEARED, BLOCK_FELL, BLOCK_FALLING)
+
+
+class BoardEvents:
+	"""
+	Class to collect the changes made to a game's board into a batch, so
+	everything that draws, indexes, logs or sends the board can learn what
+	changed without looking through the whole grid.
+
+	The batch is handed to every subscriber when the game dispatches it:
+	when the pile is checked, at the end of each tick and before the board
+	is drawn. Subscribers have a board_changed(events) method.
+	"""
+
+	def __init__(self):
+		"""Initialise an empty batch with no subscribers."""
+		self.events = []
+		self.subscribers = []
+
+	def subscribe(self, subscriber):
+		"""Hand every batch of events from now on to a subscriber."""
+		self.subscribers.append(subscriber)
+
+	def emit(self, *event):
+		"""Add an event, given as its kind and then its values, to the batch."""
+		self.events.append(event)
+
+	def dispatch(self):
+		"""Hand the batch to every subscriber and start a new one."""
+		if not self.events:
+			return
+		events = self.events
+		self.events = []
+		for subscriber in self.subscribers:
+			subscriber.board_changed(events)
+
+
+def get_changed_positions(events):
+	"""
+	Return the set of grid positions changed by a batch of events, or None
+	if a row was pushed, as that changes every position.
+	"""
+	positions = set()
+	for event in events:
+		kind = event[0]
+		if kind == ROW_PUSHED:
+			return None
+		if kind in position_kinds:
+			positions.add(event[1])
+			if kind == BLOCK_FELL:
+				positions.add(event[2])
+	return positions
\ No newline at end of file
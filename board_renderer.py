@@ -0,0 +1,52 @@
+class BoardRenderer:
+	"""
+	Class to draw the blocks of one or more games onto a screen with a
+	single Surface.blits() call. Each game's settled pile is drawn from its
+	PileLayer and moving blocks are drawn from a shared BlockAtlas.
+	"""
+
+	def __init__(self, screen, atlas):
+		"""Initialise the renderer."""
+		self.screen = screen
+		self.atlas = atlas
+
+	def draw_boards(self, boards):
+		"""
+		Draw the blocks of all the boards. Boards are a list of
+		(game, offset) pairs, where offset is the (x, y) position on the
+		screen of the top left of that game's board.
+		"""
+		blits = []
+		for cm_game, offset in boards:
+			self._add_board_blits(cm_game, offset, blits)
+		self.screen.blits(blits, doreturn = False)
+
+	def _add_board_blits(self, cm_game, offset, blits):
+		"""
+		Add the blits for a game's pile, falling, buffer and current blocks.
+		"""
+		atlas_image = self.atlas.image
+		get_area = self.atlas.get_area
+		offset_x, offset_y = offset
+		board_rect = cm_game.screen_rect
+
+		# Settled pile blocks are drawn from the game's pile layer.
+		cm_game.pile_layer.update()
+		blits.append((cm_game.pile_layer.image, offset))
+
+		# Unsupported blocks that are falling.
+		for block in cm_game.unsupported_blocks.values():
+			blits.append((atlas_image, (block.rect.x + offset_x,
+				block.rect.y + offset_y), get_area(block)))
+
+		# Buffer blocks at the top right of the board,
+		#	in the same place as ColourMatch._display_buffer_blocks().
+		for number, block in enumerate(cm_game.buffer):
+			position = (board_rect.right - block.rect.width + offset_x,
+				(number + 1) * cm_game.settings.block_height + offset_y)
+			blits.append((atlas_image, position, get_area(block)))
+
+		if cm_game.setup_completed:
+			block = cm_game.current_block
+			blits.append((atlas_image, (block.rect.x + offset_x,
+				block.rect.y + offset_y), get_area(block)))
\ No newline at end of file
@@ -1,4 +1,6 @@
-import pygame.freetype
+import pygame
+
+import fonts
 
 class Button:
 	"""Class to create buttons for displaying in game text and options."""
@@ -8,12 +10,13 @@ class Button:
 		"""Initialise button attributes."""
 		self.screen = cm_game.screen
 		self.screen_rect = self.screen.get_rect()
+		self.settings = cm_game.settings
 
 		# Set the dimensions and properties of the button.
 		self.width, self.height = button_width, button_height
 		self.button_colour = (255, 255, 255)
 		self.text_colour = (0, 0, 0)
-		self.font = pygame.freetype.SysFont(None, font_size)
+		self.font_size = font_size
 
 		# Build the buttons rect object and centre it as default option or
 		# 	position on screen at coordinates provided.
@@ -24,11 +27,17 @@ class Button:
 		if y_position:
 			self.rect.y = y_position
 
-		# Prepare the message to be displayed on the button.
-		self.prep_msg(msg)
+		# Store the message to be displayed on the button. The font is only
+		#	loaded and the text rendered the first time the button is drawn.
+		self.msg = msg
+		self.msg_tuples = None
 
 	def prep_msg(self, msg):
 		"""Turn msg into a rendered image and centre text on the button."""
+		self.msg = msg
+		self.font = fonts.get_freetype_font(self.settings.font_name,
+											self.font_size)
+
 		# Freetype Render returns a tuple in the form: (Surface/Image, Rect)
 		#	Make a list to store these for each line of text.
 		self.msg_tuples = []
@@ -40,6 +49,10 @@ class Button:
 			self.msg_tuples.append(current_line)
 
 	def draw_button(self):
+		# Render the message if this is the first time button is displayed.
+		if self.msg_tuples is None:
+			self.prep_msg(self.msg)
+
 		# Draw blank button and then draw message.
 		self.screen.fill(self.button_colour, self.rect)
 		for line in self.msg_tuples:
@@ -1,31 +1,87 @@
 import sys
 import random
+import struct
+import argparse
 
 import pygame
+import pygame.font
+import pygame.freetype
 
 from settings import Settings
 from game_stats import GameStats
 from scoreboard import Scoreboard
-from block import Block
+from block_pool import BlockPool
+from row_generator import RowGenerator
+from pile_layer import PileLayer
+from pile_index import PileIndex
+import board_events
+from board_events import BoardEvents
+from save_file import SaveFile
+from puzzle_pack import PuzzlePack
+from io_worker import IOWorker
+from replay import Replay
+from score_submission import ScoreSubmission
+import telemetry
+from telemetry import Telemetry
+import particles
+from particles import ParticlePool
+from block_codes import SPECIAL, get_block_code, make_block
+from spectator import SpectatorServer
+from latency_tracer import LatencyTracer
+from frame_scheduler import FrameScheduler
+from simulation_thread import SimulationThread
+from render_snapshot import SnapshotPublisher
+from snapshot_renderer import SnapshotRenderer
 from button import Button
 from instruction_card import InstructionCard
 
 class ColourMatch:
 	"""Class to define the game 'Colour Match'"""
 
-	def __init__(self):
-		"""Initialise the game and create game resources."""
-		pygame.init()
-
-		self.settings = Settings()
+	def __init__(self, settings = None, screen = None):
+		"""
+		Initialise the game and create game resources. Settings can be
+		given to change the game, e.g. to play on a different board size.
+		A screen surface can be given for the game to be drawn onto instead
+		of opening its own window, e.g. one board in a window of several.
+		"""
+		# Only initialise the pygame modules the game uses.
+		#	(pygame.init() also starts the audio and joystick modules)
+		pygame.display.init()
+		pygame.font.init()
+		pygame.freetype.init()
+
+		if settings:
+			self.settings = settings
+		else:
+			self.settings = Settings()
 		self.stats = GameStats(self)
 
-		self.screen = pygame.display.set_mode((self.settings.screen_width,
-											   self.settings.screen_height))
+		# A resizable window is drawn from snapshots of the game scaled to
+		#	fit, so the game itself is played on a screen of its own size.
+		#	(Clear, so the buttons can be drawn onto it to be scaled)
+		self.window = None
+		if screen:
+			self.screen = screen
+		elif self.settings.resizable_window:
+			screen_size = (self.settings.screen_width,
+						   self.settings.screen_height)
+			self.window = pygame.display.set_mode(screen_size,
+												  pygame.RESIZABLE)
+			pygame.display.set_caption("Colour Match")
+			self.screen = pygame.Surface(screen_size, pygame.SRCALPHA)
+		else:
+			self.screen = pygame.display.set_mode(
+				(self.settings.screen_width, self.settings.screen_height))
+			pygame.display.set_caption("Colour Match")
 		self.screen_rect = self.screen.get_rect()
-		pygame.display.set_caption("Colour Match")
+
+		# Initialise the batch of changes made to the board, which everything
+		#	that draws, indexes, logs or sends the board subscribes to.
+		self.board_events = BoardEvents()
 
 		self.sb = Scoreboard(self)
+		self.board_events.subscribe(self.sb)
 
 		# Initialise the variable used to check for new high scores.
 		#	Starting place one lower than lowest place that will be recorded.
@@ -36,6 +92,102 @@ class ColourMatch:
 		# Initialise the grid that holds the blocks during the game.
 		self.grid = self._create_grid()
 
+		# Initialise the random number generator used for the game's blocks.
+		#	Each game has its own so its state can be saved and restored.
+		self.rng = random.Random()
+
+		# Initialise the pool that recycles blocks after they are removed.
+		self.block_pool = BlockPool(self)
+
+		# Initialise the generator for rows of blocks added to the pile.
+		self.row_generator = RowGenerator(self.settings, self.rng)
+
+		# Open the puzzle pack the starting piles come from, if one is set.
+		#	Each puzzle is read from it when the puzzle is played.
+		self.puzzle_pack = None
+		if self.settings.puzzle_pack_filename:
+			self.puzzle_pack = PuzzlePack(self.settings.puzzle_pack_filename)
+			if (self.puzzle_pack.blocks_per_row != self.settings.blocks_per_row
+				or self.puzzle_pack.blocks_per_column
+				!= self.settings.blocks_per_column):
+				raise ValueError("Puzzle pack is for a different board size.")
+
+		# Initialise the image of the pile that is drawn each frame.
+		self.pile_layer = PileLayer(self)
+		self.board_events.subscribe(self.pile_layer)
+
+		# Initialise the index of the rects of the blocks in the pile, used
+		#	for collision detection.
+		self.pile_index = PileIndex(self)
+		self.board_events.subscribe(self.pile_index)
+
+		# Stream the game to spectators if an address has been set.
+		self.spectator_server = None
+		if self.settings.spectator_address:
+			self.spectator_server = SpectatorServer(
+									self, self.settings.spectator_address)
+			self.board_events.subscribe(self.spectator_server)
+			self.spectator_server.start()
+
+		# Initialise a set to hold the grid positions that have changed
+		#	since the pile was last checked.
+		self.changed_positions = set()
+
+		# Initialise the worker that writes files in the background.
+		self.io_worker = IOWorker()
+
+		# Initialise the file that in-progress games are saved to.
+		self.save_file = SaveFile(self)
+
+		# Record each game to be played back if a file has been set.
+		self.replay = None
+		if self.settings.replay_filename:
+			self.replay = Replay(self, self.settings.replay_filename)
+
+		# Submit games that make the high score table with the seed and keys
+		#	needed to verify their scores, if a file has been set.
+		self.score_submission = None
+		if self.settings.submission_filename:
+			self.score_submission = ScoreSubmission(
+									self, self.settings.submission_filename)
+
+		# Log the events of each game if a file has been set.
+		self.telemetry = None
+		if self.settings.telemetry_filename:
+			self.telemetry = Telemetry(self, self.settings.telemetry_filename)
+			self.board_events.subscribe(self.telemetry)
+
+		# Trace how long key presses take to show on screen if asked to.
+		#	(Keys are handled on the simulation thread in threaded mode,
+		#	which records its own input latency)
+		self.latency_tracer = None
+		if (self.settings.trace_input_latency
+			and not self.settings.threaded_simulation):
+			self.latency_tracer = LatencyTracer()
+
+		# Initialise the scheduler that runs work the game doesn't depend on
+		#	in the time left over in each frame. In threaded mode it runs on
+		#	the simulation thread in the time left over in each tick.
+		budget_ms = self.settings.frame_budget_ms
+		if self.settings.threaded_simulation:
+			budget_ms = min(budget_ms,
+							1000 / self.settings.simulation_tick_rate)
+		self.frame_scheduler = FrameScheduler(budget_ms)
+
+		# Show particle effects when blocks are removed. They are drawn onto
+		#	the game's screen, so not when the game is drawn from snapshots.
+		self.particles = None
+		if (self.settings.particle_effects
+			and not self.settings.threaded_simulation and not self.window):
+			self.particles = ParticlePool(self)
+
+		# Initialise the number of frames the game has been played for.
+		self.game_ticks = 0
+
+		# Seed of the game's blocks, chosen when the game is set up unless
+		#	it is given, e.g. to play a submitted game again.
+		self.game_seed = None
+
 		# Initialise the timer for adding new rows to the pile.
 		self.new_row_timer = 0
 
@@ -49,111 +201,340 @@ class ColourMatch:
 		# Initialise a buffer to hold the next few blocks the player will get.
 		self.buffer = []
 
+		# The block the player is moving is set when the game starts.
+		self.current_block = None
+
 		# Initialise dictionary to hold blocks that are 
 		# no longer supported by blocks below.
 		self.unsupported_blocks = {}
 
-		# Initialise list for storing the rects of all blocks in the pile.
-		self.pile_block_rects = []
-
 		# Create all the buttons used to display text in the game.
 		self._create_buttons()
 
-		# Create an instruction card for the game.
-		self.instruction_card = InstructionCard(self)
+		# The instruction card is created the first time it is displayed.
+		self.instruction_card = None
+
+		# Prepare text and blocks ahead of need in leftover frame time. (In
+		#	threaded mode text is drawn on the main thread, so it is left to
+		#	be rendered there)
+		if not self.settings.threaded_simulation:
+			self._prefetch_text()
+		self._prefetch_blocks()
 
 	def run_game(self):
 		"""Start the main loop for the game."""
+		if self.settings.threaded_simulation:
+			self._run_threaded_game()
+		elif self.window:
+			self._run_resizable_game()
+
 		while True:
+			self.frame_scheduler.start_frame()
 			self._check_events()
+			self._update_game()
+			self._update_screen()
+			self.frame_scheduler.run_deferred()
 
-			if (self.settings.game_active 
-				and self.settings.difficulty_selected 
-				and not self.settings.game_paused):
-
-				# Do this setup section only once when game begins:
-				if not self.setup_completed:
-					self.settings.set_difficulty()
-
-					# Create an initial pile and buffer of blocks.
-					self._create_starting_blocks()
-					self._create_buffer_blocks()
-
-					# Start the first block falling to begin the game
-					#	and apply its random starting position.
-					self.current_block = self.buffer[0]
-					self.current_block.rect.x = (self.settings.block_width *
-						self.current_block.random_start_position)
-
-					self._update_buffer_blocks()
-
-					self.setup_completed = True
-
-				self._update_current_block()
-				self._check_blocks_for_match()
-				self._delete_blocks()
-
-				self._apply_grid_positions()
-				self._get_pile_block_rects()
-
-				self._check_for_unsupported_blocks()
-				self._update_unsupported_blocks()				
-
-				self._check_end_conditions()
+	def _run_threaded_game(self):
+		"""
+		Simulate the game on its own thread at a fixed tick rate while this
+		thread handles the window, drawing the latest snapshot of the game.
+		"""
+		simulation_thread = SimulationThread(self,
+										self.settings.simulation_tick_rate)
+		renderer = SnapshotRenderer(self, self.window)
+		simulation_thread.start()
 
-				# Check if time to add new row to pile.
-				self.new_row_timer += 1
-				if self.new_row_timer >= self.settings.new_row_time_limit:
-					self._add_new_row()
-					self.new_row_timer = 0
+		drawn_snapshot = None
+		while True:
+			# Events can only be read on the main thread, so they are passed
+			#	on to the simulation. Quitting stops the simulation first so
+			#	the game can be saved.
+			for event in pygame.event.get():
+				if (event.type == pygame.QUIT
+					or (event.type == pygame.KEYDOWN
+						and event.key in (pygame.K_q, pygame.K_ESCAPE))):
+					simulation_thread.stop()
+					self._quit_game()
+				event = renderer.convert_event(event)
+				if event:
+					simulation_thread.queue_event(event)
+
+			if simulation_thread.error:
+				raise simulation_thread.error
+
+			# Only draw when there is a new snapshot to show.
+			snapshot = simulation_thread.get_snapshot()
+			if snapshot is drawn_snapshot:
+				pygame.time.wait(1)
+				continue
+			renderer.draw(snapshot)
+			pygame.display.flip()
+			drawn_snapshot = snapshot
 
-			self._update_screen()
+	def _update_game(self):
+		"""Move the game on by one frame while it is being played."""
+		if (not self.settings.game_active
+			or not self.settings.difficulty_selected
+			or self.settings.game_paused):
+			return
+
+		# Do this setup section only once when game begins:
+		if not self.setup_completed:
+			# Puzzles are played at the difficulty their piles were made
+			#	for, as their blocks may use every colour of it.
+			if self.puzzle_pack:
+				self.settings.difficulty = self.puzzle_pack.difficulty
+			self.settings.set_difficulty()
+
+			# Each game's blocks come from a seed of its own, so the game
+			#	can be played again from its seed and keys.
+			if self.game_seed is None:
+				self.game_seed = self.rng.getrandbits(63)
+			self.rng.seed(self.game_seed)
+			# Puzzles don't start from a seed alone so can't be submitted.
+			if self.score_submission and not self.puzzle_pack:
+				self.score_submission.start_recording()
+
+			# Create an initial pile and buffer of blocks.
+			self._create_starting_blocks()
+			self._create_buffer_blocks()
+
+			# Start the first block falling to begin the game.
+			self._start_next_block()
+
+			self.game_ticks = 0
+			if self.telemetry:
+				self.telemetry.start_game(self.settings.difficulty)
+
+			self.setup_completed = True
+		elif self.replay and not self.replay.recording:
+			# Recording starts from the game's state between two frames.
+			self.replay.start_recording()
+
+		if self.replay:
+			self.replay.record_tick()
+		if self.score_submission:
+			self.score_submission.record_tick()
+		self.game_ticks += 1
+
+		# Particles move with the game, so they stop while it is paused.
+		if self.particles:
+			self.particles.update()
+
+		self._update_current_block()
+
+		# The pile only needs to be checked after blocks have been
+		#	added to, removed from or moved within the grid.
+		if self.changed_positions:
+			self._update_pile()
+
+		self._update_unsupported_blocks()
+
+		# Check if time to add new row to pile.
+		self.new_row_timer += 1
+		if self.new_row_timer >= self.settings.new_row_time_limit:
+			self._add_new_row()
+			self.new_row_timer = 0
+
+		self.board_events.dispatch()
+		if self.spectator_server:
+			self.spectator_server.publish()
+
+	def _fast_forward(self, ticks):
+		"""
+		Play a number of ticks exactly as _update_game() would, as fast as
+		possible, e.g. to play a submitted game again to check its score.
+		Runs of ticks where nothing happens but the current block falling
+		are played without the rest of the game's update. Stops early if
+		the game ends, as later ticks wouldn't change it.
+		"""
+		while ticks > 0 and self.settings.game_active:
+			quick_ticks = self._play_quick_ticks(ticks)
+			if not quick_ticks:
+				self._update_game()
+				quick_ticks = 1
+			ticks -= quick_ticks
+
+	def _play_quick_ticks(self, ticks):
+		"""
+		Play up to a number of ticks in which the current block only falls,
+		stopping short of the tick it could land in or a new row is added.
+		Returns the number of ticks played.
+		"""
+		settings = self.settings
+		if (not settings.game_active or not settings.difficulty_selected
+			or settings.game_paused or not self.setup_completed
+			or self.changed_positions or self.unsupported_blocks
+			or self.particles or self.spectator_server
+			or (self.replay and not self.replay.recording)):
+			return 0
+
+		# The block can't land while its bottom is a pixel clear of the top
+		#	of the highest block below it in its column. (Its rect's
+		#	position is rounded from its float position, so within half a
+		#	pixel)
+		block = self.current_block
+		rect = block.rect
+		landing_bottom = self.screen_rect.bottom
+		for pile_rect in self.pile_index.column_rects.get(
+								rect.x // settings.block_width, {}).values():
+			if pile_rect.bottom > rect.bottom:
+				landing_bottom = min(landing_bottom, pile_rect.top)
+		last_y = landing_bottom - rect.height - 1
+		time_limit = settings.new_row_time_limit
+
+		speed = settings.block_speed
+		y = block.y
+		new_row_timer = self.new_row_timer
+		played = 0
+		while (played < ticks and y + speed < last_y
+			   and new_row_timer + 1 < time_limit):
+			y += speed
+			new_row_timer += 1
+			played += 1
+		if not played:
+			return 0
+
+		block.y = y
+		rect.y = y
+		block.align_hit_boxes()
+		if block.special:
+			block.label_image_rect.center = rect.center
+		self.new_row_timer = new_row_timer
+		self.game_ticks += played
+		for recording in (self.replay, self.score_submission):
+			if recording and recording.recording:
+				recording.ticks += played
+		return played
+
+	def _update_pile(self):
+		"""Check the pile after positions in the grid have changed."""
+		changed_positions = self.changed_positions
+		self._check_blocks_for_match(changed_positions)
+
+		# Deleted blocks are added to the changed positions so that blocks
+		#	above them are found to be unsupported below.
+		self._delete_blocks()
+		self.changed_positions = set()
+
+		self._update_pile_index()
+
+		self._check_for_unsupported_blocks(changed_positions)
+
+		self._check_end_conditions()
+
+	def _run_resizable_game(self):
+		"""
+		Play the game in a resizable window, drawing a snapshot of the game
+		scaled to fit the window after each frame.
+		"""
+		publisher = SnapshotPublisher(self)
+		renderer = SnapshotRenderer(self, self.window)
+		while True:
+			self.frame_scheduler.start_frame()
+			events = pygame.event.get()
+			if self.latency_tracer:
+				self.latency_tracer.stamp_events(events)
+			for event in events:
+				event = renderer.convert_event(event)
+				if event:
+					self._handle_event(event)
+			self._update_game()
+			publisher.publish(self.game_ticks)
+			renderer.draw(publisher.get_snapshot())
+			pygame.display.flip()
+			if self.latency_tracer:
+				self.latency_tracer.frame_shown()
+			self.frame_scheduler.run_deferred()
 
 	def _check_events(self):
 		"""Respond to keypresses and mouse events."""
-		for event in pygame.event.get():
-			if event.type == pygame.QUIT:
-				self._save_high_score()
-				sys.exit()
-			elif event.type == pygame.KEYDOWN:
-				self._check_keydown_events(event)
-			elif event.type == pygame.KEYUP:
-				self._check_keyup_events(event)
-			elif event.type == pygame.MOUSEBUTTONDOWN:
-				mouse_pos = pygame.mouse.get_pos()
-				if (not self.settings.game_active 
-				   	and not self.settings.difficulty_selected
-				   	and not self.settings.display_instructions
-				   	and not self.settings.display_high_scores):
-					self._check_title_screen_buttons(mouse_pos)
-				elif (not self.settings.game_active 
-					  and not self.settings.difficulty_selected 
-					  and (self.settings.display_instructions 
-					  	   or self.settings.display_high_scores)):
-					self._check_close_button(mouse_pos)
-				elif (self.settings.game_active 
-					  and not self.settings.difficulty_selected):
-					self._check_difficulty_buttons(mouse_pos)
-				elif self.settings.game_over or self.settings.game_won:
-					self._check_replay_button(mouse_pos)
-					
+		events = pygame.event.get()
+		if self.latency_tracer:
+			self.latency_tracer.stamp_events(events)
+		for event in events:
+			self._handle_event(event)
+
+	def _handle_event(self, event):
+		"""Respond to a keypress or mouse event."""
+		if event.type == pygame.QUIT:
+			self._quit_game()
+		elif event.type == pygame.KEYDOWN:
+			if self.replay:
+				self.replay.record_key(event)
+			if self.score_submission:
+				self.score_submission.record_key(event)
+			self._check_keydown_events(event)
+		elif event.type == pygame.KEYUP:
+			if self.replay:
+				self.replay.record_key(event)
+			if self.score_submission:
+				self.score_submission.record_key(event)
+			self._check_keyup_events(event)
+		elif event.type == pygame.MOUSEBUTTONDOWN:
+			# Position is taken from the event as it may be handled on the
+			#	simulation thread after the mouse has moved on.
+			mouse_pos = event.pos
+			if (not self.settings.game_active 
+			   	and not self.settings.difficulty_selected
+			   	and not self.settings.display_instructions
+			   	and not self.settings.display_high_scores):
+				self._check_title_screen_buttons(mouse_pos)
+			elif (not self.settings.game_active 
+				  and not self.settings.difficulty_selected 
+				  and (self.settings.display_instructions 
+				  	   or self.settings.display_high_scores)):
+				self._check_close_button(mouse_pos)
+			elif (self.settings.game_active 
+				  and not self.settings.difficulty_selected):
+				self._check_difficulty_buttons(mouse_pos)
+			elif self.settings.game_over or self.settings.game_won:
+				self._check_replay_button(mouse_pos)
+
+	def _quit_game(self):
+		"""Save everything that needs keeping and exit the game."""
+		self._save_game()
+		self._save_high_score()
+		if self.replay:
+			self.replay.stop_recording()
+		if self.score_submission:
+			self.score_submission.stop_recording()
+		if self.telemetry:
+			self.telemetry.flush()
+		if self.spectator_server:
+			self.spectator_server.stop()
+		if self.latency_tracer:
+			for line in self.latency_tracer.get_report():
+				print(line)
+		if self.settings.show_frame_stats:
+			for line in self.frame_scheduler.get_report():
+				print(line)
+		# Wait for the files to be written before exiting.
+		self.io_worker.stop()
+		for line in self.io_worker.get_report():
+			print(line)
+		sys.exit()
+
 	def _check_keydown_events(self, event):
 		"""Respond to keypresses."""
+		if self.latency_tracer:
+			self.latency_tracer.key_handled(event)
+
 		if event.key == pygame.K_RIGHT:
 			if (self.current_block.right_hit_box_rect\
-				.collidelist(self.pile_block_rects) == -1
+				.collidedict(self.pile_index.rects, True) is None
 				and self.settings.game_active):
 				self.current_block.move_block_right()
 		elif event.key == pygame.K_LEFT:
 			if (self.current_block.left_hit_box_rect\
-				.collidelist(self.pile_block_rects) == -1
+				.collidedict(self.pile_index.rects, True) is None
 				and self.settings.game_active):
 				self.current_block.move_block_left()
 		elif event.key == pygame.K_DOWN:
 			self.settings.block_speed *= 2
 		elif event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
-			self._save_high_score()
-			sys.exit()
+			self._quit_game()
 		elif event.key == pygame.K_p:
 			if (self.settings.game_active
 				and self.settings.difficulty_selected):
@@ -168,29 +549,67 @@ class ColourMatch:
 		"""Check if player has scored enough points to speed up game."""
 		if self.stats.score > self.settings.points_to_increase_speed:
 			self.settings.speed_up_game()
+			if self.telemetry:
+				self.telemetry.record(telemetry.SPEED_UP, self.stats.score)
 			self.settings.points_to_increase_speed\
 							 += self.settings.point_intervals_to_increase_speed
 
 	def _check_end_conditions(self):
 		"""Check the "game over" and "game won" conditions for the game."""
 		# If all blocks deleted = game won
-		if all(value == None for value in self.grid.values()):
+		if self.pile_index.is_empty():
 			self.settings.game_active = False
 			self.settings.game_won = True
 
 		# If a pile block reaches top of screen = game over
-		for position, block in self.grid.items():
-			if block:
-				if position[1] == (self.settings.blocks_per_column - 1):
-					self.settings.game_active = False
-					self.settings.game_over = True
+		if self.pile_index.row_has_blocks(self.settings.blocks_per_column - 1):
+			self.settings.game_active = False
+			self.settings.game_over = True
+
+		if self.settings.game_won or self.settings.game_over:
+			# A game that has ended can't be resumed. (Games that don't
+			#	autosave, e.g. replays, leave the save file alone)
+			if self.settings.autosave:
+				self.save_file.delete()
+			if self.replay:
+				self.replay.stop_recording()
+			if self.score_submission:
+				self.score_submission.stop_recording()
+			if self.telemetry:
+				if self.settings.game_won:
+					self.telemetry.record(telemetry.GAME_WON, self.stats.score)
+				else:
+					self.telemetry.record(telemetry.GAME_OVER,
+										  self.stats.score)
+				# Events are written once the frame has time to spare.
+				self.frame_scheduler.defer("telemetry", self.telemetry.flush)
+
+	# Save + resume methods
+
+	def _save_game(self):
+		"""Save the game so it can be resumed, if one is being played."""
+		if (self.setup_completed and self.settings.game_active
+			and self.settings.difficulty_selected):
+			self.save_file.save()
+
+	def _resume_game(self):
+		"""Resume the saved game."""
+		try:
+			self.save_file.load()
+		except (OSError, ValueError, struct.error):
+			# Saved game can't be read so get rid of it.
+			self.save_file.delete()
+			self._clear_blocks()
+			self.settings.game_active = False
+			self.settings.difficulty_selected = False
 
 	# Score methods
 
 	def _update_score(self):
 		"""Add to score and update."""
 		self.stats.score += 1
-		self.sb.prep_score()
+		# Score is rendered again once for each batch of changes.
+		self.board_events.emit(board_events.SCORE_CHANGED, 1)
 		self._check_high_score()
 		self._check_speed_up_criteria()
 
@@ -227,8 +646,10 @@ class ColourMatch:
 		self.stats.high_scores.insert(new_place - 1, new_high_score)
 		# Delete the lowest previous high score from end of list.
 		del self.stats.high_scores[-1]
-		# Prep updated high scores for display.
-		self.sb.prep_high_score()
+		# Updated high scores are rendered for display in leftover frame
+		#	time, or when they are next displayed if that is sooner.
+		self.sb.high_score_images = None
+		self.frame_scheduler.defer("high scores", self._prep_high_scores)
 
 		# Create a list of score strings to write to a file.
 		lines = []
@@ -236,11 +657,10 @@ class ColourMatch:
 			high_score_string = str(high_score)
 			lines.append(high_score_string)
 
+		# File is written by the background I/O worker.
 		filename = 'high_score.txt'
-		with open(filename, 'w') as file_object:
-			for line in lines:
-				file_object.write(line)
-				file_object.write("\n")
+		data = "".join(line + "\n" for line in lines)
+		self.io_worker.write_file(filename, data.encode())
 
 	# Create + check buttons
 
@@ -250,6 +670,8 @@ class ColourMatch:
 		# Create the title screen for the start of the game.
 		self.title = Button(
 			self, ["Colour Match"], y_position = 200, button_width = 300)
+		self.resume_button = Button(
+			self, ["Resume Game"], y_position = 300, button_width = 300)
 		self.play_button = Button(
 			self, ["Click to Play"], y_position = 400, button_width = 300)
 		self.display_instructions = Button(
@@ -286,14 +708,57 @@ class ColourMatch:
 		# Create a close button.
 		self.close = Button(self, ["Close"], y_position = 600)
 
+	def _prefetch_text(self):
+		"""
+		Render the text of every screen in leftover frame time, so a screen
+		being shown for the first time doesn't hold up its frame.
+		"""
+		for button in (self.title, self.resume_button, self.play_button,
+					   self.display_instructions, self.display_high_scores,
+					   self.select_difficulty, self.easy_button,
+					   self.medium_button, self.hard_button, self.next_blocks,
+					   self.game_won, self.game_over, self.replay_button,
+					   self.paused, self.close):
+			self._prefetch_button(button)
+		self.frame_scheduler.defer("high scores", self._prep_high_scores)
+		self.frame_scheduler.defer("instruction card",
+								   self._prefetch_instruction_card)
+
+	def _prefetch_button(self, button):
+		"""Render a button's text in leftover frame time."""
+		self.frame_scheduler.defer(button, self._prep_button, button)
+
+	def _prep_button(self, button):
+		"""Render a button's text unless it was drawn before the task ran."""
+		if button.msg_tuples is None:
+			button.prep_msg(button.msg)
+
+	def _prep_high_scores(self):
+		"""Render the high scores unless they were displayed already."""
+		if self.sb.high_score_images is None:
+			self.sb.prep_high_score()
+
+	def _prefetch_instruction_card(self):
+		"""Create the instruction card and render its text later on."""
+		if not self.instruction_card:
+			self.instruction_card = InstructionCard(self)
+		card = self.instruction_card
+		for button in (card.title, card.how_to_play, card.controls,
+					   card.difficulty, card.special_blocks):
+			self._prefetch_button(button)
+
 	def _check_title_screen_buttons(self, mouse_pos):
 		"""Check if the player has clicked a button on the title screen."""
+		resume_button_clicked = (self.save_file.saved_game_exists
+							and self.resume_button.rect.collidepoint(mouse_pos))
 		play_button_clicked = self.play_button.rect.collidepoint(mouse_pos)
 		display_instructions_button_clicked = (
 						self.display_instructions.rect.collidepoint(mouse_pos))
 		display_high_scores_button_clicked = (
 						self.display_high_scores.rect.collidepoint(mouse_pos))
 
+		if resume_button_clicked and not self.settings.game_active:
+			self._resume_game()
 		if play_button_clicked and not self.settings.game_active:
 			self.settings.game_active = True
 		if (display_instructions_button_clicked 
@@ -336,6 +801,11 @@ class ColourMatch:
 
 	def _restart_game(self):
 		"""Restart the game after a game over/game won."""
+		# Clearing a puzzle's pile moves on to the next puzzle in the pack.
+		if self.puzzle_pack and self.settings.game_won:
+			self.settings.puzzle_number = ((self.settings.puzzle_number + 1)
+										   % len(self.puzzle_pack))
+
 		# Reset all flags to start on difficulty select menu.
 		self.settings.game_over = False
 		self.settings.game_won = False
@@ -345,13 +815,7 @@ class ColourMatch:
 		# Reset game speed to starting speed.
 		self.settings.set_initial_speed()
 
-		# Clear all existing blocks from game.
-		self.grid.clear()
-		self.buffer.clear()
-		self.current_block = None
-
-		# Clear the list of pile block rects used for collision detection.
-		self.pile_block_rects.clear()
+		self._clear_blocks()
 
 		# Reset the score.
 		self.stats.score = 0
@@ -362,6 +826,31 @@ class ColourMatch:
 
 		# Reset setup flag so game setup runs correctly.
 		self.setup_completed = False
+		self.game_seed = None
+
+	def _clear_blocks(self):
+		"""Clear all existing blocks from game and return them to the pool."""
+		for position, block in self.grid.items():
+			if block:
+				self.board_events.emit(board_events.CELL_CLEARED, position,
+									   block)
+				self.block_pool.release_block(block)
+		for block in self.buffer:
+			self.block_pool.release_block(block)
+		if self.current_block:
+			self.block_pool.release_block(self.current_block)
+		self.grid = self._create_grid()
+		self.changed_positions.update(self.grid.keys())
+		self.buffer.clear()
+		self.unsupported_blocks.clear()
+		self.current_block = None
+		if self.particles:
+			self.particles.clear()
+
+		# Subscribers are told about the cleared blocks before the index of
+		#	pile block rects used for collision detection is emptied.
+		self.board_events.dispatch()
+		self.pile_index.clear()
 
 	def _create_grid(self):
 		"""Create an empty grid for blocks to be placed into."""
@@ -376,91 +865,85 @@ class ColourMatch:
 
 	def _create_starting_blocks(self):
 		"""Create the blocks that are in the pile at the start of the game."""
-		for row_number in range(self.settings.starting_rows):
-			for block_number in range(self.settings.blocks_per_row):
-
-				# Make sure that no special blocks are in starting pile.
-				special_block = True
-				while special_block:
-					starting_block = Block(self)
-					if starting_block.special:
-						special_block = True
-					else:
-						special_block = False
-
-				# Give the starting block its position and add it to the grid.
+		if self.puzzle_pack:
+			self._create_puzzle_blocks()
+			return
+
+		# Rows are generated from the bottom up with no special blocks and
+		#	no pregame matches that would cause gaps in the starting blocks.
+		rows = self.row_generator.generate_rows(self.settings.starting_rows)
+		for row_number, row in enumerate(rows):
+			for block_number, colour_index in enumerate(row):
 				starting_block_position = (block_number, row_number)
-				self.grid[starting_block_position] = starting_block
-
-				# Make sure there are no pregame matches that will cause gaps
-				#	in the starting blocks.
-				reduced_colours = self.settings.colour_list.copy()
-
-				try:
-					# Find the blocks in the positions below the starting block.
-					block_below = self.grid[(starting_block_position[0],
-											 starting_block_position[1] - 1)]
-					block_2_below = self.grid[(starting_block_position[0],
-											   starting_block_position[1] - 2)]
-
-					# If all 3 blocks are a colour match pick a new colour for
-					#	starting block.
-					if (block_2_below.colour == block_below.colour
-						== starting_block.colour):
-						# Remove the current colour from the list of colours.
-						reduced_colours.remove(starting_block.colour)
-						# Select new colour from reduced list and apply colour.
-						starting_block.colour = random.choice(reduced_colours)
-						starting_block.image.fill(starting_block.colour)
-
-					# This check is required as do not want the second
-					# 	horizontal match check to change the colour to one
-					# 	that will cause a vertical match that will then be
-					# 	missed as this was checked first.
-					if (block_2_below.colour == block_below.colour):
-						if block_below.colour in reduced_colours:
-							reduced_colours.remove(block_below.colour)
-
-				# If block_below and/or block_2_below positions don't exist
-				#	move on to the next check.			
-				except KeyError:
-					pass
-
-				try:
-					# Find the blocks in the positions to the left 
-					#	of the starting block.
-					# 	(check to the left as blocks created from left to right)
-					block_left = self.grid[(starting_block_position[0] - 1,
-											starting_block_position[1])]
-					block_2_left = self.grid[(starting_block_position[0] - 2,
-											  starting_block_position[1])]
-
-					# If all 3 blocks are a colour match pick a new colour for
-					#	starting block.
-					if (block_2_left.colour == block_left.colour
-						== starting_block.colour):
-						reduced_colours.remove(starting_block.colour)
-						starting_block.colour = random.choice(reduced_colours)
-						starting_block.image.fill(starting_block.colour)
-
-				# If block_left and/or block_2_left positions don't exist
-				#	move on to the next starting block.
-				except KeyError:
-					pass
+				self._set_block(starting_block_position,
+								self._create_pile_block(colour_index))
+
+	def _create_puzzle_blocks(self):
+		"""
+		Create the starting pile of the puzzle being played. Raises
+		ValueError if the puzzle has blocks of colours the game isn't using.
+		"""
+		rows = self.puzzle_pack.get_rows(self.settings.puzzle_number)
+		number_of_colours = len(self.settings.colour_list)
+		for row in rows:
+			for code in row:
+				if number_of_colours < code < SPECIAL:
+					raise ValueError(f"Puzzle {self.settings.puzzle_number}"
+									 f" has an unknown block code: {code}")
+		for row_number, row in enumerate(rows):
+			for block_number, code in enumerate(row):
+				block = make_block(self, code)
+				if block:
+					self._set_block((block_number, row_number), block)
+
+	def _create_pile_block(self, colour_index):
+		"""Create a standard block from a colour index for the pile."""
+		return self.block_pool.get_block(
+								colour = self.settings.colour_list[colour_index])
+
+	def _get_row_colour_indices(self, row_number):
+		"""
+		Return the colour indices of the blocks in a row of the grid,
+		with None for positions that have no block or a block that isn't
+		one of the game's colours, e.g. a special block.
+		"""
+		colour_list = self.settings.colour_list
+		row = []
+		for x in range(self.settings.blocks_per_row):
+			block = self.grid.get((x, row_number))
+			if block and block.colour in colour_list:
+				row.append(colour_list.index(block.colour))
+			else:
+				row.append(None)
+		return row
 
 	def _create_buffer_blocks(self):
 		"""
 		Create a buffer of blocks so player can see what blocks will be next.
 		"""
 		for space in range(self.settings.buffer_size):
-			block = Block(self)
+			block = self.block_pool.get_block()
 			self.buffer.append(block)
 
 	def _update_buffer_blocks(self):
 		"""Update the buffer with each new block."""
 		del self.buffer[0] # Remove first block that has just been used.
-		new_block = Block(self)
+		new_block = self.block_pool.get_block()
 		self.buffer.append(new_block) # Add new block to end of buffer.
+		self._prefetch_blocks()
+
+	def _prefetch_blocks(self):
+		"""
+		Make spare blocks for the block pool in leftover frame time if it is
+		running low, one block each time the task runs.
+		"""
+		if self.block_pool.needs_spare_blocks():
+			self.frame_scheduler.defer("spare block", self._make_spare_block)
+
+	def _make_spare_block(self):
+		"""Make one spare block, and another later if more are needed."""
+		self.block_pool.make_spare_block()
+		self._prefetch_blocks()
 
 	def _display_buffer_blocks(self):
 		"""Show blocks in buffer at top right of the screen."""
@@ -471,26 +954,13 @@ class ColourMatch:
 				block.label_image_rect.center = block.rect.center
 			block.draw_block()
 
-	def _apply_grid_positions(self):
+	def _update_pile_index(self):
 		"""
-		Give all blocks in the pile a rect position based on their grid 
-		position so they can be displayed on screen correctly.
+		Bring the index of pile block rects up to date with the changes made
+		to the board, moving the blocks that have changed into place.
 		"""
-		for position, block in self.grid.items():
-			if block:
-				if block not in self.unsupported_blocks.values():
-					block.rect.bottom = (self.screen_rect.bottom 
-								- (position[1] * self.settings.block_height))
-					block.rect.left = (self.screen_rect.left 
-								+ (position[0] * self.settings.block_width))
-					block.y = block.rect.y
-
-	def _get_pile_block_rects(self):
-		"""Create a list of the rects of all blocks currently in the pile."""
-		self.pile_block_rects.clear()
-		for block in self.grid.values():
-			if block:
-				self.pile_block_rects.append(block.rect)
+		self.board_events.dispatch()
+		self.pile_index.update()
 
 	def _update_current_block(self):
 		"""Update the currently active block."""
@@ -499,9 +969,13 @@ class ColourMatch:
 		# If the current block hits a pile block or the bottom of the screen
 		#	then add it to the pile blocks.
 		if (self.current_block.bottom_hit_box_rect\
-			.collidelist(self.pile_block_rects) != -1
+			.collidedict(self.pile_index.rects, True) is not None
 			or self.current_block.rect.bottom >= self.screen_rect.bottom):
 
+			if self.telemetry:
+				self.telemetry.record(telemetry.LANDING,
+					get_block_code(self.settings, self.current_block))
+
 			# Assign grid position to current block based on where it landed.
 			x_position = (self.current_block.rect.x
 						  // self.settings.block_width)
@@ -515,8 +989,9 @@ class ColourMatch:
 				if self.current_block.special_type == 1:
 					try:
 						block_below = self.grid[(x_position, y_position - 1)]
-						colour_to_delete = block_below.colour
-						self._activate_special_block_1(colour_to_delete)
+						if block_below:
+							colour_to_delete = block_below.colour
+							self._activate_special_block_1(colour_to_delete)
 					# If block below does not exist move on
 					# 	without applying effect.
 					except KeyError:
@@ -525,31 +1000,59 @@ class ColourMatch:
 					blast_radius = self.current_block.blast_radius
 					self._activate_special_block_2(
 										x_position, y_position, blast_radius)
+				# Special blocks are used up once they land.
+				self.block_pool.release_block(self.current_block)
 			# If current block not a special block then add it to the grid/pile.
 			else:
-				self.grid[(x_position, y_position)] = self.current_block
+				self._set_block((x_position, y_position), self.current_block)
 			
-			# Take new current block from start of the buffer and
-			#	apply its random starting position.
-			self.current_block = self.buffer[0]
-			self.current_block.rect.x = (self.settings.block_width *
-									self.current_block.random_start_position)
+			self._start_next_block()
+
+			if self.settings.autosave:
+				self._save_game()
+
+	def _start_next_block(self):
+		"""
+		Take new current block from start of the buffer and start it at the
+		top of the screen at its random starting position.
+		"""
+		self.current_block = self.buffer[0]
+		self.current_block.rect.x = (self.settings.block_width *
+									 self.current_block.random_start_position)
+		# Move block back from where it was displayed in the buffer.
+		self.current_block.rect.y = self.current_block.y
+		self.current_block.align_hit_boxes()
 
-			# Update the buffer now first block has been used.
-			self._update_buffer_blocks()
+		# Update the buffer now first block has been used.
+		self._update_buffer_blocks()
 
 	def _display_pile_blocks(self):
 		"""Display all pile blocks on screen."""
-		for position, block in self.grid.items():
-			if block:
-				block.draw_block()
+		# Settled blocks are drawn from the pile layer, which only redraws
+		#	the positions that have changed.
+		self.pile_layer.update()
+		self.screen.blit(self.pile_layer.image, self.screen_rect)
+
+		# Unsupported blocks are drawn where they have fallen to.
+		for block in self.unsupported_blocks.values():
+			block.draw_block()
 
-	def _check_blocks_for_match(self):
+	def _check_blocks_for_match(self, changed_positions):
 		"""
 		Check if three of the same colour block are lined up
 		either vertically or horizontally.
 		"""
-		for position, block in self.grid.items():
+		# Any new match must include a position that has changed, so only
+		#	check the positions that such a match could be found from.
+		#	(Matches are found from their top or leftmost block)
+		positions_to_check = set()
+		for x, y in changed_positions:
+			for offset in range(3):
+				positions_to_check.add((x, y + offset))
+				positions_to_check.add((x - offset, y))
+
+		for position in positions_to_check:
+			block = self.grid.get(position)
 
 			# Only run check on this position if there is a block in it.
 			if not block:
@@ -592,54 +1095,113 @@ class ColourMatch:
 		After finding 3 blocks that match - call this method to find all
 		other blocks of the same colour adjacent to the matching blocks and
 		schedule all for deletion.
-		"""	
-		x = position[0]
-		y = position[1]
-
-		starting_block = self.grid[position]
-		self.scheduled_for_deletion[position] = starting_block
-		match_colour = starting_block.colour
-
-		# Find all the positions adjacent blocks can be at.
-		adjacent_block_positions = [(x + 1, y), (x - 1, y), (x, y + 1),
-									(x, y - 1)]
-
-		# Check all adjacent positions for matching blocks.
-		for adjacent_position in adjacent_block_positions:
-			# If that position exists...
-			if adjacent_position in self.grid.keys():
-				adjacent_block = self.grid[adjacent_position]
-				# If there is a block in this position...
-				if adjacent_block:
-					# Do not recheck blocks already scheduled for deletion.
-					if (adjacent_block
-						not in self.scheduled_for_deletion.values()):
-						# If the block is the matching colour then start
-						#	checking process again with this new matching
-						#	block as the starting block - this continues in
-						#	recursive loop until all adjacent matching blocks
-						# 	have been checked and added to delete dict.
-						if adjacent_block.colour == match_colour:
-							self._find_adjacent_blocks(adjacent_position)
+		"""
+		# Do not recheck blocks already scheduled for deletion.
+		if position in self.scheduled_for_deletion:
+			return
+
+		match_colour = self.grid[position].colour
+
+		# Keep a list of matching positions whose adjacent positions still
+		#	need checking. (A loop is used rather than recursion so that large
+		#	areas of one colour can't exceed Python's recursion limit)
+		positions_to_check = [position]
+		self.scheduled_for_deletion[position] = self.grid[position]
+		match_size = 1
+
+		while positions_to_check:
+			x, y = positions_to_check.pop()
+
+			# Find all the positions adjacent blocks can be at.
+			adjacent_block_positions = [(x + 1, y), (x - 1, y), (x, y + 1),
+										(x, y - 1)]
+
+			# Check all adjacent positions for matching blocks that haven't
+			#	already been scheduled for deletion, and schedule them.
+			for adjacent_position in adjacent_block_positions:
+				adjacent_block = self.grid.get(adjacent_position)
+				if (adjacent_block
+					and adjacent_position not in self.scheduled_for_deletion
+					and adjacent_block.colour == match_colour):
+					self.scheduled_for_deletion[adjacent_position] = (
+															adjacent_block)
+					positions_to_check.append(adjacent_position)
+					match_size += 1
+
+		if self.telemetry:
+			self.telemetry.record(telemetry.MATCH, match_size)
 
 	def _delete_blocks(self):
 		"""Delete all blocks in "scheduled for deletion" from the main grid."""
+		removed_positions = []
+		removed_colours = []
 		for position, block in self.scheduled_for_deletion.items():
-			if block in self.grid.values():
-				self.grid[position] = None
+			if self.grid[position] is block:
+				removed_positions.append(position)
+				removed_colours.append(block.colour)
+				self._remove_block(position)
 				self._update_score()
 		self.scheduled_for_deletion.clear()
 
-	def _check_for_unsupported_blocks(self):
+		if self.particles and removed_positions:
+			self.particles.add_effect(particles.MATCH, removed_positions,
+									  removed_colours)
+
+	def _remove_block(self, position):
+		"""Remove a block from the grid and return it to the block pool."""
+		block = self.grid[position]
+		self._set_block(position, None)
+		# A removed block must not carry on falling back into the grid.
+		self.unsupported_blocks.pop(position, None)
+		self.block_pool.release_block(block)
+
+	def _set_block(self, position, block):
+		"""Put a block (or None) into the grid and record the change."""
+		replaced_block = self.grid.get(position)
+		self.grid[position] = block
+		self.changed_positions.add(position)
+		if replaced_block:
+			self.board_events.emit(board_events.CELL_CLEARED, position,
+								   replaced_block)
+		if block:
+			self.board_events.emit(board_events.CELL_SET, position, block)
+
+	def _move_block(self, block, old_position, new_position):
+		"""Move a block that has fallen to where it landed in the grid."""
+		if self.grid.get(old_position) is not block:
+			# Another block has taken the fallen block's old position.
+			self._set_block(old_position, None)
+			self._set_block(new_position, block)
+			return
+
+		self.grid[old_position] = None
+		replaced_block = self.grid.get(new_position)
+		self.grid[new_position] = block
+		self.changed_positions.add(old_position)
+		self.changed_positions.add(new_position)
+		if replaced_block:
+			self.board_events.emit(board_events.CELL_CLEARED, new_position,
+								   replaced_block)
+		self.board_events.emit(board_events.BLOCK_FELL, old_position,
+							   new_position, block)
+
+	def _check_for_unsupported_blocks(self, changed_positions):
 		"""Find blocks that have no block below supporting them."""
-		for position, block in self.grid.items():
-			x = position[0]
-			y = position[1]
-			position_below = (x, y - 1)
-			if block:
-				if position_below in self.grid.keys():
-					if not self.grid[position_below]:
-						self.unsupported_blocks[position] = block
+		# A block can only lose its support if its own position or the
+		#	position below it has changed. Positions are checked in order so
+		#	that blocks start falling in the same order however the set of
+		#	changed positions was built, e.g. after a game is restored.
+		for x, y in sorted(changed_positions):
+			for position in ((x, y), (x, y + 1)):
+				block = self.grid.get(position)
+				position_below = (position[0], position[1] - 1)
+				if block:
+					if position_below in self.grid.keys():
+						if not self.grid[position_below]:
+							self.unsupported_blocks[position] = block
+							# Block will be drawn falling, not in the pile.
+							self.board_events.emit(board_events.BLOCK_FALLING,
+												   position, block)
 
 	def _update_unsupported_blocks(self):
 		"""
@@ -648,27 +1210,27 @@ class ColourMatch:
 		"""
 		for position, block in self.unsupported_blocks.copy().items():
 
-			# Need this section to stop block from "interacting with itself"
-			reduced_pile_block_rects = self.pile_block_rects.copy()
-			if block.rect in reduced_pile_block_rects:
-				reduced_pile_block_rects.remove(block.rect)
+			# Only blocks in the same column can be hit by a falling block.
+			#	Need to ignore the block's own rect to stop block from
+			#	"interacting with itself".
+			column_rects = self.pile_index.column_rects[position[0]]
+			block_hit = any(rect is not block.rect for other_block, rect
+							in block.rect.collidedictall(column_rects, True))
 
-			if (block.rect.bottom < self.screen_rect.bottom 
-				and block.rect.collidelist(reduced_pile_block_rects) == -1):
+			if block.rect.bottom < self.screen_rect.bottom and not block_hit:
 				# While block is unsupported update its vertical position.
 				block.update()
 			else:
 				# Remove block from unsupported dict as no longer unsupported.
 				del self.unsupported_blocks[position]
-				# Block has now fallen out of original position so = None.
-				self.grid[position] = None
 				# x position doesn't change.
 				new_x_position = position[0]
 				# New y position calculated based on where block fell to.
 				new_y_position = ((self.screen_rect.bottom - block.rect.centery)
 								   // self.settings.block_height)
-				# Add block back into grid at its new position.
-				self.grid[(new_x_position, new_y_position)] = block
+				# Move block from its original position to its new position.
+				self._move_block(block, position,
+								 (new_x_position, new_y_position))
 
 	def _add_new_row(self):
 		"""Move all blocks up and add a new row below."""
@@ -680,105 +1242,101 @@ class ColourMatch:
 			new_grid[(new_x_position, new_y_position)] = block
 		
 		# Overwrite old grid with the new grid positions.
+		#	Every position in the grid has changed.
 		self.grid = new_grid
+		self.changed_positions.update(self.grid.keys())
+		self.board_events.emit(board_events.ROW_PUSHED)
 
-		# Add a new row in the space now created at bottom of the screen.
-		for space in range(self.settings.blocks_per_row):
-			
-			# Make sure that no special blocks are put into the pile.
-			special_block = True
-			while special_block:
-				new_block = Block(self)
-				if new_block.special:
-					special_block = True
-				else:
-					special_block = False
-
-			# Check block colour and change before adding it to pile
-			#	if it will cause colour matches.
-			#	Similar process as _create_starting_blocks()
-			#	see there for annotations.
-			#	(One uses blocks below, one uses blocks above due to order
-			#	blocks are created in both cases)
-
-			reduced_colours = self.settings.colour_list.copy()
-			
-			try:
-				block_above = self.grid[(space, 1)]
-				block_2_above = self.grid[(space, 2)]
-
-				# Check if the spaces above contain blocks first.
-				if block_above and block_2_above:
-					if (block_2_above.colour == block_above.colour
-						== new_block.colour):
-						reduced_colours.remove(new_block.colour)
-						new_block.colour = random.choice(reduced_colours)
-						new_block.image.fill(new_block.colour)
-					if (block_2_above.colour == block_above.colour):
-						if block_above.colour in reduced_colours:
-							reduced_colours.remove(block_above.colour)
-			except KeyError:
-				pass
+		# Unsupported blocks move up in the grid with the rest of the blocks.
+		self.unsupported_blocks = {(x, y + 1): block for (x, y), block
+								   in self.unsupported_blocks.items()}
 
-			try:
-				block_left = self.grid[(space - 1, 0)]
-				block_2_left = self.grid[(space - 2, 0)]
-				if block_left and block_2_left:
-					if (block_2_left.colour == block_left.colour
-						== new_block.colour):
-						reduced_colours.remove(new_block.colour)
-						new_block.colour = random.choice(reduced_colours)
-						new_block.image.fill(new_block.colour)
-			except KeyError:
-				pass
+		# Add a new row in the space now created at bottom of the screen.
+		#	The new row is generated against the two rows above it so it
+		#	won't cause any colour matches.
+		new_row = self.row_generator.generate_row(
+						self._get_row_colour_indices(1),
+						self._get_row_colour_indices(2))
+		for space, colour_index in enumerate(new_row):
+			new_block = self._create_pile_block(colour_index)
 
 			# Add the new block to the grid in the correct position.
 			position_x = space
 			position_y = 0 # Always at bottom of the screen (first row).
-			self.grid[(position_x, position_y)] = new_block
+			self._set_block((position_x, position_y), new_block)
 
 			# Give the new blocks rect the correct position so block
 			#	can be displayed on screen.
 			new_block.rect.bottom = self.screen_rect.bottom
 			new_block.rect.left = (self.screen_rect.left +
 										(space * self.settings.block_width))
-			
+		self._prefetch_blocks()
+
 	def _activate_special_block_1(self, colour_to_delete):
 		"""
 		Remove all blocks the same colour as the block
 		the special block lands on.
 		"""
+		removed_positions = []
 		for position, block in self.grid.items():
 			if block:
 				if block.colour == colour_to_delete:
-					self.grid[position] = None
+					removed_positions.append(position)
+					self._remove_block(position)
 					self._update_score()
+		blocks_removed = len(removed_positions)
+
+		if self.particles and removed_positions:
+			self.particles.add_effect(particles.COLOUR_WIPE,
+				removed_positions, [colour_to_delete] * blocks_removed)
+
+		self.board_events.emit(board_events.SPECIAL_ACTIVATED, 1,
+							   blocks_removed)
 
 	def _activate_special_block_2(self, x_position, y_position, blast_radius):
 		"""Remove all blocks within the special block's 'blast radius'."""
-		# Calculate the list of positions in blast_radius.
-		blast_radius_positions = []
-
+		# Check the positions in the blast radius for blocks and delete them.
+		removed_positions = []
+		removed_colours = []
 		for x in range((x_position - blast_radius),
 											(x_position + blast_radius + 1)):
 			for y in range((y_position - blast_radius),
 											(y_position + blast_radius + 1)):
 				position = (x, y)
-				blast_radius_positions.append(position)
-		# Remove position special block lands from the blast radius positions.
-		blast_radius_positions.remove((x_position, y_position))
-
-		# Check for blocks in blast radius and delete them.
-		for position, block in self.grid.items():
-			if position in blast_radius_positions:
+				# Position special block lands is not in the blast radius.
+				if position == (x_position, y_position):
+					continue
+				block = self.grid.get(position)
 				if block:
-					self.grid[position] = None
+					removed_positions.append(position)
+					removed_colours.append(block.colour)
+					self._remove_block(position)
 					self._update_score()
+		blocks_removed = len(removed_positions)
+
+		if self.particles and removed_positions:
+			self.particles.add_effect(particles.BLAST, removed_positions,
+				removed_colours, centre = (x_position, y_position))
+
+		self.board_events.emit(board_events.SPECIAL_ACTIVATED, 2,
+							   blocks_removed)
 
 	# Update the screen at the end of all calculations.
 
 	def _update_screen(self):
 		"""Update images on the screen and flip to the new screen."""
+		self._draw_screen()
+
+		# Display the updated screen.
+		pygame.display.flip()
+		if self.latency_tracer:
+			self.latency_tracer.frame_shown()
+
+	def _draw_screen(self):
+		"""
+		Draw the game onto the screen surface, which can be off-screen
+		when a replay is being exported.
+		"""
 		# Give screen a background colour.
 		self.screen.fill(self.settings.background_colour)
 
@@ -788,51 +1346,129 @@ class ColourMatch:
 		if self.setup_completed:
 			self.current_block.draw_block()
 
+		# Draw the particles of blocks that have been removed.
+		if self.particles:
+			self.particles.draw(self.screen)
+
 		# Draw the score information.
 		self.sb.show_score()
 
 		# Draw the text buttons on screen when required.
-		if (not self.settings.game_active
-		 	and not self.settings.difficulty_selected
-		   	and not self.settings.display_instructions
-		   	and not self.settings.display_high_scores):
+		self._draw_buttons(self.settings)
+
+	def _draw_buttons(self, state):
+		"""
+		Draw the text buttons for the state of the game, given by its
+		settings or by a snapshot of them from the simulation thread.
+		"""
+		if (not state.game_active
+		 	and not state.difficulty_selected
+		   	and not state.display_instructions
+		   	and not state.display_high_scores):
 			self.title.draw_button()
+			if self.save_file.saved_game_exists:
+				self.resume_button.draw_button()
 			self.play_button.draw_button()
 			self.display_instructions.draw_button()
 			self.display_high_scores.draw_button()
-		elif (self.settings.game_active
-			  and not self.settings.difficulty_selected):
+		elif (state.game_active
+			  and not state.difficulty_selected):
 			self.select_difficulty.draw_button()
 			self.easy_button.draw_button()
 			self.medium_button.draw_button()
 			self.hard_button.draw_button()
-		elif self.settings.game_active and self.settings.difficulty_selected:
+		elif state.game_active and state.difficulty_selected:
 			self.next_blocks.draw_button()
 
-		if self.settings.display_instructions:
+		if state.display_instructions:
+			if not self.instruction_card:
+				self.instruction_card = InstructionCard(self)
 			self.instruction_card.display_instructions()
 			self.close.draw_button()
 
-		if self.settings.display_high_scores:
+		if state.display_high_scores:
 			self.sb.show_high_score()
 			self.close.draw_button()
 
-		if self.settings.game_over:
+		if state.game_over:
 			self.game_over.draw_button()
 			self.replay_button.draw_button()
 
-		if self.settings.game_won:
+		if state.game_won:
 			self.game_won.draw_button()
 			self.replay_button.draw_button()
 
-		if self.settings.game_paused:
+		if state.game_paused:
 			self.paused.draw_button()
 
-		# Display the updated screen.
-		pygame.display.flip()
-
 
 if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description = "Play Colour Match.")
+	parser.add_argument("--large-board", action = "store_true",
+						help = "play the 200x200 large board stress mode")
+	parser.add_argument("--columns", type = int,
+						help = "number of blocks across the board")
+	parser.add_argument("--rows", type = int,
+						help = "number of blocks up the board")
+	parser.add_argument("--block-size", type = int,
+						help = "size of each block in pixels")
+	parser.add_argument("--starting-rows", type = int,
+						help = "number of rows in the pile at the start")
+	parser.add_argument("--spectate-port", type = int,
+						help = "stream the game to spectators on this port")
+	parser.add_argument("--spectate-socket",
+						help = "stream the game to spectators on a Unix socket")
+	parser.add_argument("--puzzles", metavar = "FILE",
+						help = "play the puzzles in a puzzle pack")
+	parser.add_argument("--puzzle", type = int, default = 0,
+						help = "number of the first puzzle to play")
+	parser.add_argument("--record", metavar = "FILE",
+						help = "record each game to a replay file")
+	parser.add_argument("--telemetry", metavar = "FILE",
+						help = "log the events of each game to a file")
+	parser.add_argument("--threaded", action = "store_true",
+						help = "simulate the game on its own thread")
+	parser.add_argument("--tick-rate", type = int,
+						help = "ticks per second of the threaded simulation")
+	parser.add_argument("--resizable", action = "store_true",
+						help = "let the window be resized")
+	parser.add_argument("--trace-latency", action = "store_true",
+						help = "report how long key presses take to show")
+	parser.add_argument("--frame-stats", action = "store_true",
+						help = "report frames over budget and deferred work")
+	args = parser.parse_args()
+
+	settings = Settings()
+	if args.large_board:
+		settings.set_large_board()
+	if args.columns or args.rows or args.block_size:
+		settings.set_board_size(args.columns or settings.blocks_per_row,
+								args.rows or settings.blocks_per_column,
+								args.block_size or settings.block_width)
+	if args.starting_rows:
+		settings.starting_rows = args.starting_rows
+	if args.spectate_port:
+		settings.spectator_address = ('127.0.0.1', args.spectate_port)
+	elif args.spectate_socket:
+		settings.spectator_address = args.spectate_socket
+	if args.puzzles:
+		settings.puzzle_pack_filename = args.puzzles
+		settings.puzzle_number = args.puzzle
+	if args.record:
+		settings.replay_filename = args.record
+	if args.telemetry:
+		settings.telemetry_filename = args.telemetry
+	if args.threaded:
+		settings.threaded_simulation = True
+	if args.tick_rate:
+		settings.simulation_tick_rate = args.tick_rate
+	if args.resizable:
+		settings.resizable_window = True
+	if args.trace_latency:
+		settings.trace_input_latency = True
+	if args.frame_stats:
+		settings.show_frame_stats = True
+
 	# Make a game instance and run the game.
-	cm = ColourMatch()
+	cm = ColourMatch(settings)
 	cm.run_game()
\ No newline at end of file
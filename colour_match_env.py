@@ -0,0 +1,103 @@
+import numpy as np
+
+from vector_sim import VectorSim
+
+class ColourMatchEnv:
+	"""
+	Class to let agents play a batch of Colour Match boards through a
+	Gym-style reset() and step(), without a display.
+
+	Each step every board's falling block moves as the action for that
+	board says, then falls one row. Actions are the keys the game responds
+	to in _check_keydown_events(): NOOP, LEFT, RIGHT and DROP (the down
+	key), which drops the block straight onto the pile. When a block
+	lands the board is settled by the VectorSim the environment wraps.
+
+	Observations are views of the simulation's arrays, which are updated
+	in place, so no new arrays are built for each step.
+	"""
+
+	NOOP = 0
+	LEFT = 1
+	RIGHT = 2
+	DROP = 3
+
+	def __init__(self, number_of_boards = 1, settings = None,
+				 difficulty = "hard", new_row_interval = 20):
+		"""Initialise the environment and the simulation it wraps."""
+		self.sim = VectorSim(number_of_boards, settings, difficulty,
+							 new_row_interval)
+		self.number_of_boards = number_of_boards
+		self.board_numbers = np.arange(number_of_boards)
+
+		# Column and row of each board's falling block.
+		self.block_positions = np.zeros((number_of_boards, 2),
+										dtype = np.int64)
+		self.block_columns = self.block_positions[:, 0]
+		self.block_rows = self.block_positions[:, 1]
+
+		self.observation = {
+			"board": self.sim.grids,
+			"current_block": self.sim.current_blocks,
+			"block_position": self.block_positions,
+			"buffer": self.sim.buffers,
+			"score": self.sim.scores,
+		}
+
+	def reset(self, seed = None):
+		"""Start new games on every board and return the observation."""
+		if seed is not None:
+			self.sim.rng = np.random.default_rng(seed)
+		self.sim.reset()
+		self._start_blocks(self.board_numbers)
+		return self.observation
+
+	def step(self, actions):
+		"""
+		Play an action on each board, given as an array of actions.
+		Returns the observation, the points each board scored, which boards'
+		games ended and an info dictionary. Boards whose games end are
+		started again, with their final scores given in the info.
+		"""
+		actions = np.asarray(actions)
+		heights = np.count_nonzero(self.sim.grids, axis = 1)
+		columns = self.block_columns
+		rows = self.block_rows
+
+		# Blocks can't move into a column where the pile is beside them, as
+		#	the block's hit boxes would collide with the pile.
+		left = (actions == self.LEFT) & (columns > 0)
+		left[left] = (heights[self.board_numbers[left], columns[left] - 1]
+					  <= rows[left])
+		columns[left] -= 1
+		right = (actions == self.RIGHT) & (columns < self.sim.columns - 1)
+		right[right] = (heights[self.board_numbers[right], columns[right] + 1]
+						<= rows[right])
+		columns[right] += 1
+
+		# Blocks fall a row, or all the way when dropped, and land when
+		#	they reach the top of the pile in their column.
+		column_heights = heights[self.board_numbers, columns]
+		rows -= 1
+		rows[actions == self.DROP] = 0
+		landed = np.flatnonzero(rows <= column_heights)
+		rewards = self.sim.step(columns, landed)
+		self._start_blocks(landed)
+
+		dones = self.sim.game_over | self.sim.game_won
+		info = {"final_scores": self.sim.scores[dones].copy()}
+		ended = np.flatnonzero(dones)
+		if len(ended):
+			self.sim.reset(ended)
+			self._start_blocks(ended)
+
+		return self.observation, rewards, dones, info
+
+	def _start_blocks(self, boards):
+		"""
+		Start the boards' next blocks at the top of the board in a random
+		column, as Block.reset() does.
+		"""
+		self.block_columns[boards] = self.sim.rng.integers(
+										0, self.sim.columns, len(boards))
+		self.block_rows[boards] = self.sim.rows - 1
\ No newline at end of file
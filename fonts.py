@@ -0,0 +1,91 @@
+import os
+
+import pygame
+import pygame.font
+import pygame.freetype
+
+# File used to remember the resolved font path between runs of the game.
+FONT_CACHE_FILE = 'font_cache.txt'
+
+# Fonts already loaded this run, keyed by (font path, size).
+_fonts = {}
+_freetype_fonts = {}
+
+# Font paths already resolved this run, keyed by font name.
+_font_paths = {}
+
+
+def get_font_path(font_name = None):
+	"""
+	Find the file for a font without rescanning the system fonts each run.
+
+	pygame.font.SysFont searches every font installed on the system whenever
+	it is first called. The path found is stored in FONT_CACHE_FILE so that
+	later starts of the game can load the font file directly.
+	"""
+	if font_name in _font_paths:
+		return _font_paths[font_name]
+
+	# No font name means the default font that is packaged with pygame.
+	#	This doesn't need a system font search or the cache file.
+	if not font_name:
+		font_path = os.path.join(os.path.dirname(pygame.__file__),
+								 pygame.font.get_default_font())
+		_font_paths[font_name] = font_path
+		return font_path
+
+	font_path = _read_font_cache(font_name)
+	if not font_path:
+		# Cache is missing or out of date so search the system fonts.
+		#	Falls back on the default font if the font is not installed.
+		font_path = pygame.font.match_font(font_name)
+		if not font_path:
+			font_path = get_font_path(None)
+		_write_font_cache(font_name, font_path)
+
+	_font_paths[font_name] = font_path
+	return font_path
+
+
+def get_font(font_name, size):
+	"""Return a shared pygame.font.Font for the font name and size."""
+	font_path = get_font_path(font_name)
+	key = (font_path, size)
+	if key not in _fonts:
+		_fonts[key] = pygame.font.Font(font_path, size)
+	return _fonts[key]
+
+
+def get_freetype_font(font_name, size):
+	"""Return a shared pygame.freetype.Font for the font name and size."""
+	font_path = get_font_path(font_name)
+	key = (font_path, size)
+	if key not in _freetype_fonts:
+		_freetype_fonts[key] = pygame.freetype.Font(font_path, size)
+	return _freetype_fonts[key]
+
+
+def _read_font_cache(font_name):
+	"""Return the cached path for the font, or None if it can't be used."""
+	try:
+		with open(FONT_CACHE_FILE) as file_object:
+			cached_name = file_object.readline().rstrip("\n")
+			cached_path = file_object.readline().rstrip("\n")
+	except FileNotFoundError:
+		return None
+
+	# Only use the cached path if it is for the same font and still exists.
+	if cached_name == font_name and os.path.isfile(cached_path):
+		return cached_path
+	return None
+
+
+def _write_font_cache(font_name, font_path):
+	"""Store the resolved font path so the next run can skip the search."""
+	try:
+		with open(FONT_CACHE_FILE, 'w') as file_object:
+			file_object.write(font_name + "\n")
+			file_object.write(font_path + "\n")
+	# Not being able to write the cache only makes the next start slower.
+	except OSError:
+		pass
\ No newline at end of file
@@ -0,0 +1,99 @@
+import time
+
+class FrameScheduler:
+	"""
+	Class to run work that doesn't affect the game's simulation, e.g.
+	rendering text before it is shown or making spare blocks, in the time
+	left over in each frame.
+
+	Each frame has a time budget. Tasks are deferred into a queue and, once
+	the frame has been played and drawn, run in the order they were
+	deferred for as long as the longest each has taken before still fits in
+	the budget. Anything a task prepares is made when it is needed instead
+	if the task hasn't run by then, so deferring work never changes what
+	the game does, only which frame the work is done in.
+	"""
+
+	def __init__(self, budget_ms):
+		"""Initialise the scheduler with an empty queue."""
+		self.budget = budget_ms / 1000
+
+		# Deferred tasks as (function, arguments) pairs, keyed by a name
+		#	that can be any hashable value, in the order they were deferred.
+		#	A task deferred again before it has run is only run once.
+		self.tasks = {}
+
+		# Longest time each named task has taken to run, in seconds.
+		self.task_times = {}
+
+		self.frame_start = time.perf_counter()
+
+		# Statistics for the frames played and the tasks deferred.
+		self.frames = 0
+		self.frames_over_budget = 0
+		self.longest_frame = 0.0
+		self.tasks_deferred = 0
+		self.tasks_run = 0
+		self.frames_with_backlog = 0
+		self.longest_backlog = 0
+
+	def defer(self, name, task, *args):
+		"""Queue a task to run in leftover frame time if it isn't queued."""
+		if name not in self.tasks:
+			self.tasks[name] = (task, args)
+			self.tasks_deferred += 1
+
+	def start_frame(self):
+		"""Start timing a frame against the budget."""
+		self.frame_start = time.perf_counter()
+
+	def run_deferred(self):
+		"""Run deferred tasks in the time left in the frame's budget."""
+		deadline = self.frame_start + self.budget
+		now = time.perf_counter()
+		while self.tasks:
+			name = next(iter(self.tasks))
+			if now + self.task_times.get(name, 0.0) > deadline:
+				break
+			task, args = self.tasks.pop(name)
+			task(*args)
+			finished = time.perf_counter()
+			self.task_times[name] = max(self.task_times.get(name, 0.0),
+										finished - now)
+			self.tasks_run += 1
+			now = finished
+
+		frame_time = now - self.frame_start
+		self.frames += 1
+		if frame_time > self.budget:
+			self.frames_over_budget += 1
+		self.longest_frame = max(self.longest_frame, frame_time)
+		if self.tasks:
+			self.frames_with_backlog += 1
+			self.longest_backlog = max(self.longest_backlog, len(self.tasks))
+
+	def get_stats(self):
+		"""Return a dictionary of the scheduler's statistics."""
+		return {
+			'frames': self.frames,
+			'over budget': self.frames_over_budget,
+			'longest frame ms': self.longest_frame * 1000,
+			'deferred': self.tasks_deferred,
+			'run': self.tasks_run,
+			'frames with backlog': self.frames_with_backlog,
+			'longest backlog': self.longest_backlog,
+			'backlog': len(self.tasks),
+			}
+
+	def get_report(self):
+		"""Return lines describing the frames played and the work deferred."""
+		stats = self.get_stats()
+		return [
+			f"Frames against a budget of {self.budget * 1000:.2f} ms:",
+			f"  {stats['frames']} frames, {stats['over budget']} over budget,"
+			f" longest {stats['longest frame ms']:.2f} ms",
+			f"  {stats['deferred']} tasks deferred, {stats['run']} run,"
+			f" {stats['backlog']} waiting",
+			f"  {stats['frames with backlog']} frames ended with tasks"
+			f" waiting, at most {stats['longest backlog']}",
+			]
\ No newline at end of file
@@ -0,0 +1,168 @@
+import os
+import threading
+
+class IOWorker:
+	"""
+	Class to write the game's files on a background thread, so the game
+	only ever has to hand over the data to be written.
+
+	Writes waiting for the same file are combined: a newer write replaces
+	an older one, and appends are joined together. Whole-file writes go
+	through a temporary file so a file is never left half written. Jobs
+	that can be lost, e.g. telemetry, are dropped while too much data is
+	waiting; saved games and high scores never are.
+	"""
+
+	def __init__(self, max_pending_bytes = 4 * 1024 * 1024):
+		"""Initialise the worker. Its thread starts with the first job."""
+		self.max_pending_bytes = max_pending_bytes
+
+		# Jobs waiting to be done: a list of jobs for each filename, done in
+		#	order. Each job is a ["write", data], ["append", data] or
+		#	["delete", b''] pair.
+		self.pending_jobs = {}
+		self.pending_bytes = 0
+		self.condition = threading.Condition()
+		self.busy = False
+		self.running = False
+		self.thread = None
+
+		# Statistics for the jobs done.
+		self.writes_done = 0
+		self.writes_combined = 0
+		self.bytes_dropped = 0
+		self.errors = []
+
+	def write_file(self, filename, data, droppable = False):
+		"""
+		Queue data to replace the contents of a file. Droppable data isn't
+		queued if there isn't room for it.
+		"""
+		with self.condition:
+			# The jobs this write replaces free up their room.
+			replaced_bytes = sum(len(job[1]) for job
+								 in self.pending_jobs.get(filename, []))
+			if droppable and not self._has_room(data, replaced_bytes):
+				return
+			# Writing the whole file makes any earlier jobs for it pointless.
+			self._replace_jobs(filename, ["write", bytes(data)])
+			self.pending_bytes += len(data)
+			self._start_job()
+
+	def append_file(self, filename, data, droppable = False):
+		"""
+		Queue data to be added to the end of a file. Droppable data isn't
+		queued if there isn't room for it.
+		"""
+		with self.condition:
+			if droppable and not self._has_room(data):
+				return
+			jobs = self.pending_jobs.setdefault(filename, [])
+			if jobs and jobs[-1][0] == "append":
+				jobs[-1][1].extend(data)
+				self.writes_combined += 1
+			else:
+				jobs.append(["append", bytearray(data)])
+			self.pending_bytes += len(data)
+			self._start_job()
+
+	def delete_file(self, filename):
+		"""Queue a file to be deleted, replacing any jobs waiting for it."""
+		with self.condition:
+			self._replace_jobs(filename, ["delete", b''])
+			self._start_job()
+
+	def flush(self):
+		"""Wait until every queued job has been done."""
+		with self.condition:
+			self.condition.wait_for(
+						lambda: not self.pending_jobs and not self.busy)
+
+	def stop(self):
+		"""Finish every queued job and stop the worker's thread."""
+		self.flush()
+		with self.condition:
+			self.running = False
+			self.condition.notify_all()
+		if self.thread:
+			self.thread.join()
+			self.thread = None
+
+	def get_report(self):
+		"""
+		Return lines describing the data dropped and the errors writing
+		files, or no lines if everything was written.
+		"""
+		lines = []
+		if self.bytes_dropped:
+			lines.append(f"{self.bytes_dropped} bytes weren't written as too "
+						 f"much data was waiting to be written.")
+		for error in self.errors:
+			lines.append(f"Couldn't write a file: {error}")
+		return lines
+
+	def _has_room(self, data, replaced_bytes = 0):
+		"""Check there is room to queue the data, else count it as dropped."""
+		if (self.pending_bytes - replaced_bytes + len(data)
+			> self.max_pending_bytes):
+			self.bytes_dropped += len(data)
+			return False
+		return True
+
+	def _replace_jobs(self, filename, job):
+		"""Replace the jobs waiting for a file with a single job."""
+		for old_job in self.pending_jobs.get(filename, []):
+			self.pending_bytes -= len(old_job[1])
+			self.writes_combined += 1
+		self.pending_jobs[filename] = [job]
+
+	def _start_job(self):
+		"""Wake the worker's thread, starting it if this is the first job."""
+		if not self.running:
+			self.running = True
+			self.thread = threading.Thread(target = self._run, daemon = True)
+			self.thread.start()
+		self.condition.notify_all()
+
+	def _run(self):
+		"""Do queued jobs until stopped."""
+		while True:
+			with self.condition:
+				self.condition.wait_for(
+							lambda: self.pending_jobs or not self.running)
+				if not self.pending_jobs:
+					return
+				jobs = self.pending_jobs
+				self.pending_jobs = {}
+				self.pending_bytes = 0
+				self.busy = True
+
+			for filename, file_jobs in jobs.items():
+				for kind, data in file_jobs:
+					try:
+						self._do_job(filename, kind, data)
+					except OSError as error:
+						self.errors.append(error)
+
+			with self.condition:
+				self.busy = False
+				self.condition.notify_all()
+
+	def _do_job(self, filename, kind, data):
+		"""Carry out one job on a file."""
+		if kind == "write":
+			temporary_filename = filename + '.tmp'
+			with open(temporary_filename, 'wb') as file_object:
+				file_object.write(data)
+				file_object.flush()
+				os.fsync(file_object.fileno())
+			os.replace(temporary_filename, filename)
+		elif kind == "append":
+			with open(filename, 'ab') as file_object:
+				file_object.write(data)
+		elif kind == "delete":
+			try:
+				os.remove(filename)
+			except FileNotFoundError:
+				pass
+		self.writes_done += 1
\ No newline at end of file
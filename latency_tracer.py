@@ -0,0 +1,93 @@
+import time
+from array import array
+
+import numpy as np
+import pygame
+
+class LatencyTracer:
+	"""
+	Class to measure how long each arrow key press takes to show on the
+	screen, split into the stages it passes through.
+
+	Key presses are stamped when they are taken from pygame's event queue,
+	traced through _check_keydown_events() and ended by the first
+	display.flip() after they were handled. pygame doesn't give the time
+	SDL stamped an event with, so key presses from the window are timed
+	from when they were taken from the queue, and the time since the queue
+	was last read is recorded as the longest they could have waited in it.
+	Scripted key presses can give the time they were pressed as a
+	pressed_time attribute, on time.perf_counter()'s clock.
+	"""
+
+	# Keys whose results are seen on the screen.
+	traced_keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN)
+
+	# Stages of each key press's latency, in the order they are reported.
+	stages = [
+		("queued", "pressed to taken from the queue"),
+		("waiting", "at most (time since the queue was last read)"),
+		("handled", "taken from the queue to handled"),
+		("shown", "handled to shown by display.flip()"),
+		("total", "pressed to shown"),
+	]
+
+	def __init__(self):
+		"""Initialise the tracer with no key presses recorded."""
+		# Times of each stage in seconds, one array per stage.
+		self.times = {name: array('d') for name, description in self.stages}
+
+		# Key presses handled but not yet shown, as (pressed, taken from
+		#	the queue, time since the queue was last read, handled) times.
+		self.handled = []
+
+		self.last_read = time.perf_counter()
+
+	def stamp_events(self, events):
+		"""Stamp the traced key presses just taken from the event queue."""
+		now = time.perf_counter()
+		waiting = now - self.last_read
+		self.last_read = now
+
+		for event in events:
+			if (event.type != pygame.KEYDOWN
+				or event.key not in self.traced_keys):
+				continue
+			event.trace_pressed = getattr(event, 'pressed_time', now)
+			event.trace_read = now
+			event.trace_waiting = waiting
+
+	def key_handled(self, event):
+		"""Record that a stamped key press has been handled."""
+		if hasattr(event, 'trace_read'):
+			self.handled.append((event.trace_pressed, event.trace_read,
+								 event.trace_waiting, time.perf_counter()))
+
+	def frame_shown(self):
+		"""Record that the key presses handled so far are now on screen."""
+		if not self.handled:
+			return
+		now = time.perf_counter()
+		for pressed, read, waiting, handled in self.handled:
+			self.times["queued"].append(read - pressed)
+			self.times["waiting"].append(waiting)
+			self.times["handled"].append(handled - read)
+			self.times["shown"].append(now - handled)
+			self.times["total"].append(now - pressed)
+		self.handled.clear()
+
+	def get_percentiles(self, name, percentiles = (50, 90, 99, 100)):
+		"""Return percentiles of a stage's times in milliseconds."""
+		if not self.times[name]:
+			return [0.0 for percentile in percentiles]
+		times = np.frombuffer(self.times[name], dtype = np.float64)
+		return list(np.percentile(times, percentiles) * 1000)
+
+	def get_report(self):
+		"""Return lines describing the distribution of each stage's times."""
+		lines = [f"Input latency of {len(self.times['total'])} key presses "
+				 "(ms: median, 90%, 99%, max):"]
+		for name, description in self.stages:
+			median, p90, p99, maximum = self.get_percentiles(name)
+			lines.append(f"  {name:>8}: {median:7.2f} {p90:7.2f} {p99:7.2f} "
+						 f"{maximum:7.2f}  {description}")
+		return lines
\ No newline at end of file
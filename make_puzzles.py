@@ -0,0 +1,116 @@
+import os
+import random
+import argparse
+
+# Games are played off-screen so no window is needed.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from settings import Settings
+from colour_match import ColourMatch
+from block_codes import EMPTY, get_block_code
+from puzzle_pack import write_pack
+
+class PuzzleMaker:
+	"""
+	Class to make puzzles for a puzzle pack from the piles left by games
+	played from seeds with random key presses.
+	"""
+
+	def __init__(self, ticks = 3000, press_every = 40):
+		"""
+		Initialise one game that every puzzle is played in. Each game is
+		played for a number of ticks with a key pressed on average every
+		press_every ticks.
+		"""
+		self.settings = Settings()
+		self.settings.autosave = False
+		self.settings.particle_effects = False
+		self.settings.submission_filename = None
+		screen = pygame.Surface((self.settings.screen_width,
+								 self.settings.screen_height))
+		self.cm_game = ColourMatch(self.settings, screen)
+
+		self.ticks = ticks
+		self.press_every = press_every
+
+		# Games are played with every colour, so the puzzles must be too.
+		self.difficulty = "hard"
+
+	def make_puzzle(self, seed):
+		"""
+		Play a game from a seed and return the pile it leaves as rows of
+		block codes from the bottom up, or None if the game ended first.
+		"""
+		cm_game = self.cm_game
+		settings = self.settings
+		cm_game._restart_game()
+		cm_game.game_seed = seed
+		settings.difficulty = self.difficulty
+		settings.difficulty_selected = True
+		key_rng = random.Random(seed)
+		keys = [pygame.K_LEFT, pygame.K_RIGHT]
+
+		# The game is fast forwarded from one key press to the next.
+		tick = 0
+		while settings.game_active and tick < self.ticks:
+			ticks_to_press = max(1, round(key_rng.expovariate(
+														1 / self.press_every)))
+			cm_game._fast_forward(ticks_to_press)
+			tick += ticks_to_press
+			if settings.game_active:
+				cm_game._check_keydown_events(pygame.event.Event(
+					pygame.KEYDOWN, key = key_rng.choice(keys)))
+
+		# Let the pile settle so the puzzle starts with no blocks falling.
+		while settings.game_active and (cm_game.changed_positions
+										or cm_game.unsupported_blocks):
+			cm_game._update_game()
+		if not settings.game_active:
+			return None
+
+		rows = []
+		for y in range(settings.blocks_per_column):
+			row = [get_block_code(settings, cm_game.grid[(x, y)])
+				   for x in range(settings.blocks_per_row)]
+			if all(code == EMPTY for code in row):
+				break
+			rows.append(row)
+		return rows
+
+	def make_puzzles(self, number_of_puzzles, seed = 0):
+		"""
+		Make puzzles from games played from consecutive seeds, skipping
+		games that end before their pile is taken.
+		"""
+		made = 0
+		while made < number_of_puzzles:
+			rows = self.make_puzzle(seed)
+			seed += 1
+			if rows:
+				made += 1
+				yield rows
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Write a pack of Colour Match puzzles made from "
+					  "seeded games.")
+	parser.add_argument("pack", help = "file to write the pack to")
+	parser.add_argument("--puzzles", type = int, default = 1000,
+						help = "number of puzzles to make")
+	parser.add_argument("--seed", type = int, default = 0,
+						help = "seed of the first game played")
+	parser.add_argument("--ticks", type = int, default = 3000,
+						help = "ticks each game is played for")
+	parser.add_argument("--press-every", type = int, default = 40,
+						help = "average ticks between key presses")
+	args = parser.parse_args()
+
+	maker = PuzzleMaker(args.ticks, args.press_every)
+	settings = maker.settings
+	write_pack(args.pack, settings.blocks_per_row, settings.blocks_per_column,
+			   maker.difficulty, maker.make_puzzles(args.puzzles, args.seed),
+			   args.puzzles)
+	print(f"Wrote {args.puzzles} puzzles to {args.pack}")
\ No newline at end of file
@@ -0,0 +1,185 @@
+import sys
+import argparse
+
+import pygame
+import pygame.font
+import pygame.freetype
+
+from settings import Settings
+from colour_match import ColourMatch
+from block_atlas import BlockAtlas
+from board_renderer import BoardRenderer
+
+class MultiBoard:
+	"""
+	Class to play several games of Colour Match side by side in one window,
+	either head to head (versus) or all following the same keys (practice).
+	"""
+
+	# Keys used by each player in versus mode, mapped to the arrow keys that
+	#	ColourMatch responds to.
+	player_keys = [
+		{pygame.K_LEFT: pygame.K_LEFT, pygame.K_RIGHT: pygame.K_RIGHT,
+		 pygame.K_DOWN: pygame.K_DOWN},
+		{pygame.K_a: pygame.K_LEFT, pygame.K_d: pygame.K_RIGHT,
+		 pygame.K_s: pygame.K_DOWN},
+		]
+
+	def __init__(self, number_of_boards = 2, difficulty = "easy",
+				 block_size = 25, practice = False):
+		"""Create the window and a game for each board."""
+		pygame.display.init()
+		pygame.font.init()
+		pygame.freetype.init()
+
+		self.settings = Settings()
+		self.settings.set_board_size(self.settings.blocks_per_row,
+									 self.settings.blocks_per_column,
+									 block_size)
+		self.practice = practice
+		self.game_paused = False
+
+		# Lay the boards out in a grid with a gap between them.
+		self.gap = 10
+		board_width = self.settings.screen_width
+		board_height = self.settings.screen_height
+		self.columns = 1
+		while self.columns * self.columns < number_of_boards:
+			self.columns += 1
+		rows = -(-number_of_boards // self.columns)
+		self.screen = pygame.display.set_mode(
+			(self.columns * (board_width + self.gap) - self.gap,
+			 rows * (board_height + self.gap) - self.gap))
+		pygame.display.set_caption("Colour Match")
+
+		# Each board is a separate game drawn onto its own part of the window.
+		#	Each game needs its own settings as these hold the game's speed.
+		self.boards = []
+		for number in range(number_of_boards):
+			offset = ((number % self.columns) * (board_width + self.gap),
+					  (number // self.columns) * (board_height + self.gap))
+			viewport = pygame.Rect(offset, (board_width, board_height))
+
+			settings = Settings()
+			settings.set_board_size(self.settings.blocks_per_row,
+									self.settings.blocks_per_column,
+									block_size)
+			settings.game_active = True
+			settings.difficulty = difficulty
+			settings.difficulty_selected = True
+			# Boards share one save file so can't be saved and resumed, and
+			#	their scores aren't high scores.
+			settings.autosave = False
+			settings.submission_filename = None
+
+			cm_game = ColourMatch(settings,
+								  screen = self.screen.subsurface(viewport))
+			self.boards.append((cm_game, offset))
+
+		# All boards are drawn from one atlas of block images.
+		self.atlas = BlockAtlas(self.settings)
+		self.renderer = BoardRenderer(self.screen, self.atlas)
+
+	def run_game(self):
+		"""Start the main loop for all the boards."""
+		while True:
+			self._start_frame()
+			self._check_events()
+			self._update_boards()
+			self._update_screen()
+			self._run_deferred()
+
+	def _start_frame(self):
+		"""Start timing the frame on every board's frame scheduler."""
+		for cm_game, offset in self.boards:
+			cm_game.frame_scheduler.start_frame()
+
+	def _run_deferred(self):
+		"""Run each board's deferred tasks in the time left in the frame."""
+		for cm_game, offset in self.boards:
+			cm_game.frame_scheduler.run_deferred()
+
+	def _check_events(self):
+		"""Respond to keypresses, sending keys to the right boards."""
+		for event in pygame.event.get():
+			if event.type == pygame.QUIT:
+				sys.exit()
+			elif event.type == pygame.KEYDOWN:
+				if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+					sys.exit()
+				elif event.key == pygame.K_p:
+					self.game_paused = not self.game_paused
+				else:
+					self._send_key(event)
+			elif event.type == pygame.KEYUP:
+				self._send_key(event)
+
+	def _send_key(self, event):
+		"""Pass a key event on to the boards the key controls."""
+		for number, (cm_game, offset) in enumerate(self.boards):
+			# In practice mode every board follows the first player's keys.
+			if self.practice:
+				keys = self.player_keys[0]
+			elif number < len(self.player_keys):
+				keys = self.player_keys[number]
+			else:
+				continue
+
+			if (event.key in keys and cm_game.setup_completed
+				and cm_game.settings.game_active):
+				board_event = pygame.event.Event(event.type,
+												 key = keys[event.key])
+				if event.type == pygame.KEYDOWN:
+					cm_game._check_keydown_events(board_event)
+				else:
+					cm_game._check_keyup_events(board_event)
+
+	def _update_boards(self):
+		"""Move every board's game on by one frame."""
+		if self.game_paused:
+			return
+		for cm_game, offset in self.boards:
+			cm_game._update_game()
+
+	def _update_screen(self):
+		"""Draw all the boards and flip to the new screen."""
+		self.screen.fill(self.settings.background_colour)
+
+		# Draw the blocks of every board in one batch.
+		self.renderer.draw_boards(self.boards)
+
+		# Draw each board's particles and text onto its own part of the
+		#	window.
+		for cm_game, offset in self.boards:
+			if cm_game.particles:
+				cm_game.particles.draw(cm_game.screen)
+			cm_game.sb.show_score()
+			cm_game.next_blocks.draw_button()
+			if cm_game.settings.game_over:
+				cm_game.game_over.draw_button()
+			elif cm_game.settings.game_won:
+				cm_game.game_won.draw_button()
+
+		if self.game_paused:
+			for cm_game, offset in self.boards:
+				cm_game.paused.draw_button()
+
+		pygame.display.flip()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Play several boards of Colour Match in one window.")
+	parser.add_argument("--boards", type = int, default = 2,
+						help = "number of boards")
+	parser.add_argument("--difficulty", default = "easy",
+						choices = ["easy", "medium", "hard"])
+	parser.add_argument("--block-size", type = int, default = 25,
+						help = "size of each block in pixels")
+	parser.add_argument("--practice", action = "store_true",
+						help = "all boards follow the arrow keys")
+	args = parser.parse_args()
+
+	multi_board = MultiBoard(args.boards, args.difficulty, args.block_size,
+							 args.practice)
+	multi_board.run_game()
\ No newline at end of file
@@ -0,0 +1,241 @@
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Kinds of effect, which start their particles moving differently.
+MATCH = 0			# Burst up and out of each matched block.
+COLOUR_WIPE = 1		# Float up out of blocks removed by a "D" special block.
+BLAST = 2			# Thrown out from the centre of a special block's blast.
+
+
+class ParticlePool:
+	"""
+	Class to animate the particles of effects shown when blocks are
+	removed, drawn over the game each frame.
+
+	Particles are kept in a fixed number of slots, one NumPy array per
+	attribute, and are moved and drawn a whole array at a time, so no
+	objects are created for particles. All particles last the same number
+	of frames, so the slots are used as a ring: each effect takes the slots
+	after the last effect's and the oldest effects are always the first to
+	end. Effects that don't fit in the free slots are cut short, and if
+	drawing particles takes longer than the frame budget the oldest
+	effects are dropped and fewer particles are made until it doesn't.
+	"""
+
+	def __init__(self, cm_game):
+		"""Initialise the pool's arrays for the game's settings."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.capacity = self.settings.particle_capacity
+		self.rng = np.random.default_rng()
+
+		# Attributes of each particle. Positions and velocities are in
+		#	pixels and pixels per frame.
+		self.x = np.zeros(self.capacity, dtype = np.float32)
+		self.y = np.zeros(self.capacity, dtype = np.float32)
+		self.x_velocity = np.zeros(self.capacity, dtype = np.float32)
+		self.y_velocity = np.zeros(self.capacity, dtype = np.float32)
+		self.y_acceleration = np.zeros(self.capacity, dtype = np.float32)
+		# Pixel values of the particles' colours on the game's screen.
+		self.colours = np.zeros(self.capacity, dtype = np.uint32)
+		# Pixel coordinates the particles are drawn at.
+		self.pixel_x = np.zeros(self.capacity, dtype = np.intp)
+		self.pixel_y = np.zeros(self.capacity, dtype = np.intp)
+
+		# Particles are sized and moved in proportion to the blocks.
+		block_size = self.settings.block_width
+		self.particle_size = max(1, block_size // 12)
+		self.speed = block_size / 50
+		self.gravity = block_size / 5000
+
+		# Mapped pixel value of each block colour, found when first used.
+		self.pixel_values = {}
+
+		self.clear()
+
+	def clear(self):
+		"""Remove every particle, e.g. when a new game starts."""
+		# The live particles are the slots from first_slot onwards, wrapping
+		#	round to the start of the arrays.
+		self.first_slot = 0
+		self.number_alive = 0
+		# The frame each effect ends on and the number of particles it has,
+		#	oldest first.
+		self.effects = deque()
+		self.frame = 0
+
+		# Fraction of each effect's particles that are made, lowered while
+		#	the particles take longer to draw than the frame budget.
+		self.density = 1.0
+		self.effects_dropped = 0
+
+	def add_effect(self, kind, positions, colours, centre = None):
+		"""
+		Start an effect for blocks removed from the grid positions given,
+		with the block colour at each position. A blast's particles are
+		thrown out from the grid position at its centre.
+		"""
+		number_of_blocks = len(positions)
+		per_block = max(1, int(self.settings.particles_per_block
+							   * self.density))
+		number_of_particles = min(number_of_blocks * per_block,
+								  self.capacity - self.number_alive)
+		if number_of_particles <= 0:
+			if number_of_blocks:
+				self.effects_dropped += 1
+			return
+
+		# If there isn't room for every block's particles, spread the ones
+		#	there is room for over the blocks.
+		blocks_used = -(-number_of_particles // per_block)
+		if blocks_used < number_of_blocks:
+			step = number_of_blocks / blocks_used
+			chosen = [int(index * step) for index in range(blocks_used)]
+			positions = [positions[index] for index in chosen]
+			colours = [colours[index] for index in chosen]
+
+		# Particles start spread over the blocks they came from.
+		cells = np.array(positions, dtype = np.float32)
+		block_indices = np.arange(number_of_particles) // per_block
+		start_x, start_y = self._to_pixels(cells[block_indices, 0],
+										   cells[block_indices, 1])
+		start_x += self.rng.uniform(-0.5, 0.5, number_of_particles) \
+					* self.settings.block_width
+		start_y += self.rng.uniform(-0.5, 0.5, number_of_particles) \
+					* self.settings.block_height
+		self._keep_on_screen(start_x, start_y)
+		pixel_values = np.array([self._get_pixel_value(colour)
+								 for colour in colours], dtype = np.uint32)
+
+		speed = self.speed
+		if kind == MATCH:
+			x_velocity = self.rng.uniform(-1, 1, number_of_particles) * speed
+			y_velocity = self.rng.uniform(-2, 0, number_of_particles) * speed
+			y_acceleration = self.gravity
+		elif kind == COLOUR_WIPE:
+			x_velocity = self.rng.uniform(-0.3, 0.3,
+										  number_of_particles) * speed
+			y_velocity = self.rng.uniform(-0.5, 0, number_of_particles) \
+						 * speed
+			y_acceleration = -self.gravity / 2
+		else:
+			centre_x, centre_y = self._to_pixels(*centre)
+			x_velocity = start_x - centre_x
+			y_velocity = start_y - centre_y
+			distance = np.maximum(np.hypot(x_velocity, y_velocity), 1)
+			blast_speed = self.rng.uniform(1, 3, number_of_particles) * speed
+			x_velocity *= blast_speed / distance
+			y_velocity *= blast_speed / distance
+			y_acceleration = self.gravity
+
+		# Write the new particles into the free slots after the live ones,
+		#	in at most two parts as the slots wrap round.
+		start = (self.first_slot + self.number_alive) % self.capacity
+		first_part = min(number_of_particles, self.capacity - start)
+		for slots, particles in ((slice(start, start + first_part),
+								  slice(0, first_part)),
+								 (slice(0, number_of_particles - first_part),
+								  slice(first_part, number_of_particles))):
+			self.x[slots] = start_x[particles]
+			self.y[slots] = start_y[particles]
+			self.x_velocity[slots] = x_velocity[particles]
+			self.y_velocity[slots] = y_velocity[particles]
+			self.y_acceleration[slots] = y_acceleration
+			self.colours[slots] = pixel_values[block_indices[particles]]
+
+		self.number_alive += number_of_particles
+		self.effects.append((self.frame + self.settings.particle_lifetime,
+							 number_of_particles))
+
+	def update(self):
+		"""Move the particles on by a frame, ending effects that are over."""
+		self.frame += 1
+		while self.effects and self.effects[0][0] <= self.frame:
+			self._end_oldest_effect()
+
+		for slots in self._get_live_slots():
+			x, y = self.x[slots], self.y[slots]
+			y_velocity = self.y_velocity[slots]
+			x += self.x_velocity[slots]
+			y_velocity += self.y_acceleration[slots]
+			y += y_velocity
+			self._keep_on_screen(x, y)
+
+	def draw(self, screen):
+		"""Draw the particles onto a screen as squares of pixels."""
+		if not self.number_alive:
+			return
+
+		start_time = time.perf_counter()
+		size = self.particle_size
+		pixels = pygame.surfarray.pixels2d(screen)
+		for slots in self._get_live_slots():
+			pixel_x, pixel_y = self.pixel_x[slots], self.pixel_y[slots]
+			colours = self.colours[slots]
+			np.copyto(pixel_y, self.y[slots], casting = 'unsafe')
+			for row in range(size):
+				np.copyto(pixel_x, self.x[slots], casting = 'unsafe')
+				for column in range(size):
+					pixels[pixel_x, pixel_y] = colours
+					pixel_x += 1
+				pixel_y += 1
+		# The screen stays locked until its pixel array is deleted.
+		del pixels
+
+		self._keep_to_budget(time.perf_counter() - start_time)
+
+	def _keep_to_budget(self, draw_time):
+		"""
+		Drop the oldest effects and make fewer particles if drawing took
+		longer than the frame budget, and go back to making all of them
+		once it is well within it.
+		"""
+		budget = self.settings.particle_budget_ms / 1000
+		if draw_time > budget:
+			self.density = max(self.density / 2,
+							   1 / self.settings.particles_per_block)
+			half_alive = self.number_alive // 2
+			while self.number_alive > half_alive:
+				self._end_oldest_effect()
+				self.effects_dropped += 1
+		elif draw_time < budget / 2:
+			self.density = min(self.density * 2, 1.0)
+
+	def _end_oldest_effect(self):
+		"""Free the slots of the oldest effect's particles."""
+		frame_ended, number_of_particles = self.effects.popleft()
+		self.first_slot = ((self.first_slot + number_of_particles)
+						   % self.capacity)
+		self.number_alive -= number_of_particles
+
+	def _get_live_slots(self):
+		"""Return slices of the live particles' slots, in up to two parts."""
+		if not self.number_alive:
+			return []
+		end = self.first_slot + self.number_alive
+		if end <= self.capacity:
+			return [slice(self.first_slot, end)]
+		return [slice(self.first_slot, self.capacity),
+				slice(0, end - self.capacity)]
+
+	def _keep_on_screen(self, x, y):
+		"""Stop particles at the edges of the screen, so all are drawn."""
+		width, height = self.cm_game.screen_rect.size
+		np.clip(x, 0, width - self.particle_size, out = x)
+		np.clip(y, 0, height - self.particle_size, out = y)
+
+	def _to_pixels(self, x_position, y_position):
+		"""Return the pixel coordinates of the centre of a grid position."""
+		x = (x_position + 0.5) * self.settings.block_width
+		y = (self.cm_game.screen_rect.bottom
+			 - (y_position + 0.5) * self.settings.block_height)
+		return x, y
+
+	def _get_pixel_value(self, colour):
+		"""Return the screen's pixel value for a block colour."""
+		if colour not in self.pixel_values:
+			self.pixel_values[colour] = self.cm_game.screen.map_rgb(colour)
+		return self.pixel_values[colour]
\ No newline at end of file
@@ -0,0 +1,124 @@
+import board_events
+
+class PileIndex:
+	"""
+	Class to keep the rects of the blocks in a game's pile for collision
+	detection, and the number of blocks in each row for the game's end
+	conditions. The index is kept up to date from the board's change events,
+	so only the blocks that have changed are looked at when the pile is
+	checked, not the whole grid.
+	"""
+
+	def __init__(self, cm_game):
+		"""Initialise an empty index for the game's board."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.screen_rect = cm_game.screen_rect
+
+		# Rects of all the blocks in the pile, and of the blocks in each
+		#	column, keyed by block. Falling blocks are included as they can
+		#	still be hit.
+		self.rects = {}
+		self.column_rects = {x: {} for x in
+							 range(self.settings.blocks_per_row)}
+
+		# Number of blocks in each row of the grid, from the bottom up.
+		self.row_counts = [0] * self.settings.blocks_per_column
+
+		# Screen position of the left of each column and the top of each row
+		#	of the grid, so a block is placed without working it out again.
+		block_width = self.settings.block_width
+		self.column_lefts = [self.screen_rect.left + (x * block_width) for x
+							 in range(self.settings.blocks_per_row)]
+		self.row_tops = []
+		self._add_row_tops(self.settings.blocks_per_column)
+
+		# Events received since the index was last updated.
+		self.events = []
+
+		# Number of times a block has been given a new screen position.
+		self.blocks_placed = 0
+
+	def board_changed(self, events):
+		"""Keep a batch of events to apply when the pile is next checked."""
+		self.events.extend(events)
+
+	def update(self):
+		"""
+		Apply the events received since the last update, and give the blocks
+		that have changed position a rect position based on their grid
+		position so they can be displayed on screen correctly. Blocks that
+		haven't moved are not looked at.
+		"""
+		rects = self.rects
+		column_rects = self.column_rects
+		row_counts = self.row_counts
+		moved_positions = set()
+		row_pushed = False
+
+		for event in self.events:
+			kind = event[0]
+			if kind == board_events.CELL_SET:
+				(x, y), block = event[1], event[2]
+				rects[block] = block.rect
+				column_rects[x][block] = block.rect
+				row_counts[y] += 1
+				moved_positions.add((x, y))
+			elif kind == board_events.CELL_CLEARED:
+				(x, y), block = event[1], event[2]
+				del rects[block]
+				del column_rects[x][block]
+				row_counts[y] -= 1
+			elif kind == board_events.BLOCK_FELL:
+				row_counts[event[1][1]] -= 1
+				row_counts[event[2][1]] += 1
+				moved_positions.add(event[2])
+			elif kind == board_events.ROW_PUSHED:
+				# Rows pushed off the top stay in the grid, as they do in
+				#	ColourMatch._add_new_row().
+				row_counts.insert(0, 0)
+				self._add_row_tops(len(row_counts) - len(self.row_tops))
+				row_pushed = True
+		self.events.clear()
+
+		# Positions given before a row was pushed are out of date, but every
+		#	block has moved so all of them are placed again.
+		grid = self.cm_game.grid
+		if row_pushed:
+			moved_positions = grid.keys()
+
+		# Blocks in positions that are falling are drawn where they have
+		#	fallen to, not in their grid position.
+		unsupported_blocks = self.cm_game.unsupported_blocks
+		column_lefts = self.column_lefts
+		row_tops = self.row_tops
+		for position in moved_positions:
+			block = grid.get(position)
+			if block and position not in unsupported_blocks:
+				block.rect.topleft = (column_lefts[position[0]],
+									  row_tops[position[1]])
+				block.y = block.rect.y
+				self.blocks_placed += 1
+
+	def _add_row_tops(self, number_of_rows):
+		"""Add the screen position of the top of rows above the highest."""
+		block_height = self.settings.block_height
+		for y in range(len(self.row_tops), len(self.row_tops) + number_of_rows):
+			self.row_tops.append(self.screen_rect.bottom
+								 - ((y + 1) * block_height))
+
+	def clear(self):
+		"""Empty the index when all the blocks are cleared from the game."""
+		self.rects.clear()
+		for rects in self.column_rects.values():
+			rects.clear()
+		self.row_counts = [0] * self.settings.blocks_per_column
+		self.events.clear()
+
+	def is_empty(self):
+		"""Return True if there are no blocks in the pile."""
+		return not self.rects
+
+	def row_has_blocks(self, row_number):
+		"""Return True if there are any blocks in a row of the grid."""
+		return self.row_counts[row_number] > 0
\ No newline at end of file
@@ -0,0 +1,61 @@
+import pygame
+
+import board_events
+
+class PileLayer:
+	"""
+	Class to keep an image of the settled blocks in the pile, so that the
+	whole pile can be drawn each frame with a single blit. Only the grid
+	positions that have changed are redrawn into the image.
+	"""
+
+	def __init__(self, cm_game):
+		"""Create the layer image for the game's board."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.screen_rect = cm_game.screen_rect
+
+		self.image = pygame.Surface(self.screen_rect.size)
+		self.image.fill(self.settings.background_colour)
+
+		# Grid positions that need to be redrawn in the layer.
+		self.changed_positions = set()
+
+	def board_changed(self, events):
+		"""Mark the grid positions changed by a batch of board events."""
+		positions = board_events.get_changed_positions(events)
+		if positions is None:
+			# Every position has changed, e.g. after a new row.
+			self.changed_positions.update(self.cm_game.grid.keys())
+		else:
+			self.changed_positions.update(positions)
+
+	def update(self):
+		"""Redraw the grid positions that have changed."""
+		# Make sure the layer has been told about every change to the board.
+		self.cm_game.board_events.dispatch()
+
+		grid = self.cm_game.grid
+		unsupported_blocks = self.cm_game.unsupported_blocks
+		block_width = self.settings.block_width
+		block_height = self.settings.block_height
+
+		for position in self.changed_positions:
+			# Find the area of the layer for this grid position.
+			cell_rect = pygame.Rect(0, 0, block_width, block_height)
+			cell_rect.bottom = (self.screen_rect.bottom
+								- (position[1] * block_height))
+			cell_rect.left = self.screen_rect.left + (position[0] * block_width)
+
+			self.image.fill(self.settings.background_colour, cell_rect)
+
+			# Falling blocks are drawn separately as they move each frame.
+			block = grid.get(position)
+			if block and position not in unsupported_blocks:
+				self.image.blit(block.image, cell_rect)
+				if block.special:
+					label_image_rect = block.label_image.get_rect()
+					label_image_rect.center = cell_rect.center
+					self.image.blit(block.label_image, label_image_rect)
+
+		self.changed_positions.clear()
\ No newline at end of file
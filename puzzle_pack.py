@@ -0,0 +1,116 @@
+import mmap
+import struct
+
+from save_file import SaveFile
+
+class PuzzlePack:
+	"""
+	Class to read the starting piles of puzzles from a packed file.
+
+	The file starts with a header and an index giving where each puzzle's
+	blocks are, followed by the blocks of every puzzle. The file is memory
+	mapped and only the header is read when the pack is opened, so opening
+	a pack takes the same time and memory however many puzzles it holds.
+	Each puzzle's blocks are read from the file when it is asked for.
+	"""
+
+	magic = b'CMPZ'
+	version = 2
+
+	# Header: magic, version, difficulty the puzzles are played at, blocks
+	#	per row, blocks per column and number of puzzles.
+	header_format = struct.Struct('<4sBBHHI')
+	# Index entry for each puzzle: offset of its blocks in the file and its
+	#	number of rows.
+	index_entry_format = struct.Struct('<QH')
+
+	def __init__(self, filename):
+		"""
+		Open a puzzle pack. Raises ValueError if the file is not a puzzle
+		pack.
+		"""
+		self.filename = filename
+		with open(filename, 'rb') as file_object:
+			self.data = mmap.mmap(file_object.fileno(), 0,
+								  access = mmap.ACCESS_READ)
+
+		if len(self.data) < self.header_format.size:
+			raise ValueError("Not a Colour Match puzzle pack.")
+		(magic, version, difficulty, self.blocks_per_row,
+			self.blocks_per_column, self.number_of_puzzles) = (
+			self.header_format.unpack_from(self.data, 0))
+		if magic != self.magic:
+			raise ValueError("Not a Colour Match puzzle pack.")
+		if version != self.version:
+			raise ValueError(f"Unsupported puzzle pack version: {version}")
+		if difficulty >= len(SaveFile.difficulties):
+			raise ValueError(f"Unknown difficulty: {difficulty}")
+		self.difficulty = SaveFile.difficulties[difficulty]
+		if (len(self.data) < self.header_format.size
+			+ self.number_of_puzzles * self.index_entry_format.size):
+			raise ValueError("Puzzle pack ends part way through its index.")
+
+	def __len__(self):
+		"""Return the number of puzzles in the pack."""
+		return self.number_of_puzzles
+
+	def get_rows(self, number):
+		"""
+		Return the rows of a puzzle's starting pile from the bottom up, each
+		a bytes object of block codes with EMPTY where there is no block.
+		Raises ValueError if the puzzle is damaged.
+		"""
+		if not 0 <= number < self.number_of_puzzles:
+			raise IndexError(f"No puzzle {number} in {self.filename}")
+		offset, number_of_rows = self.index_entry_format.unpack_from(
+			self.data,
+			self.header_format.size + number * self.index_entry_format.size)
+		if number_of_rows > self.blocks_per_column:
+			raise ValueError(f"Puzzle {number} has more rows than the board.")
+		end = offset + number_of_rows * self.blocks_per_row
+		if end > len(self.data):
+			raise ValueError(f"Puzzle {number} is past the end of the pack.")
+		return [self.data[start:start + self.blocks_per_row] for start
+				in range(offset, end, self.blocks_per_row)]
+
+	def close(self):
+		"""Close the pack's file."""
+		self.data.close()
+
+
+def write_pack(filename, blocks_per_row, blocks_per_column, difficulty,
+			   puzzles, number_of_puzzles):
+	"""
+	Write a puzzle pack from an iterable of number_of_puzzles puzzles, each
+	a list of rows of block codes from the bottom up, to be played at a
+	difficulty whose colours they use. Puzzles are written as they are
+	made, so a pack of any size can be written without holding it all in
+	memory.
+	"""
+	header_format = PuzzlePack.header_format
+	index_entry_format = PuzzlePack.index_entry_format
+	index = bytearray(number_of_puzzles * index_entry_format.size)
+	with open(filename, 'wb') as file_object:
+		file_object.write(header_format.pack(PuzzlePack.magic,
+			PuzzlePack.version, SaveFile.difficulties.index(difficulty),
+			blocks_per_row, blocks_per_column, number_of_puzzles))
+		# The index is written once every puzzle's offset is known.
+		file_object.write(index)
+		offset = header_format.size + len(index)
+
+		number = 0
+		for rows in puzzles:
+			if number == number_of_puzzles:
+				raise ValueError(f"More than {number_of_puzzles} puzzles.")
+			index_entry_format.pack_into(index,
+				number * index_entry_format.size, offset, len(rows))
+			data = b''.join(bytes(row) for row in rows)
+			file_object.write(data)
+			offset += len(data)
+			number += 1
+		if number != number_of_puzzles:
+			raise ValueError(f"Expected {number_of_puzzles} puzzles but "
+							 f"got {number}.")
+
+		file_object.seek(header_format.size)
+		file_object.write(index)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import threading
+
+import board_events
+
+from block_codes import get_block_code
+
+class RenderSnapshot:
+	"""
+	Class to hold a copy of everything that is drawn for one tick of the
+	game. Snapshots aren't changed once they are made, so the main thread
+	can draw one while the next tick is being simulated.
+	"""
+
+	def __init__(self, cm_game, tick, grid_codes):
+		"""Copy what needs drawing from the game."""
+		settings = cm_game.settings
+		self.tick = tick
+
+		# Block codes of the settled pile, row by row from the bottom.
+		self.grid_codes = grid_codes
+
+		# Moving blocks as (block code, x, y) tuples.
+		sprites = [(get_block_code(settings, block), block.rect.x,
+					block.rect.y)
+				   for block in cm_game.unsupported_blocks.values()]
+		if cm_game.setup_completed:
+			block = cm_game.current_block
+			sprites.append((get_block_code(settings, block), block.rect.x,
+							block.rect.y))
+		self.sprites = tuple(sprites)
+
+		self.buffer_codes = tuple(get_block_code(settings, block)
+								  for block in cm_game.buffer)
+		self.score = cm_game.stats.score
+
+		# Flags that decide which buttons are drawn.
+		self.game_active = settings.game_active
+		self.difficulty_selected = settings.difficulty_selected
+		self.display_instructions = settings.display_instructions
+		self.display_high_scores = settings.display_high_scores
+		self.game_over = settings.game_over
+		self.game_won = settings.game_won
+		self.game_paused = settings.game_paused
+
+
+class SnapshotPublisher:
+	"""
+	Class to publish a RenderSnapshot of a game after each tick into one of
+	two slots, so the game can be drawn from whichever was published last.
+	"""
+
+	def __init__(self, cm_game):
+		"""Initialise the publisher and publish the game as it is now."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+
+		# Block codes of the pile, kept up to date as the grid changes.
+		#	Blocks that are falling are drawn as sprites instead.
+		self.grid_codes = bytearray(self.settings.blocks_per_row
+									* self.settings.blocks_per_column)
+		self.changed_positions = set()
+		self.all_changed = True
+		cm_game.board_events.subscribe(self)
+
+		# Two snapshot slots: the front one is drawn while the back one is
+		#	replaced.
+		self.snapshots = [None, None]
+		self.front = 0
+		self.lock = threading.Lock()
+		self.publish(0)
+
+	def board_changed(self, events):
+		"""Mark the grid positions changed by a batch of board events."""
+		positions = board_events.get_changed_positions(events)
+		if positions is None:
+			# Every position has changed, e.g. after a new row.
+			self.all_changed = True
+		else:
+			self.changed_positions.update(positions)
+
+	def get_snapshot(self):
+		"""Return the snapshot published most recently."""
+		with self.lock:
+			return self.snapshots[self.front]
+
+	def publish(self, tick):
+		"""Publish a snapshot of the game as it is after a tick."""
+		self.cm_game.board_events.dispatch()
+
+		grid = self.cm_game.grid
+		blocks_per_row = self.settings.blocks_per_row
+		rows = self.settings.blocks_per_column
+		if self.all_changed:
+			positions = [(x, y) for y in range(rows)
+						 for x in range(blocks_per_row)]
+			self.all_changed = False
+		else:
+			# Ignore blocks pushed off the top of the board by a new row.
+			positions = [(x, y) for x, y in self.changed_positions if y < rows]
+		for x, y in positions:
+			self.grid_codes[y * blocks_per_row + x] = get_block_code(
+											self.settings, grid[(x, y)])
+		self.changed_positions.clear()
+
+		# Falling blocks are left out of the pile.
+		grid_codes = bytearray(self.grid_codes)
+		for x, y in self.cm_game.unsupported_blocks:
+			grid_codes[y * blocks_per_row + x] = 0
+
+		snapshot = RenderSnapshot(self.cm_game, tick, bytes(grid_codes))
+		with self.lock:
+			self.snapshots[1 - self.front] = snapshot
+			self.front = 1 - self.front
\ No newline at end of file
@@ -0,0 +1,162 @@
+import struct
+
+import pygame
+
+from save_file import SaveFile
+
+class Replay:
+	"""
+	Class to record a game as the state it started from and the keys the
+	player pressed, so that it can be played back exactly as it was played.
+	"""
+
+	magic = b'CMRP'
+	version = 1
+
+	# The keys that change the game. Key events are stored by their
+	#	index in this list.
+	keys = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN]
+
+	# Header: magic, version, block size, number of ticks, size of the
+	#	starting state and number of key events.
+	header_format = struct.Struct('<4sBHIII')
+	# Key event: tick it happened before, key down (or up) and key index.
+	key_event_format = struct.Struct('<I?B')
+
+	def __init__(self, cm_game, filename = 'replay.bin'):
+		"""Initialise the replay for the game."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.filename = filename
+
+		# The game's state when the replay starts, packed by its save file.
+		self.start_state = b''
+		# Key events as (tick, key down, key index) tuples, in order.
+		self.key_events = []
+		# Number of ticks of the game in the replay.
+		self.ticks = 0
+
+		self.recording = False
+		self.next_key_event = 0
+
+	# Record methods
+
+	def start_recording(self):
+		"""Start recording from the game's current state."""
+		self.start_state = self.cm_game.save_file.to_bytes()
+		self.key_events = []
+		self.ticks = 0
+		self.recording = True
+
+	def record_key(self, event):
+		"""Record a key press or release if it changes the game."""
+		if self.recording and event.key in self.keys:
+			self.key_events.append((self.ticks, event.type == pygame.KEYDOWN,
+									self.keys.index(event.key)))
+
+	def record_tick(self):
+		"""Count a tick of the game being recorded."""
+		if self.recording:
+			self.ticks += 1
+
+	def stop_recording(self):
+		"""Stop recording and queue the replay to be written to its file."""
+		if self.recording:
+			self.recording = False
+			self.cm_game.io_worker.write_file(self.filename, self.to_bytes())
+
+	# Playback methods
+
+	def start_playback(self):
+		"""Put the game back into the state the replay starts from."""
+		self.cm_game.save_file.restore(self.start_state)
+		self.next_key_event = 0
+
+	def play_tick(self, tick):
+		"""Press the keys recorded before a tick, then play the tick."""
+		self._press_keys(tick)
+		self.cm_game._update_game()
+
+	def play_ticks(self, start, end):
+		"""
+		Play the ticks from start up to end as fast as possible, fast
+		forwarding the game between the recorded keys. Stops early if the
+		game ends.
+		"""
+		tick = start
+		while tick < end and self.settings.game_active:
+			self._press_keys(tick)
+			if self.next_key_event < len(self.key_events):
+				next_key_tick = self.key_events[self.next_key_event][0]
+			else:
+				next_key_tick = end
+			ticks = max(1, min(next_key_tick, end) - tick)
+			self.cm_game._fast_forward(ticks)
+			tick += ticks
+
+	def _press_keys(self, tick):
+		"""Press and release the keys recorded before a tick."""
+		while (self.next_key_event < len(self.key_events)
+			   and self.key_events[self.next_key_event][0] <= tick):
+			event_tick, key_down, key_index = (
+										self.key_events[self.next_key_event])
+			event = pygame.event.Event(
+				pygame.KEYDOWN if key_down else pygame.KEYUP,
+				key = self.keys[key_index])
+			if key_down:
+				self.cm_game._check_keydown_events(event)
+			else:
+				self.cm_game._check_keyup_events(event)
+			self.next_key_event += 1
+
+	# File methods
+
+	def load(self):
+		"""Load the replay from its file."""
+		with open(self.filename, 'rb') as file_object:
+			self.from_bytes(file_object.read())
+
+	def to_bytes(self):
+		"""Return the replay packed into bytes."""
+		parts = [self.header_format.pack(self.magic, self.version,
+			self.settings.block_width, self.ticks, len(self.start_state),
+			len(self.key_events))]
+		parts.append(self.start_state)
+		for key_event in self.key_events:
+			parts.append(self.key_event_format.pack(*key_event))
+		return b''.join(parts)
+
+	def from_bytes(self, data):
+		"""
+		Read a replay packed by to_bytes(). Raises ValueError if the data
+		is not a replay.
+		"""
+		(magic, version, block_size, self.ticks, state_size,
+			number_of_key_events) = self.header_format.unpack_from(data, 0)
+		if magic != self.magic:
+			raise ValueError("Not a Colour Match replay.")
+		if version != self.version:
+			raise ValueError(f"Unsupported replay version: {version}")
+		offset = self.header_format.size
+
+		self.start_state = bytes(data[offset:offset + state_size])
+		offset += state_size
+
+		self.key_events = [key_event for key_event in
+			self.key_event_format.iter_unpack(data[offset:offset
+				+ number_of_key_events * self.key_event_format.size])]
+
+
+def get_board_size(data):
+	"""
+	Return the (blocks per row, blocks per column, block size) of the board
+	a replay was recorded on, so settings can be made to play it back.
+	"""
+	(magic, version, block_size, ticks, state_size,
+		number_of_key_events) = Replay.header_format.unpack_from(data, 0)
+	if magic != Replay.magic:
+		raise ValueError("Not a Colour Match replay.")
+	(state_magic, state_version, difficulty, blocks_per_row,
+		blocks_per_column) = SaveFile.header_format.unpack_from(
+											data, Replay.header_format.size)
+	return blocks_per_row, blocks_per_column, block_size
\ No newline at end of file
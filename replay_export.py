@@ -0,0 +1,135 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Frames are drawn off-screen so no window is needed.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from settings import Settings
+from colour_match import ColourMatch
+from replay import Replay, get_board_size
+
+class ReplayExporter:
+	"""
+	Class to play back a recorded game as fast as possible and render the
+	chosen ticks to numbered PNG images or a raw stream of RGB frames.
+	"""
+
+	def __init__(self, filename, output, every = 1, start = 0, end = None,
+				 raw = False, workers = 0):
+		"""Initialise the exporter and a game to play the replay back in."""
+		with open(filename, 'rb') as file_object:
+			data = file_object.read()
+
+		# The game is played on the same size board it was recorded on.
+		settings = Settings()
+		settings.set_board_size(*get_board_size(data))
+		settings.autosave = False
+
+		screen = pygame.Surface((settings.screen_width,
+								 settings.screen_height))
+		self.cm_game = ColourMatch(settings, screen)
+		self.replay = Replay(self.cm_game)
+		self.replay.from_bytes(data)
+
+		self.output = output
+		self.every = every
+		self.start = start
+		self.end = self.replay.ticks if end is None else end
+		self.raw = raw
+		self.workers = workers
+
+		self.frames_written = 0
+
+	def export(self):
+		"""Play the replay back, writing a frame for each chosen tick."""
+		if self.raw:
+			output_file = open(self.output, 'wb')
+		else:
+			os.makedirs(self.output, exist_ok = True)
+			output_file = None
+
+		# PNG encoding can be spread over a pool of processes while the
+		#	replay carries on being played back.
+		pool = None
+		pending_frames = []
+		if self.workers and not self.raw:
+			pool = ProcessPoolExecutor(max_workers = self.workers)
+
+		self.replay.start_playback()
+		for tick in range(min(self.end, self.replay.ticks)):
+			self.replay.play_tick(tick)
+
+			# Ticks that aren't exported are never drawn.
+			if tick < self.start or (tick - self.start) % self.every:
+				continue
+
+			self.cm_game._draw_screen()
+			frame = pygame.image.tobytes(self.cm_game.screen, 'RGB')
+			self.frames_written += 1
+
+			if output_file:
+				output_file.write(frame)
+			else:
+				filename = os.path.join(self.output, f"frame_{tick:06d}.png")
+				if pool:
+					pending_frames.append(pool.submit(write_png, filename,
+									self.cm_game.screen.get_size(), frame))
+					# Only keep a few frames per process waiting, so frames
+					#	don't pile up in memory faster than they are written.
+					if len(pending_frames) > 4 * self.workers:
+						pending_frames.pop(0).result()
+				else:
+					write_png(filename, self.cm_game.screen.get_size(), frame)
+
+		for pending_frame in pending_frames:
+			pending_frame.result()
+		if pool:
+			pool.shutdown()
+		if output_file:
+			output_file.close()
+
+
+def write_png(filename, size, frame):
+	"""Encode an RGB frame and write it to a PNG file."""
+	image = pygame.image.frombytes(frame, size, 'RGB')
+	pygame.image.save(image, filename)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Export a Colour Match replay to image frames.")
+	parser.add_argument("replay", help = "replay file recorded with --record")
+	parser.add_argument("output", help = "folder for PNG frames, or the file "
+						"for the raw frame stream with --raw")
+	parser.add_argument("--every", type = int, default = 1,
+						help = "export one tick in every EVERY ticks")
+	parser.add_argument("--start", type = int, default = 0,
+						help = "first tick to export")
+	parser.add_argument("--end", type = int,
+						help = "tick to stop exporting at")
+	parser.add_argument("--raw", action = "store_true",
+						help = "write the frames as one raw RGB24 stream")
+	parser.add_argument("--workers", type = int, default = 0,
+						help = "processes to encode PNG frames on")
+	args = parser.parse_args()
+
+	exporter = ReplayExporter(args.replay, args.output, every = args.every,
+		start = args.start, end = args.end, raw = args.raw,
+		workers = args.workers)
+
+	start_time = time.perf_counter()
+	exporter.export()
+	elapsed = time.perf_counter() - start_time
+
+	settings = exporter.cm_game.settings
+	ticks_played = min(exporter.end, exporter.replay.ticks)
+	print(f"Played {ticks_played} ticks and wrote {exporter.frames_written} "
+		  f"frames in {elapsed:.2f} s ({ticks_played / elapsed:.0f} ticks/s).")
+	if args.raw:
+		print(f"Frames are {settings.screen_width}x{settings.screen_height} "
+			  "rgb24, e.g. for ffmpeg -f rawvideo -pix_fmt rgb24 "
+			  f"-s {settings.screen_width}x{settings.screen_height}.")
\ No newline at end of file
@@ -0,0 +1,58 @@
+import random
+
+class RowGenerator:
+	"""
+	Class to generate rows of pile blocks that contain no colour matches.
+
+	Rows are lists of indices into settings.colour_list. Turning the indices
+	into blocks is left to the game so that no blocks are created (and thrown
+	away) while the colours are being chosen.
+	"""
+
+	def __init__(self, settings, rng = random):
+		"""Initialise the generator."""
+		self.settings = settings
+		self.rng = rng
+
+	def generate_row(self, next_row = None, second_row = None):
+		"""
+		Generate a single row of colour indices in one pass.
+
+		next_row is the row that the new row will sit against and second_row
+		is the row beyond that. (Below the new row when the pile is built up,
+		above it when a new row is pushed in at the bottom). Positions with no
+		block in them are None.
+		"""
+		colour_indices = range(len(self.settings.colour_list))
+		row = []
+
+		for x in range(self.settings.blocks_per_row):
+			# Find the colours that would complete three in a row.
+			#	There are at most two of these so with three or more colours
+			#	there is always a colour left to choose from.
+			banned_colours = []
+			if x >= 2 and row[x - 1] == row[x - 2]:
+				banned_colours.append(row[x - 1])
+			if (next_row and second_row and next_row[x] is not None
+				and next_row[x] == second_row[x]):
+				banned_colours.append(next_row[x])
+
+			allowed_colours = [colour for colour in colour_indices
+							   if colour not in banned_colours]
+			row.append(self.rng.choice(allowed_colours))
+
+		return row
+
+	def generate_rows(self, number_of_rows, next_row = None, second_row = None):
+		"""
+		Generate several rows, each one sitting against the one before it.
+
+		The first row sits against next_row and second_row, if given.
+		"""
+		rows = []
+		for row_number in range(number_of_rows):
+			row = self.generate_row(next_row, second_row)
+			rows.append(row)
+			second_row, next_row = next_row, row
+
+		return rows
\ No newline at end of file
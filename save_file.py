@@ -0,0 +1,226 @@
+import os
+import mmap
+import struct
+
+from block_codes import EMPTY, get_block_code, is_block_code, make_block
+
+class SaveFile:
+	"""
+	Class to save an in-progress game to a compact binary file so that it
+	can be resumed later.
+	"""
+
+	magic = b'CMSV'
+	version = 1
+	difficulties = ["easy", "medium", "hard"]
+
+	# Header: magic, version, difficulty, blocks per row, blocks per column.
+	header_format = struct.Struct('<4sBBHH')
+	# Score, block speed, new row time limit, new row timer
+	#	and points to increase speed.
+	state_format = struct.Struct('<IddII')
+	# Buffer block: block code and random start position.
+	buffer_block_format = struct.Struct('<BH')
+	# Current block: block code, random start position, x and y position.
+	current_block_format = struct.Struct('<BHid')
+	# Number of unsupported blocks, then for each block its grid position
+	#	and y position.
+	count_format = struct.Struct('<I')
+	unsupported_block_format = struct.Struct('<HHd')
+	# Random number generator: its 625 word state and the next gaussian
+	#	value if it has one.
+	rng_format = struct.Struct('<625I?d')
+
+	def __init__(self, cm_game, filename = 'saved_game.bin'):
+		"""Initialise the save file for the game."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.filename = filename
+
+		# Remember if there is a saved game so the file system doesn't need
+		#	to be checked every frame.
+		self.saved_game_exists = os.path.isfile(self.filename)
+
+	def save(self):
+		"""Queue the game to be written to the save file."""
+		# The game's I/O worker writes the file in the background.
+		self.cm_game.io_worker.write_file(self.filename, self.to_bytes())
+		self.saved_game_exists = True
+
+	def load(self):
+		"""Resume the game from the save file."""
+		# Make sure any save that is still queued has been written.
+		self.cm_game.io_worker.flush()
+		with open(self.filename, 'rb') as file_object:
+			with mmap.mmap(file_object.fileno(), 0,
+						   access = mmap.ACCESS_READ) as data:
+				self.restore(data)
+
+	def delete(self):
+		"""Delete the save file, e.g. when the saved game has ended."""
+		if self.saved_game_exists:
+			self.cm_game.io_worker.delete_file(self.filename)
+			self.saved_game_exists = False
+
+	def to_bytes(self):
+		"""Return the state of the game packed into bytes."""
+		cm_game = self.cm_game
+		settings = self.settings
+		parts = []
+
+		parts.append(self.header_format.pack(self.magic, self.version,
+			self.difficulties.index(settings.difficulty),
+			settings.blocks_per_row, settings.blocks_per_column))
+
+		parts.append(self.state_format.pack(cm_game.stats.score,
+			settings.block_speed, settings.new_row_time_limit,
+			cm_game.new_row_timer, settings.points_to_increase_speed))
+
+		# Grid is stored one byte per position, row by row from the bottom.
+		grid = cm_game.grid
+		parts.append(bytes(get_block_code(settings, grid[(x, y)])
+						   for y in range(settings.blocks_per_column)
+						   for x in range(settings.blocks_per_row)))
+
+		for block in cm_game.buffer:
+			parts.append(self.buffer_block_format.pack(
+				get_block_code(settings, block), block.random_start_position))
+
+		block = cm_game.current_block
+		parts.append(self.current_block_format.pack(
+			get_block_code(settings, block), block.random_start_position,
+			block.rect.x, block.y))
+
+		parts.append(self.count_format.pack(len(cm_game.unsupported_blocks)))
+		for position, block in cm_game.unsupported_blocks.items():
+			parts.append(self.unsupported_block_format.pack(
+				position[0], position[1], block.y))
+
+		rng_version, rng_state, gauss_next = cm_game.rng.getstate()
+		parts.append(self.rng_format.pack(*rng_state,
+			gauss_next is not None, gauss_next or 0.0))
+
+		return b''.join(parts)
+
+	def restore(self, data):
+		"""
+		Restore the game from data packed by to_bytes(). Data can be bytes
+		or a memory-mapped file. Raises ValueError if it can't be restored.
+		"""
+		cm_game = self.cm_game
+		settings = self.settings
+
+		magic, version, difficulty, blocks_per_row, blocks_per_column = (
+			self.header_format.unpack_from(data, 0))
+		if magic != self.magic:
+			raise ValueError("Not a Colour Match saved game.")
+		if version != self.version:
+			raise ValueError(f"Unsupported saved game version: {version}")
+		if (blocks_per_row != settings.blocks_per_row
+			or blocks_per_column != settings.blocks_per_column):
+			raise ValueError("Saved game is for a different board size.")
+		if difficulty >= len(self.difficulties):
+			raise ValueError(f"Unknown difficulty: {difficulty}")
+		offset = self.header_format.size
+
+		# Everything is read and checked before the game is changed, so a
+		#	damaged save never leaves the game half restored.
+		state = self.state_format.unpack_from(data, offset)
+		offset += self.state_format.size
+
+		grid_size = blocks_per_row * blocks_per_column
+		codes = data[offset:offset + grid_size]
+		if len(codes) != grid_size:
+			raise ValueError("Saved game ends part way through.")
+		if not all(is_block_code(settings, code) for code in set(codes)):
+			raise ValueError("Saved game has an unknown block code.")
+		offset += grid_size
+
+		buffer_blocks = []
+		for space in range(settings.buffer_size):
+			buffer_blocks.append(self.buffer_block_format.unpack_from(
+																data, offset))
+			offset += self.buffer_block_format.size
+		current_block = self.current_block_format.unpack_from(data, offset)
+		offset += self.current_block_format.size
+		# Buffer and current blocks can't be missing.
+		for code in [block[0] for block in buffer_blocks] + [current_block[0]]:
+			if code == EMPTY or not is_block_code(settings, code):
+				raise ValueError("Saved game has an unknown block code.")
+
+		number_unsupported, = self.count_format.unpack_from(data, offset)
+		offset += self.count_format.size
+		unsupported = []
+		for number in range(number_unsupported):
+			grid_x, grid_y, y = self.unsupported_block_format.unpack_from(
+																data, offset)
+			offset += self.unsupported_block_format.size
+			if (grid_x >= blocks_per_row or grid_y >= blocks_per_column
+				or not codes[grid_y * blocks_per_row + grid_x]):
+				raise ValueError("Saved game has no block where one falls.")
+			unsupported.append((grid_x, grid_y, y))
+
+		rng_values = self.rng_format.unpack_from(data, offset)
+		# Last word of the state is the position in it, at most its length.
+		if rng_values[624] > 624:
+			raise ValueError("Saved game has a damaged random state.")
+
+		# Remove any blocks from the game before restoring the saved blocks.
+		cm_game._clear_blocks()
+
+		settings.difficulty = self.difficulties[difficulty]
+		settings.set_difficulty()
+
+		(score, settings.block_speed, settings.new_row_time_limit,
+			cm_game.new_row_timer, settings.points_to_increase_speed) = state
+
+		cm_game.stats.score = score
+		cm_game.sb.prep_score()
+		# Score of this game only goes into high scores if it beats them,
+		#	which it may already have done before it was saved.
+		cm_game.new_high_score = [settings.max_high_scores + 1, score]
+		if score:
+			cm_game._check_high_score()
+
+		for y in range(blocks_per_column):
+			for x in range(blocks_per_row):
+				code = codes[y * blocks_per_row + x]
+				if code:
+					cm_game._set_block((x, y), make_block(cm_game, code))
+
+		for code, start_position in buffer_blocks:
+			block = make_block(cm_game, code)
+			block.random_start_position = start_position
+			cm_game.buffer.append(block)
+
+		code, start_position, x, y = current_block
+		block = make_block(cm_game, code)
+		block.random_start_position = start_position
+		cm_game.current_block = block
+		self._place_block(block, x, y)
+
+		for grid_x, grid_y, y in unsupported:
+			block = cm_game.grid[(grid_x, grid_y)]
+			self._place_block(block, grid_x * settings.block_width, y)
+			cm_game.unsupported_blocks[(grid_x, grid_y)] = block
+
+		if rng_values[625]:
+			gauss_next = rng_values[626]
+		else:
+			gauss_next = None
+		cm_game.rng.setstate((3, rng_values[:625], gauss_next))
+
+		# Saved game is ready to carry on from where it was left.
+		settings.game_active = True
+		settings.difficulty_selected = True
+		settings.game_paused = False
+		cm_game.setup_completed = True
+
+	def _place_block(self, block, x, y):
+		"""Put a moving block at its saved position on screen."""
+		block.rect.x = x
+		block.y = y
+		block.rect.y = y
+		block.align_hit_boxes()
+		if block.special:
+			block.label_image_rect.center = block.rect.center
\ No newline at end of file
@@ -0,0 +1,132 @@
+import struct
+
+from replay import Replay
+from save_file import SaveFile
+
+class ScoreSubmission(Replay):
+	"""
+	Class to record a game as the seed it started from and the keys the
+	player pressed, so that its score can be checked by playing it again.
+
+	Unlike a replay, which starts from any saved state, a submission always
+	starts from a new game, so the only way to get its score is to play
+	for it. Games that make the high score table are added to the end of
+	the submissions file when they end or the game is quit.
+	"""
+
+	magic = b'CMSS'
+	version = 1
+
+	# Header: magic, version, difficulty, blocks per row, blocks per
+	#	column, block size, seed, score, number of ticks and number of key
+	#	events.
+	header_format = struct.Struct('<4sBBHHHQIII')
+
+	def __init__(self, cm_game, filename = 'score_submissions.bin'):
+		"""Initialise the submission for the game."""
+		super().__init__(cm_game, filename)
+		self.seed = 0
+		self.score = 0
+
+	# Record methods
+
+	def start_recording(self):
+		"""Start recording a new game from its seed."""
+		self.seed = self.cm_game.game_seed
+		self.key_events = []
+		self.ticks = 0
+		self.recording = True
+
+	def stop_recording(self):
+		"""
+		Stop recording and, if the game's score made the high score table,
+		queue the submission to be added to the end of its file.
+		"""
+		if self.recording:
+			self.recording = False
+			self.score = self.cm_game.stats.score
+			# Compared with the table itself, as the game's new high score
+			#	check carries over from earlier games until the game is quit.
+			high_scores = self.cm_game.stats.high_scores
+			if (self.score and (not all(high_scores)
+								or self.score > min(high_scores))):
+				self.cm_game.io_worker.append_file(self.filename,
+												   self.to_bytes())
+
+	# Playback methods
+
+	def start_playback(self):
+		"""Set up a new game from the submission's seed."""
+		cm_game = self.cm_game
+		settings = self.settings
+		settings.difficulty = self.difficulty
+		settings.difficulty_selected = True
+		settings.game_active = True
+		cm_game.game_seed = self.seed
+		self.next_key_event = 0
+
+	# File methods
+
+	def to_bytes(self):
+		"""Return the submission packed into bytes."""
+		settings = self.settings
+		parts = [self.header_format.pack(self.magic, self.version,
+			SaveFile.difficulties.index(settings.difficulty),
+			settings.blocks_per_row, settings.blocks_per_column,
+			settings.block_width, self.seed, self.score, self.ticks,
+			len(self.key_events))]
+		for key_event in self.key_events:
+			parts.append(self.key_event_format.pack(*key_event))
+		return b''.join(parts)
+
+	def from_bytes(self, data):
+		"""
+		Read a submission packed by to_bytes(). Raises ValueError if the
+		data is not a submission.
+		"""
+		(magic, version, difficulty, self.blocks_per_row,
+			self.blocks_per_column, self.block_size, self.seed, self.score,
+			self.ticks, number_of_key_events) = (
+			self.header_format.unpack_from(data, 0))
+		if magic != self.magic:
+			raise ValueError("Not a Colour Match score submission.")
+		if version != self.version:
+			raise ValueError(f"Unsupported submission version: {version}")
+		if difficulty >= len(SaveFile.difficulties):
+			raise ValueError(f"Unknown difficulty: {difficulty}")
+		self.difficulty = SaveFile.difficulties[difficulty]
+		offset = self.header_format.size
+
+		end = offset + number_of_key_events * self.key_event_format.size
+		if len(data) < end:
+			raise ValueError("Submission ends part way through.")
+		self.key_events = [key_event for key_event in
+			self.key_event_format.iter_unpack(data[offset:end])]
+		if any(key_index >= len(self.keys)
+			   for tick, key_down, key_index in self.key_events):
+			raise ValueError("Submission has a key that doesn't exist.")
+
+
+def split_submissions(data):
+	"""
+	Return a list of the submissions in a submissions file's data, each as
+	its own bytes. Raises ValueError if the data is not whole submissions.
+	"""
+	header_format = ScoreSubmission.header_format
+	key_event_size = ScoreSubmission.key_event_format.size
+	submissions = []
+	offset = 0
+	while offset < len(data):
+		if len(data) - offset < header_format.size:
+			raise ValueError("Submissions file ends part way through.")
+		header = header_format.unpack_from(data, offset)
+		magic, number_of_key_events = header[0], header[-1]
+		if magic != ScoreSubmission.magic:
+			raise ValueError("Not a Colour Match score submission.")
+		end = (offset + header_format.size
+			   + number_of_key_events * key_event_size)
+		if end > len(data):
+			raise ValueError("Submissions file ends part way through.")
+		submissions.append(bytes(data[offset:end]))
+		offset = end
+	return submissions
\ No newline at end of file
@@ -1,4 +1,5 @@
-import pygame.font
+import fonts
+import board_events
 
 class Scoreboard:
 	"""A class to report scoring information."""
@@ -12,11 +13,13 @@ class Scoreboard:
 
 		# Font settings for scoring information.
 		self.text_colour = (255, 255, 255)
-		self.font = pygame.font.SysFont(None, 48)
+		self.font_size = 48
+		self.font = fonts.get_font(self.settings.font_name, self.font_size)
 
-		# Prepare the scores as rendered images to be displayed.
+		# Prepare the score as a rendered image to be displayed.
+		#	High scores are only rendered when they are first displayed.
 		self.prep_score()
-		self.prep_high_score()
+		self.high_score_images = None
 
 	def prep_score(self):
 		"""Turn the score into a rendered image."""
@@ -29,6 +32,13 @@ class Scoreboard:
 		self.score_rect.left = 20
 		self.score_rect.top = 20
 
+	def board_changed(self, events):
+		"""Render the score again if a batch of board events changed it."""
+		for event in events:
+			if event[0] == board_events.SCORE_CHANGED:
+				self.prep_score()
+				return
+
 	def prep_high_score(self):
 		"""Turn the high scores into rendered images."""
 		self.high_score_images = []
@@ -64,6 +74,8 @@ class Scoreboard:
 
 	def show_high_score(self):
 		"""Draw high scores to the screen."""
+		if self.high_score_images is None:
+			self.prep_high_score()
 		for place, high_score in enumerate(self.stats.high_scores):
 			self.screen.blit(self.high_score_images[place],
 							 self.high_score_rects[place])
\ No newline at end of file
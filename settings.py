@@ -4,13 +4,17 @@ class Settings:
 	def __init__(self):
 		"""Initialise the settings for the game."""
 		# Screen settings.
-		self.screen_width = 700
-		self.screen_height = 700
+		#	(The screen size is set from the board size below)
 		self.background_colour = (0, 0, 0)
 
-		# Block settings.
-		self.block_width = 50
-		self.block_height = 50
+		# Font used for all text in the game. None uses pygame's default font.
+		self.font_name = None
+
+		# Board settings: a 14x14 grid of 50 pixel blocks.
+		self.set_board_size(14, 14, 50)
+
+		# Max number of removed blocks kept in the pool to be reused.
+		self.block_pool_size = 256
 
 		# Block colours.
 		self.RED = (255, 0, 0)
@@ -18,11 +22,16 @@ class Settings:
 		self.BLUE = (0, 0, 255)
 		self.YELLOW = (255, 255, 0)
 		self.ORANGE = (255, 150, 0)
+		self.block_colours = [self.RED, self.GREEN, self.BLUE,
+							  self.YELLOW, self.ORANGE]
 		
 		# Game settings.
 		self.starting_rows = 3
-		self.blocks_per_row = (self.screen_width //	self.block_width)
-		self.blocks_per_column = (self.screen_height // self.block_height)
+
+		# Puzzle pack to take the starting pile from instead of generating
+		#	it, or None for a random pile, and the puzzle in it to play.
+		self.puzzle_pack_filename = None
+		self.puzzle_number = 0
 
 		# Game will speed up each time the player scores this many points.
 		self.point_intervals_to_increase_speed = 50
@@ -33,6 +42,104 @@ class Settings:
 		# Define how many blocks ahead the player will be able to see.
 		self.buffer_size = 5
 
+		# Save the game each time a block lands so it can be resumed.
+		self.autosave = True
+
+		# Address to stream the game to spectators on: a (host, port) pair,
+		#	a Unix socket path, or None to not stream the game.
+		self.spectator_address = None
+
+		# File to record each game to so it can be played back, or None to
+		#	not record games.
+		self.replay_filename = None
+
+		# File to add games that make the high score table to, with the seed
+		#	and keys needed to verify their scores, or None to not submit
+		#	scores.
+		self.submission_filename = 'score_submissions.bin'
+
+		# Longest game, in ticks, a submitted score is played again for:
+		#	two hours at the simulation's tick rate.
+		self.max_submission_ticks = 240 * 60 * 60 * 2
+
+		# File to log the events of each game to for analysis, or None to
+		#	not log them.
+		self.telemetry_filename = None
+
+		# Simulate the game on its own thread at a fixed number of ticks per
+		#	second, drawing it on the main thread, instead of one tick per
+		#	frame.
+		self.threaded_simulation = False
+		self.simulation_tick_rate = 240
+
+		# Time each frame may take, in milliseconds. Work that doesn't affect
+		#	the game, e.g. rendering text before it is shown or making spare
+		#	blocks, is deferred to the time left over in each frame.
+		self.frame_budget_ms = 1000 / 60
+
+		# Report the frames that went over budget and the work deferred when
+		#	the game is quit.
+		self.show_frame_stats = False
+
+		# Let the window be resized, scaling the board to fit it.
+		self.resizable_window = False
+
+		# Measure how long arrow key presses take to show on the screen and
+		#	report it when the game is quit.
+		self.trace_input_latency = False
+
+		# Versus games over a network: ticks played each second, frames drawn
+		#	each second, ticks each player's keys are delayed by so they reach
+		#	the other computer in time, the most ticks that can be played
+		#	again when keys arrive late, ticks between checks that both
+		#	computers' games are the same, and blocks cleared to send a row
+		#	of blocks to the other player.
+		self.versus_tick_rate = 240
+		self.versus_fps_target = 60
+		self.versus_input_delay = 3
+		self.versus_max_rollback = 12
+		self.versus_checksum_interval = 60
+		self.garbage_blocks_per_row = 6
+
+		# Show particle effects when blocks are removed: the most particles
+		#	alive at once, the particles made for each removed block, the
+		#	frames each particle lasts, and the time drawing them may take
+		#	each frame before effects are dropped.
+		self.particle_effects = True
+		self.particle_capacity = 8192
+		self.particles_per_block = 12
+		self.particle_lifetime = 400
+		self.particle_budget_ms = 2.0
+
+		# Milliseconds the game should take from starting to its first frame
+		#	on screen, with the font cache, or less.
+		self.startup_time_target_ms = 500
+
+		# Frames per second the large board mode should run at or above.
+		self.large_board_fps_target = 60
+
+		# Frames per second four boards in one window should run at or above.
+		self.multi_board_fps_target = 60
+
+		# Frames per second the game should keep to while a blast that clears
+		#	the whole board is shown.
+		self.particle_fps_target = 60
+
+		# Milliseconds 99% of key presses should take to show on screen in
+		#	the scripted input latency benchmark.
+		self.input_latency_target_ms = 20
+
+		# Board steps per second the vectorised simulation of 1024 boards
+		#	should run at or above.
+		self.vector_sim_steps_target = 200000
+
+		# Steps per second the agent environment with 1024 boards should
+		#	run at or above.
+		self.env_steps_target = 200000
+
+		# Submitted games each process should verify per minute or more.
+		self.verify_scores_per_minute_target = 2000
+
 		# Flags for controlling flow of the game.
 		self.game_active = False
 		self.display_instructions = False
@@ -50,6 +157,30 @@ class Settings:
 		#	increase throughout the game.
 		self.set_initial_speed()
 
+	def set_board_size(self, blocks_per_row, blocks_per_column, block_size):
+		"""
+		Set the number of blocks across and up the board and the size of
+		each block in pixels. The screen is sized to fit the board.
+		"""
+		self.blocks_per_row = blocks_per_row
+		self.blocks_per_column = blocks_per_column
+		self.block_width = block_size
+		self.block_height = block_size
+
+		self.screen_width = self.blocks_per_row * self.block_width
+		self.screen_height = self.blocks_per_column * self.block_height
+
+		# Scale the text on special blocks with the size of the blocks.
+		self.block_font_size = max(1, (self.block_height * 48) // 50)
+
+	def set_large_board(self):
+		"""
+		Set up the large board stress mode: a 200x200 grid of 4 pixel blocks.
+		Game should run at large_board_fps_target frames per second or more.
+		"""
+		self.set_board_size(200, 200, 4)
+		self.starting_rows = 20
+
 	def set_initial_speed(self):
 		"""Start the game at the initial speed values."""
 		self.block_speed = 0.4
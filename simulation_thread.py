@@ -0,0 +1,88 @@
+import time
+import threading
+from collections import deque
+
+from render_snapshot import SnapshotPublisher
+
+class SimulationThread:
+	"""
+	Class to run a game's simulation on its own thread at a fixed tick
+	rate, so that slow frames don't hold up input or the blocks' movement.
+
+	Events from the main thread are queued and handled at the start of the
+	next tick. After each tick a RenderSnapshot of the game is published
+	for the main thread to draw.
+	"""
+
+	def __init__(self, cm_game, tick_rate):
+		"""Initialise the simulation thread for the game."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.tick_time = 1 / tick_rate
+
+		# Events waiting for the next tick as (time queued, event) pairs.
+		self.events = deque()
+
+		self.ticks = 0
+		self.publisher = SnapshotPublisher(cm_game)
+
+		# Statistics of how well the fixed tick rate is kept.
+		self.max_lateness = 0.0
+		self.max_input_latency = 0.0
+
+		self.running = False
+		self.thread = None
+		self.error = None
+
+	def start(self):
+		"""Start simulating the game on its own thread."""
+		self.running = True
+		self.thread = threading.Thread(target = self._run, daemon = True)
+		self.thread.start()
+
+	def stop(self):
+		"""Stop the simulation after the tick it is playing."""
+		self.running = False
+		if self.thread:
+			self.thread.join()
+			self.thread = None
+
+	def queue_event(self, event):
+		"""Queue an event to be handled at the start of the next tick."""
+		self.events.append((time.perf_counter(), event))
+
+	def get_snapshot(self):
+		"""Return the snapshot published most recently."""
+		return self.publisher.get_snapshot()
+
+	def _run(self):
+		"""Play ticks at the tick rate until stopped."""
+		try:
+			next_tick = time.perf_counter()
+			while self.running:
+				self.cm_game.frame_scheduler.start_frame()
+				now = time.perf_counter()
+				self.max_lateness = max(self.max_lateness, now - next_tick)
+				while self.events:
+					queued, event = self.events.popleft()
+					self.max_input_latency = max(self.max_input_latency,
+												 now - queued)
+					self.cm_game._handle_event(event)
+				self.cm_game._update_game()
+				self.ticks += 1
+				self.publisher.publish(self.ticks)
+				# Work the game doesn't depend on is done in time to spare.
+				self.cm_game.frame_scheduler.run_deferred()
+
+				next_tick += self.tick_time
+				delay = next_tick - time.perf_counter()
+				if delay > 0:
+					time.sleep(delay)
+				elif delay < -self.tick_time:
+					# Fallen behind by more than a tick, e.g. while the
+					#	process was paused, so don't try to catch up.
+					next_tick = time.perf_counter()
+		except Exception as error:
+			# The main thread reports the error.
+			self.error = error
+			self.running = False
\ No newline at end of file
@@ -0,0 +1,186 @@
+import pygame
+
+import fonts
+from block_atlas import BlockAtlas
+
+class SnapshotRenderer:
+	"""
+	Class to draw a game from RenderSnapshots of it, without reading the
+	game's blocks while they might be changing.
+
+	The game can be drawn onto its own screen, or onto a window of any
+	size. In a window the board is scaled to fit, and everything drawn is
+	prepared at the window's scale each time the window is resized, so no
+	images are scaled while frames are drawn.
+	"""
+
+	def __init__(self, cm_game, window = None):
+		"""Initialise the renderer for the game's screen or a window."""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+
+		# The game's screen keeps the size the game is played at.
+		self.board_rect = cm_game.screen_rect
+		self.scaled = window is not None
+		self.resize(window or cm_game.screen)
+
+	def resize(self, window):
+		"""
+		Fit the board to a window (or the game's screen) and prepare the
+		images to draw it with at that size.
+		"""
+		self.window = window
+		window_width, window_height = window.get_size()
+
+		# Blocks are a whole number of pixels so the pile lines up exactly.
+		self.block_size = self.settings.block_width
+		if self.scaled:
+			self.block_size = max(1, int(min(
+				window_width / self.board_rect.width,
+				window_height / self.board_rect.height)
+				* self.settings.block_width))
+		self.scale = self.block_size / self.settings.block_width
+		board_size = (round(self.board_rect.width * self.scale),
+					  round(self.board_rect.height * self.scale))
+		self.offset = ((window_width - board_size[0]) // 2,
+					   (window_height - board_size[1]) // 2)
+
+		self.atlas = BlockAtlas(self.settings, self.block_size)
+
+		# Everything drawn each frame is inside the board, so the rest of
+		#	the window only needs clearing after it is resized.
+		self.window_cleared = False
+
+		# Image of the settled pile and the codes drawn into it, so only
+		#	the grid positions that change between snapshots are redrawn.
+		self.pile_image = pygame.Surface(board_size)
+		self.pile_image.fill(self.settings.background_colour)
+		self.drawn_codes = bytes(self.settings.blocks_per_row
+								 * self.settings.blocks_per_column)
+
+		# Score image, rendered again only when the score changes.
+		self.score = None
+		self.score_image = None
+		self.score_rect = None
+		self.score_font = fonts.get_font(self.settings.font_name,
+			max(1, round(self.cm_game.sb.font_size * self.scale)))
+
+		# Images of the buttons shown in each state of the game, scaled to
+		#	the window when each state is first shown.
+		self.button_images = {}
+
+	def convert_event(self, event):
+		"""
+		Resize to fit the window when it has been resized, and turn clicks
+		in the window into clicks on the board. Returns the event for the
+		game to handle, or None if it was only for the window.
+		"""
+		if not self.scaled:
+			return event
+		if event.type == pygame.VIDEORESIZE:
+			self.resize(pygame.display.get_surface())
+			return None
+		if event.type == pygame.MOUSEBUTTONDOWN:
+			return pygame.event.Event(event.type, button = event.button,
+									  pos = self.to_board_position(event.pos))
+		return event
+
+	def to_board_position(self, position):
+		"""Turn a position in the window into one on the game's board."""
+		return (int((position[0] - self.offset[0]) / self.scale),
+				int((position[1] - self.offset[1]) / self.scale))
+
+	def draw(self, snapshot):
+		"""Draw a snapshot of the game."""
+		if not self.window_cleared:
+			self.window.fill(self.settings.background_colour)
+			self.window_cleared = True
+
+		self._update_pile_image(snapshot.grid_codes)
+		offset_x, offset_y = self.offset
+		blits = [(self.pile_image, self.offset)]
+
+		atlas_image = self.atlas.image
+		get_code_area = self.atlas.get_code_area
+		scale = self.scale
+		for code, x, y in snapshot.sprites:
+			blits.append((atlas_image, (round(x * scale) + offset_x,
+				round(y * scale) + offset_y), get_code_area(code)))
+
+		# Buffer blocks at the top right of the board, in the same place
+		#	as ColourMatch._display_buffer_blocks().
+		buffer_x = self.pile_image.get_width() - self.block_size + offset_x
+		for number, code in enumerate(snapshot.buffer_codes):
+			position = (buffer_x, (number + 1) * self.block_size + offset_y)
+			blits.append((atlas_image, position, get_code_area(code)))
+		self.window.blits(blits, doreturn = False)
+
+		self._draw_score(snapshot.score)
+		self._draw_buttons(snapshot)
+
+	def _update_pile_image(self, grid_codes):
+		"""Redraw the grid positions whose codes have changed."""
+		if grid_codes == self.drawn_codes:
+			return
+
+		blocks_per_row = self.settings.blocks_per_row
+		block_size = self.block_size
+		pile_bottom = self.pile_image.get_height()
+		for index, code in enumerate(grid_codes):
+			if code == self.drawn_codes[index]:
+				continue
+			x, y = index % blocks_per_row, index // blocks_per_row
+			cell_rect = pygame.Rect(x * block_size,
+				pile_bottom - (y + 1) * block_size, block_size, block_size)
+			if code:
+				self.pile_image.blit(self.atlas.image, cell_rect,
+									 self.atlas.get_code_area(code))
+			else:
+				self.pile_image.fill(self.settings.background_colour,
+									 cell_rect)
+		self.drawn_codes = grid_codes
+
+	def _draw_score(self, score):
+		"""Draw the score where Scoreboard does."""
+		scoreboard = self.cm_game.sb
+		if score != self.score:
+			self.score = score
+			self.score_image = self.score_font.render(str(score), True,
+				scoreboard.text_colour, self.settings.background_colour)
+			self.score_rect = self.score_image.get_rect()
+			self.score_rect.left = round(20 * self.scale) + self.offset[0]
+			self.score_rect.top = round(20 * self.scale) + self.offset[1]
+		self.window.blit(self.score_image, self.score_rect)
+
+	def _draw_buttons(self, snapshot):
+		"""Draw the buttons for the state of the game in the snapshot."""
+		if not self.scaled:
+			self.cm_game._draw_buttons(snapshot)
+			return
+
+		# The buttons for each state are drawn by the game at its own size
+		#	onto its clear screen, then the area they cover is scaled once
+		#	to fit the window. The high score screen is drawn again whenever
+		#	the high scores change.
+		if snapshot.display_high_scores:
+			high_scores = tuple(self.cm_game.stats.high_scores)
+		else:
+			high_scores = None
+		state = (snapshot.game_active, snapshot.difficulty_selected,
+				 snapshot.display_instructions, snapshot.display_high_scores,
+				 snapshot.game_over, snapshot.game_won, snapshot.game_paused,
+				 self.cm_game.save_file.saved_game_exists, high_scores)
+		if state not in self.button_images:
+			screen = self.cm_game.screen
+			screen.fill((0, 0, 0, 0))
+			self.cm_game._draw_buttons(snapshot)
+			area = screen.get_bounding_rect()
+			image = pygame.transform.smoothscale(screen.subsurface(area),
+				(round(area.width * self.scale),
+				 round(area.height * self.scale)))
+			position = (round(area.x * self.scale) + self.offset[0],
+						round(area.y * self.scale) + self.offset[1])
+			self.button_images[state] = (image, position)
+
+		image, position = self.button_images[state]
+		self.window.blit(image, position)
\ No newline at end of file
@@ -0,0 +1,275 @@
+import os
+import queue
+import socket
+import struct
+import threading
+
+import board_events
+from block_codes import get_block_code
+
+# Start of the stream, sent to each spectator before its first message:
+#	magic and version.
+MAGIC = b'CMSP'
+VERSION = 1
+stream_header_format = struct.Struct('<4sB')
+
+# Kinds of message sent to spectators. Each message is a message header
+#	followed by the message.
+KEYFRAME = 1
+DELTA = 2
+
+# Message header: length of the message and its kind.
+message_header_format = struct.Struct('<IB')
+# Start of every message: tick, score, current block code and position.
+tick_format = struct.Struct('<IIBhh')
+# Keyframe: blocks per row and per column, followed by one block code per
+#	grid position, row by row from the bottom.
+keyframe_format = struct.Struct('<HH')
+# Delta: number of changed grid positions, followed by each one.
+count_format = struct.Struct('<H')
+changed_position_format = struct.Struct('<HHB')
+
+
+class SpectatorServer:
+	"""
+	Class to stream a game to spectators over a local TCP or Unix socket.
+
+	New spectators are sent a keyframe of the whole board, then a delta each
+	tick holding only the grid positions that changed. Sockets are handled
+	by a background thread: the game only encodes each tick and puts it on
+	a queue, so it never waits for spectators. Spectators that fall too far
+	behind are disconnected.
+	"""
+
+	def __init__(self, cm_game, address, max_queued_messages = 1024,
+				 max_client_buffer = 65536):
+		"""
+		Initialise the server. Address is a (host, port) pair for TCP or a
+		file path for a Unix socket.
+		"""
+		self.cm_game = cm_game
+		self.settings = cm_game.settings
+		self.address = address
+		self.max_client_buffer = max_client_buffer
+
+		# Messages encoded by the game waiting for the background thread.
+		self.messages = queue.Queue(max_queued_messages)
+
+		# Grid positions changed since the last tick was published.
+		self.changed_positions = set()
+		self.tick = 0
+
+		# Set by the game when spectators need a keyframe, e.g. after a new
+		#	row.
+		self.keyframe_needed = True
+
+		# Keyframes asked for by the background thread as spectators
+		#	connect, and the number of those requests the game has sent a
+		#	keyframe for. Each count is only changed by one thread, so a
+		#	request made while a keyframe is being sent isn't lost.
+		self.keyframe_requests = 0
+		self.keyframe_requests_sent = 0
+
+		# Spectators waiting for a keyframe, and spectators receiving deltas.
+		#	Both map each socket to the bytes still to be sent to it.
+		self.waiting_clients = {}
+		self.clients = {}
+		self.clients_dropped = 0
+
+		self.running = False
+		self.thread = None
+
+	def start(self):
+		"""Open the socket and start the background thread."""
+		if isinstance(self.address, str):
+			if os.path.exists(self.address):
+				os.remove(self.address)
+			self.server_socket = socket.socket(socket.AF_UNIX,
+											   socket.SOCK_STREAM)
+		else:
+			self.server_socket = socket.socket(socket.AF_INET,
+											   socket.SOCK_STREAM)
+			self.server_socket.setsockopt(socket.SOL_SOCKET,
+										  socket.SO_REUSEADDR, 1)
+		self.server_socket.bind(self.address)
+		self.server_socket.listen()
+		self.server_socket.setblocking(False)
+
+		# Find the address actually used, e.g. when port 0 was asked for.
+		self.address = self.server_socket.getsockname()
+
+		self.running = True
+		self.thread = threading.Thread(target = self._run, daemon = True)
+		self.thread.start()
+
+	def stop(self):
+		"""Stop the background thread and close all the sockets."""
+		self.running = False
+		if self.thread:
+			self.thread.join()
+		for client_socket in (list(self.waiting_clients)
+							  + list(self.clients)):
+			client_socket.close()
+		self.waiting_clients.clear()
+		self.clients.clear()
+		self.server_socket.close()
+		if isinstance(self.address, str) and os.path.exists(self.address):
+			os.remove(self.address)
+
+	def board_changed(self, events):
+		"""Record the grid positions changed by a batch of board events."""
+		positions = board_events.get_changed_positions(events)
+		if positions is None:
+			# The whole grid has changed, e.g. after a new row.
+			self.keyframe_needed = True
+		else:
+			self.changed_positions.update(positions)
+
+	def publish(self):
+		"""Encode this tick of the game and queue it for spectators."""
+		self.tick += 1
+		keyframe_requests = self.keyframe_requests
+		if (self.keyframe_needed
+			or keyframe_requests != self.keyframe_requests_sent):
+			message = self._encode_keyframe()
+			kind = KEYFRAME
+		else:
+			message = self._encode_delta()
+			kind = DELTA
+
+		try:
+			self.messages.put_nowait(
+				message_header_format.pack(len(message), kind) + message)
+		except queue.Full:
+			# Background thread is behind, so spectators will miss this tick
+			#	and need a keyframe to catch up.
+			self.keyframe_needed = True
+			return
+
+		self.changed_positions.clear()
+		if kind == KEYFRAME:
+			self.keyframe_needed = False
+			self.keyframe_requests_sent = keyframe_requests
+
+	def _encode_tick(self):
+		"""Encode the parts of a message that are sent every tick."""
+		cm_game = self.cm_game
+		block = cm_game.current_block
+		if block:
+			current_block = (get_block_code(self.settings, block),
+							 block.rect.x, block.rect.y)
+		else:
+			current_block = (0, 0, 0)
+
+		return (tick_format.pack(self.tick, cm_game.stats.score,
+								 *current_block)
+				+ bytes(get_block_code(self.settings, block)
+						for block in cm_game.buffer))
+
+	def _encode_keyframe(self):
+		"""Encode the whole board."""
+		settings = self.settings
+		grid = self.cm_game.grid
+		return (self._encode_tick()
+				+ keyframe_format.pack(settings.blocks_per_row,
+									   settings.blocks_per_column)
+				+ bytes(get_block_code(settings, grid[(x, y)])
+						for y in range(settings.blocks_per_column)
+						for x in range(settings.blocks_per_row)))
+
+	def _encode_delta(self):
+		"""Encode the grid positions that have changed since the last tick."""
+		grid = self.cm_game.grid
+		rows = self.settings.blocks_per_column
+
+		# Ignore blocks pushed off the top of the board by a new row.
+		changed_positions = [position for position in self.changed_positions
+							 if 0 <= position[1] < rows]
+
+		parts = [self._encode_tick(), count_format.pack(len(changed_positions))]
+		for position in changed_positions:
+			parts.append(changed_position_format.pack(position[0],
+				position[1], get_block_code(self.settings, grid[position])))
+		return b''.join(parts)
+
+	def _run(self):
+		"""Accept spectators and send them messages until stopped."""
+		while self.running:
+			try:
+				message = self.messages.get(timeout = 0.005)
+			except queue.Empty:
+				message = None
+
+			while message:
+				self._add_message(message)
+				try:
+					message = self.messages.get_nowait()
+				except queue.Empty:
+					message = None
+
+			self._accept_clients()
+			self._check_waiting_clients()
+			self._send_to_clients()
+
+	def _accept_clients(self):
+		"""Accept any new spectators and ask the game for a keyframe."""
+		while True:
+			try:
+				client_socket, address = self.server_socket.accept()
+			except BlockingIOError:
+				return
+			client_socket.setblocking(False)
+			# Stream header is sent ahead of the spectator's first keyframe.
+			self.waiting_clients[client_socket] = bytearray(
+				stream_header_format.pack(MAGIC, VERSION))
+			self.keyframe_requests += 1
+
+	def _check_waiting_clients(self):
+		"""Disconnect spectators that have gone while waiting for a keyframe."""
+		for client_socket in list(self.waiting_clients):
+			try:
+				# Reading returns no data only once the spectator has closed
+				#	its socket. Anything it sends is left unread.
+				if client_socket.recv(1, socket.MSG_PEEK):
+					continue
+			except BlockingIOError:
+				continue
+			except OSError:
+				pass
+			self._drop_client(client_socket)
+
+	def _add_message(self, message):
+		"""Add a message to the bytes waiting to be sent to spectators."""
+		kind = message[message_header_format.size - 1]
+		if kind == KEYFRAME:
+			# Spectators waiting for a keyframe can now receive deltas.
+			self.clients.update(self.waiting_clients)
+			self.waiting_clients.clear()
+
+		for client_socket, data in list(self.clients.items()):
+			if len(data) + len(message) > self.max_client_buffer:
+				# Spectator isn't keeping up so disconnect it.
+				self._drop_client(client_socket)
+			else:
+				data += message
+
+	def _send_to_clients(self):
+		"""Send as much waiting data as each spectator's socket will take."""
+		for client_socket, data in list(self.clients.items()):
+			if not data:
+				continue
+			try:
+				sent = client_socket.send(data)
+			except BlockingIOError:
+				continue
+			except OSError:
+				self._drop_client(client_socket)
+				continue
+			del data[:sent]
+
+	def _drop_client(self, client_socket):
+		"""Disconnect a spectator, whether or not it is waiting for a keyframe."""
+		self.clients.pop(client_socket, None)
+		self.waiting_clients.pop(client_socket, None)
+		client_socket.close()
+		self.clients_dropped += 1
\ No newline at end of file
@@ -0,0 +1,177 @@
+import sys
+import time
+import socket
+import struct
+import argparse
+
+from settings import Settings
+from block_codes import is_block_code
+from spectator import (MAGIC, VERSION, KEYFRAME, DELTA, stream_header_format,
+					   message_header_format, tick_format, keyframe_format,
+					   count_format, changed_position_format)
+
+class SpectatorClient:
+	"""
+	Class to follow a game streamed by a SpectatorServer, keeping a copy of
+	the board as block codes. Stands in for spectator and overlay programs.
+	"""
+
+	def __init__(self, address, buffer_size = 5):
+		"""Connect to the server at a (host, port) pair or Unix socket path."""
+		if isinstance(address, str):
+			self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		else:
+			self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.socket.connect(address)
+		self.buffer_size = buffer_size
+		self.received = bytearray()
+		self.stream_header_read = False
+
+		# Block codes are checked against the game's block colours.
+		self.settings = Settings()
+
+		# Copy of the game, filled in by the first keyframe.
+		self.blocks_per_row = 0
+		self.blocks_per_column = 0
+		self.grid = bytearray()
+		self.tick = 0
+		self.score = 0
+		self.current_block = (0, 0, 0)
+		self.buffer = b''
+
+		# Statistics for the stream.
+		self.keyframes = 0
+		self.deltas = 0
+		self.bytes_received = 0
+
+	def get_block_code(self, x, y):
+		"""Return the code of the block at a grid position."""
+		return self.grid[y * self.blocks_per_row + x]
+
+	def receive(self):
+		"""
+		Wait for data from the server and apply every whole message in it.
+		Returns False once the server has closed the connection. Raises
+		ValueError or struct.error if the stream is damaged, leaving the copy
+		of the game as it was after the last whole message.
+		"""
+		data = self.socket.recv(65536)
+		if not data:
+			if self.received:
+				raise ValueError("Stream ends part way through a message.")
+			return False
+		self.bytes_received += len(data)
+		self.received += data
+
+		if not self.stream_header_read:
+			if len(self.received) < stream_header_format.size:
+				return True
+			magic, version = stream_header_format.unpack_from(self.received)
+			if magic != MAGIC:
+				raise ValueError("Not a Colour Match spectator stream.")
+			if version != VERSION:
+				raise ValueError(f"Unsupported stream version: {version}")
+			del self.received[:stream_header_format.size]
+			self.stream_header_read = True
+
+		while len(self.received) >= message_header_format.size:
+			length, kind = message_header_format.unpack_from(self.received)
+			end = message_header_format.size + length
+			if len(self.received) < end:
+				break
+			message = bytes(self.received[message_header_format.size:end])
+			del self.received[:end]
+			self._apply_message(kind, message)
+		return True
+
+	def close(self):
+		"""Disconnect from the server."""
+		self.socket.close()
+
+	def _apply_message(self, kind, message):
+		"""
+		Update the copy of the game from one message. The whole message is
+		read and checked before the copy is changed.
+		"""
+		if kind not in (KEYFRAME, DELTA):
+			raise ValueError(f"Unknown message kind: {kind}")
+		tick, score, code, x, y = tick_format.unpack_from(message)
+		current_block = (code, x, y)
+		offset = tick_format.size
+		buffer = message[offset:offset + self.buffer_size]
+		if len(buffer) != self.buffer_size:
+			raise ValueError("Message ends part way through the buffer.")
+		offset += self.buffer_size
+		codes = set(buffer)
+		codes.add(code)
+
+		if kind == KEYFRAME:
+			blocks_per_row, blocks_per_column = keyframe_format.unpack_from(
+																message, offset)
+			offset += keyframe_format.size
+			grid = bytearray(message[offset:])
+			if len(grid) != blocks_per_row * blocks_per_column:
+				raise ValueError("Keyframe isn't the size of its board.")
+			codes.update(grid)
+		else:
+			if not self.keyframes:
+				raise ValueError("Delta sent before the first keyframe.")
+			count, = count_format.unpack_from(message, offset)
+			offset += count_format.size
+			changes = []
+			for number in range(count):
+				change = changed_position_format.unpack_from(message, offset)
+				offset += changed_position_format.size
+				if (change[0] >= self.blocks_per_row
+					or change[1] >= self.blocks_per_column):
+					raise ValueError("Delta changes a position off the board.")
+				changes.append(change)
+				codes.add(change[2])
+
+		if not all(is_block_code(self.settings, code) for code in codes):
+			raise ValueError("Message has an unknown block code.")
+
+		self.tick, self.score = tick, score
+		self.current_block = current_block
+		self.buffer = buffer
+		if kind == KEYFRAME:
+			self.blocks_per_row = blocks_per_row
+			self.blocks_per_column = blocks_per_column
+			self.grid = grid
+			self.keyframes += 1
+		else:
+			for x, y, code in changes:
+				self.grid[y * self.blocks_per_row + x] = code
+			self.deltas += 1
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Follow a Colour Match game streamed to spectators.")
+	parser.add_argument("--port", type = int, help = "TCP port of the game")
+	parser.add_argument("--socket", help = "Unix socket path of the game")
+	args = parser.parse_args()
+
+	if args.socket:
+		address = args.socket
+	elif args.port:
+		address = ('127.0.0.1', args.port)
+	else:
+		sys.exit("Give the --port or --socket the game is streaming on.")
+
+	client = SpectatorClient(address)
+	last_report = time.perf_counter()
+	try:
+		while client.receive():
+			# Report on the game and stream once a second.
+			now = time.perf_counter()
+			if now - last_report >= 1:
+				blocks = sum(1 for code in client.grid if code)
+				print(f"tick {client.tick}: score {client.score}, "
+					  f"{blocks} blocks, {client.bytes_received} bytes, "
+					  f"{client.keyframes} keyframes, {client.deltas} deltas")
+				last_report = now
+	except (ValueError, struct.error) as error:
+		sys.exit(f"Can't follow the stream: {error}")
+	finally:
+		client.close()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import random
+import struct
+from array import array
+
+import board_events
+
+# Kinds of event recorded in the telemetry log. Each event also has a
+#	value, given after its kind.
+GAME_START = 0		# Index of the difficulty in Telemetry.difficulties.
+LANDING = 1			# Code of the block that landed. (See block_codes)
+MATCH = 2			# Number of blocks in the match.
+SPECIAL_1 = 3		# Number of blocks the type 1 special block removed.
+SPECIAL_2 = 4		# Number of blocks the type 2 special block removed.
+ROW_PUSH = 5		# No value.
+SPEED_UP = 6		# Score the game sped up at.
+GAME_OVER = 7		# Final score.
+GAME_WON = 8		# Final score.
+
+
+class Telemetry:
+	"""
+	Class to record the events of each game into an append-only columnar
+	log for analysing many games at once.
+
+	Events are kept in one typed array per column until a chunk of
+	chunk_size events is full, then the chunk is appended to the log file
+	by the game's I/O worker. Each chunk is stored column by column so
+	queries only need to read the columns they use.
+	"""
+
+	magic = b'CMTC'
+	difficulties = ["easy", "medium", "hard"]
+
+	# Chunk header: magic and number of events in the chunk.
+	chunk_header_format = struct.Struct('<4sI')
+	# Columns of a chunk in the order they are stored, with their array
+	#	type codes. Largest first so every column stays aligned.
+	columns = [("game", 'Q'), ("tick", 'I'), ("value", 'I'), ("kind", 'B')]
+
+	def __init__(self, cm_game, filename = 'telemetry.bin',
+				 chunk_size = 4096):
+		"""Initialise the telemetry for the game."""
+		self.cm_game = cm_game
+		self.filename = filename
+		self.chunk_size = chunk_size
+
+		# Number for the game being played, so its events can be grouped.
+		self.game = 0
+
+		self._start_chunk()
+
+	def start_game(self, difficulty):
+		"""Give the game that is starting a new number and record it."""
+		self.game = random.getrandbits(63)
+		self.record(GAME_START, self.difficulties.index(difficulty))
+
+	def record(self, kind, value = 0):
+		"""Record an event of the game being played."""
+		self.game_column.append(self.game)
+		self.tick_column.append(self.cm_game.game_ticks)
+		self.value_column.append(value)
+		self.kind_column.append(kind)
+		if len(self.kind_column) >= self.chunk_size:
+			self.flush()
+
+	def board_changed(self, events):
+		"""Record the rows pushed and special blocks used in a batch of events."""
+		for event in events:
+			kind = event[0]
+			if kind == board_events.ROW_PUSHED:
+				self.record(ROW_PUSH)
+			elif kind == board_events.SPECIAL_ACTIVATED:
+				special_type, blocks_removed = event[1], event[2]
+				if special_type == 1:
+					self.record(SPECIAL_1, blocks_removed)
+				else:
+					self.record(SPECIAL_2, blocks_removed)
+
+	def flush(self):
+		"""Queue the events recorded so far to be appended to the log."""
+		number_of_events = len(self.kind_column)
+		if not number_of_events:
+			return
+
+		parts = [self.chunk_header_format.pack(self.magic, number_of_events),
+				 self.game_column.tobytes(), self.tick_column.tobytes(),
+				 self.value_column.tobytes(), self.kind_column.tobytes()]
+		# Pad the chunk so the next chunk's columns are aligned too.
+		parts.append(bytes(-sum(len(part) for part in parts) % 8))
+		# Chunks are dropped rather than let the log hold up other files.
+		self.cm_game.io_worker.append_file(self.filename, b''.join(parts),
+										   droppable = True)
+
+		self._start_chunk()
+
+	def _start_chunk(self):
+		"""Start new, empty column arrays for the next chunk."""
+		self.game_column = array('Q')
+		self.tick_column = array('I')
+		self.value_column = array('I')
+		self.kind_column = array('B')
\ No newline at end of file
@@ -0,0 +1,110 @@
+import mmap
+import argparse
+from array import array
+
+import numpy as np
+
+import telemetry
+from telemetry import Telemetry
+
+class TelemetryLog:
+	"""
+	Class to read the columns of a telemetry log as NumPy arrays. Only the
+	parts of the file that hold the columns asked for are read.
+	"""
+
+	def __init__(self, filename = 'telemetry.bin'):
+		"""Open the log and find where each chunk's columns are."""
+		self.file_object = open(filename, 'rb')
+		self.data = mmap.mmap(self.file_object.fileno(), 0,
+							  access = mmap.ACCESS_READ)
+
+		# The number of events in each chunk and the offset of each of its
+		#	columns.
+		self.chunks = []
+		offset = 0
+		while offset < len(self.data):
+			magic, number_of_events = (
+				Telemetry.chunk_header_format.unpack_from(self.data, offset))
+			if magic != Telemetry.magic:
+				raise ValueError(f"Not a telemetry chunk at byte {offset}.")
+			offset += Telemetry.chunk_header_format.size
+
+			column_offsets = {}
+			for name, type_code in Telemetry.columns:
+				column_offsets[name] = offset
+				offset += number_of_events * array(type_code).itemsize
+			offset += -offset % 8
+			self.chunks.append((number_of_events, column_offsets))
+
+	def column(self, name):
+		"""Return the values of a column for every event as one array."""
+		dtype = np.dtype(dict(Telemetry.columns)[name])
+		parts = [np.frombuffer(self.data, dtype = dtype,
+							   count = number_of_events,
+							   offset = column_offsets[name])
+				 for number_of_events, column_offsets in self.chunks]
+		if not parts:
+			return np.zeros(0, dtype = dtype)
+		return np.concatenate(parts)
+
+	def close(self):
+		"""Close the log file."""
+		self.data.close()
+		self.file_object.close()
+
+
+def summarise(log):
+	"""Return lines summarising every game in a telemetry log."""
+	# Only the kind, value and tick columns are needed.
+	kinds = log.column("kind")
+	values = log.column("value")
+	ticks = log.column("tick")
+
+	number_of_games = max(np.count_nonzero(kinds == telemetry.GAME_START), 1)
+	lines = [f"Games: {np.count_nonzero(kinds == telemetry.GAME_START)} "
+			 f"({len(kinds)} events)"]
+
+	ended = (kinds == telemetry.GAME_OVER) | (kinds == telemetry.GAME_WON)
+	lines.append(f"  game over: {np.count_nonzero(kinds == telemetry.GAME_OVER)}"
+				 f", won: {np.count_nonzero(kinds == telemetry.GAME_WON)}")
+	if ended.any():
+		lines.append(f"  mean final score: {values[ended].mean():.1f}")
+		lines.append(f"  mean frames to the end of the game: "
+					 f"{ticks[ended].mean():.0f}")
+
+	for name, kind in [("landings", telemetry.LANDING),
+					   ("matches", telemetry.MATCH),
+					   ("type 1 special blocks", telemetry.SPECIAL_1),
+					   ("type 2 special blocks", telemetry.SPECIAL_2),
+					   ("row pushes", telemetry.ROW_PUSH),
+					   ("speed ups", telemetry.SPEED_UP)]:
+		count = np.count_nonzero(kinds == kind)
+		lines.append(f"  {name} per game: {count / number_of_games:.2f}")
+
+	for name, kind in [("type 1", telemetry.SPECIAL_1),
+					   ("type 2", telemetry.SPECIAL_2)]:
+		removed = values[kinds == kind]
+		if len(removed):
+			lines.append(f"  blocks removed per {name} special block: "
+						 f"{removed.mean():.2f}")
+
+	match_sizes = np.bincount(values[kinds == telemetry.MATCH])
+	lines.append("  matches by size:")
+	for size in np.flatnonzero(match_sizes):
+		lines.append(f"    {size} blocks: {match_sizes[size]}")
+
+	return lines
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Summarise the games in a Colour Match telemetry log.")
+	parser.add_argument("log", nargs = "?", default = "telemetry.bin",
+						help = "telemetry log recorded with --telemetry")
+	args = parser.parse_args()
+
+	log = TelemetryLog(args.log)
+	for line in summarise(log):
+		print(line)
+	log.close()
\ No newline at end of file
@@ -0,0 +1,368 @@
+import numpy as np
+
+from settings import Settings
+from block_codes import EMPTY, SPECIAL
+
+class VectorSim:
+	"""
+	Class to play many boards of Colour Match at once with NumPy, e.g. for
+	balancing the game or training agents to play it.
+
+	Every board is held in one (boards, rows, columns) array of block codes,
+	row 0 at the bottom as in the game's grid, and each step works on all
+	of the boards together. A step is one block landing: each board's
+	current block is dropped into the column chosen for it and the board is
+	settled, i.e. matches are cleared and blocks above fall, until nothing
+	more changes. The rules are the ones in the ColourMatch methods, with
+	a new row pushed in after every new_row_interval blocks instead of
+	after a number of frames.
+
+	The arrays are only ever changed in place, so views of them (e.g. the
+	grids) stay up to date from step to step.
+	"""
+
+	def __init__(self, number_of_boards, settings = None,
+				 difficulty = "hard", new_row_interval = 20, seed = None):
+		"""Initialise the boards. They are set up by reset()."""
+		if settings:
+			self.settings = settings
+		else:
+			self.settings = Settings()
+		self.settings.difficulty = difficulty
+		self.settings.set_difficulty()
+
+		self.number_of_boards = number_of_boards
+		self.rows = self.settings.blocks_per_column
+		self.columns = self.settings.blocks_per_row
+		self.number_of_colours = len(self.settings.colour_list)
+		self.new_row_interval = new_row_interval
+		self.rng = np.random.default_rng(seed)
+
+		shape = (number_of_boards, self.rows, self.columns)
+		self.grids = np.zeros(shape, dtype = np.uint8)
+		self.current_blocks = np.zeros(number_of_boards, dtype = np.uint8)
+		self.buffers = np.zeros((number_of_boards, self.settings.buffer_size),
+								dtype = np.uint8)
+		self.scores = np.zeros(number_of_boards, dtype = np.int64)
+		self.blocks_dropped = np.zeros(number_of_boards, dtype = np.int64)
+		self.game_over = np.zeros(number_of_boards, dtype = bool)
+		self.game_won = np.zeros(number_of_boards, dtype = bool)
+
+		# Row and column numbers of every grid position, for finding the
+		#	positions in a special block's blast radius.
+		self.row_numbers = np.arange(self.rows).reshape(1, self.rows, 1)
+		self.column_numbers = np.arange(self.columns).reshape(1, 1,
+																self.columns)
+
+		self.reset()
+
+	def reset(self, boards = None):
+		"""
+		Start new games on the boards given as an array of board numbers,
+		or on every board if none are given.
+		"""
+		if boards is None:
+			boards = np.arange(self.number_of_boards)
+		if not len(boards):
+			return
+
+		self.grids[boards] = EMPTY
+		self.scores[boards] = 0
+		self.blocks_dropped[boards] = 0
+		self.game_over[boards] = False
+		self.game_won[boards] = False
+
+		# Create an initial pile with no matches in it, from the bottom up
+		#	as in ColourMatch._create_starting_blocks().
+		for y in range(self.settings.starting_rows):
+			next_row = self.grids[boards, y - 1] if y >= 1 else None
+			second_row = self.grids[boards, y - 2] if y >= 2 else None
+			self.grids[boards, y] = self._generate_rows(len(boards),
+														next_row, second_row)
+
+		# Fill the buffer then take the current block from the front of it.
+		self.buffers[boards] = self._random_blocks(
+							(len(boards), self.settings.buffer_size))
+		self._start_next_blocks(boards)
+
+	def step(self, columns, boards = None):
+		"""
+		Drop each board's current block into the column given for it in an
+		array of column numbers and settle the boards. Only the boards in
+		an array of board numbers drop their blocks if it is given. Returns
+		the points each board scored. Boards whose games have ended are
+		left as they are until they are reset.
+		"""
+		columns = np.asarray(columns)
+		points = np.zeros(self.number_of_boards, dtype = np.int64)
+		playing = ~(self.game_over | self.game_won)
+		if boards is None:
+			boards = np.flatnonzero(playing)
+		else:
+			boards = boards[playing[boards]]
+		if not len(boards):
+			return points
+		columns = columns[boards]
+		blocks = self.current_blocks[boards]
+
+		# Blocks land on top of the pile in their column.
+		heights = np.count_nonzero(self.grids[boards, :, columns], axis = 1)
+
+		# Standard blocks are added to the pile.
+		standard = blocks < SPECIAL
+		self.grids[boards[standard], heights[standard],
+				   columns[standard]] = blocks[standard]
+
+		# Special blocks are used up as they land.
+		removed = np.zeros((len(boards), self.rows, self.columns),
+						   dtype = bool)
+		self._find_special_block_1(boards, blocks, columns, heights, removed)
+		self._find_special_block_2(boards, blocks, columns, heights, removed)
+		if removed.any():
+			points[boards] += self._remove_blocks(boards, removed)
+
+		# A standard block can only make a match through the position it
+		#	lands in, so only boards where that happens or a special block
+		#	landed need settling.
+		unsettled = ~standard | self._makes_match(boards, blocks, columns,
+												   heights)
+		points[boards[unsettled]] += self._settle(boards[unsettled])
+
+		self.blocks_dropped[boards] += 1
+		new_row_boards = boards[
+					self.blocks_dropped[boards] % self.new_row_interval == 0]
+		if len(new_row_boards):
+			self._add_new_rows(new_row_boards)
+
+		self._start_next_blocks(boards)
+		self._check_end_conditions(boards)
+
+		self.scores[boards] += points[boards]
+		return points
+
+	def _random_blocks(self, shape):
+		"""
+		Return codes for new random blocks with the same chances as
+		Block.reset(): one in ten is special, half of those type 1.
+		"""
+		special = self.rng.random(shape) > 0.9
+		type_1 = self.rng.random(shape) > 0.5
+		blast_radius = self.rng.integers(2, 6, shape)
+		colour = self.rng.integers(1, self.number_of_colours + 1, shape)
+		return np.where(special,
+						np.where(type_1, SPECIAL, SPECIAL + blast_radius),
+						colour).astype(np.uint8)
+
+	def _start_next_blocks(self, boards):
+		"""Take the next block for each board from the front of its buffer."""
+		self.current_blocks[boards] = self.buffers[boards, 0]
+		self.buffers[boards, :-1] = self.buffers[boards, 1:]
+		self.buffers[boards, -1] = self._random_blocks(len(boards))
+
+	def _generate_rows(self, number_of_rows, next_row = None,
+					   second_row = None):
+		"""
+		Generate a row for each board with no colour matches in it, as
+		RowGenerator.generate_row() does. next_row and second_row are the
+		rows the new rows sit against, with EMPTY where there is no block.
+		"""
+		rows = np.zeros((number_of_rows, self.columns), dtype = np.uint8)
+		for x in range(self.columns):
+			# Find the (at most two) colours that would complete three in a
+			#	row, as 0 where there is no such colour.
+			banned_left = np.zeros(number_of_rows, dtype = np.uint8)
+			if x >= 2:
+				banned_left = np.where(rows[:, x - 1] == rows[:, x - 2],
+									   rows[:, x - 1], 0)
+			banned_below = np.zeros(number_of_rows, dtype = np.uint8)
+			if next_row is not None and second_row is not None:
+				banned_below = np.where(next_row[:, x] == second_row[:, x],
+										next_row[:, x], 0)
+			banned_below[banned_below == banned_left] = 0
+
+			# Choose from the allowed colours by choosing from a range that
+			#	is short by the number of banned colours, then stepping over
+			#	the banned colours in order.
+			number_banned = ((banned_left > 0).astype(np.int64)
+							 + (banned_below > 0))
+			colour = 1 + (self.rng.random(number_of_rows)
+						  * (self.number_of_colours - number_banned)
+						  ).astype(np.int64)
+			first_banned = np.where(banned_below > 0,
+				np.where(banned_left > 0,
+						 np.minimum(banned_left, banned_below), banned_below),
+				banned_left)
+			second_banned = np.where((banned_left > 0) & (banned_below > 0),
+									 np.maximum(banned_left, banned_below), 0)
+			colour += (first_banned > 0) & (colour >= first_banned)
+			colour += (second_banned > 0) & (colour >= second_banned)
+			rows[:, x] = colour
+
+		return rows
+
+	def _makes_match(self, boards, blocks, columns, heights):
+		"""
+		Check if each block makes three in a row with the blocks beside and
+		below the position it landed in.
+		"""
+		def same_colour(x_offset, y_offset):
+			# Positions off the board never match.
+			x = columns + x_offset
+			y = heights + y_offset
+			on_board = (x >= 0) & (x < self.columns) & (y >= 0)
+			return on_board & (self.grids[boards, np.maximum(y, 0),
+				np.clip(x, 0, self.columns - 1)] == blocks)
+
+		left = same_colour(-1, 0)
+		right = same_colour(1, 0)
+		blocks_across = (left.astype(np.int64) + right
+						 + (left & same_colour(-2, 0))
+						 + (right & same_colour(2, 0)))
+		line_up = same_colour(0, -1) & same_colour(0, -2)
+		return (blocks_across >= 2) | line_up
+
+	def _find_special_block_1(self, boards, blocks, columns, heights,
+							  removed):
+		"""
+		Mark the blocks removed by type 1 special blocks: every block the
+		same colour as the block the special block lands on.
+		"""
+		# Special block landing at the bottom has no block below it.
+		landed = (blocks == SPECIAL) & (heights > 0)
+		if not landed.any():
+			return
+		indices = np.flatnonzero(landed)
+		colours = self.grids[boards[indices], heights[indices] - 1,
+							 columns[indices]]
+		removed[indices] |= (self.grids[boards[indices]]
+							 == colours[:, None, None])
+
+	def _find_special_block_2(self, boards, blocks, columns, heights,
+							  removed):
+		"""
+		Mark the blocks removed by type 2 special blocks: every block
+		within the blast radius of where the special block lands.
+		"""
+		landed = blocks > SPECIAL
+		if not landed.any():
+			return
+		indices = np.flatnonzero(landed)
+		blast_radius = (blocks[indices] - SPECIAL).reshape(-1, 1, 1)
+		# The position the special block lands in is empty so is never
+		#	marked.
+		in_blast = ((np.abs(self.row_numbers
+					- heights[indices].reshape(-1, 1, 1)) <= blast_radius)
+					& (np.abs(self.column_numbers
+					- columns[indices].reshape(-1, 1, 1)) <= blast_radius))
+		removed[indices] |= in_blast & (self.grids[boards[indices]] != EMPTY)
+
+	def _remove_blocks(self, boards, removed):
+		"""Remove the marked blocks and return the points for each board."""
+		grids = self.grids[boards]
+		points = np.count_nonzero(removed, axis = (1, 2))
+		grids[removed] = EMPTY
+		self.grids[boards] = grids
+		return points
+
+	def _settle(self, boards):
+		"""
+		Let blocks fall and clear matches until nothing more changes, as
+		the game does over the frames after a block lands. Returns the
+		points for each board.
+		"""
+		points = np.zeros(len(boards), dtype = np.int64)
+		unsettled = np.arange(len(boards))
+		while len(unsettled):
+			grids = self.grids[boards[unsettled]]
+			self._apply_gravity(grids)
+			matched = self._find_matches(grids)
+			matched_count = np.count_nonzero(matched, axis = (1, 2))
+			grids[matched] = EMPTY
+			self.grids[boards[unsettled]] = grids
+			points[unsettled] += matched_count
+
+			# Boards with no matches are settled.
+			unsettled = unsettled[matched_count > 0]
+
+		return points
+
+	def _apply_gravity(self, grids):
+		"""
+		Move blocks down to fill the gaps below them, keeping the order of
+		the blocks in each column, as unsupported blocks fall in the game.
+		"""
+		filled = grids != EMPTY
+		# Boards with no gaps have nothing to fall.
+		has_gaps = (filled[:, :-1] < filled[:, 1:]).any(axis = (1, 2))
+		if not has_gaps.any():
+			return
+
+		# Each block falls to the row given by the number of blocks below it.
+		gapped = np.flatnonzero(has_gaps)
+		filled = filled[gapped]
+		new_rows = np.cumsum(filled, axis = 1) - 1
+		board_numbers, rows, columns = np.nonzero(filled)
+		settled = np.zeros((len(gapped), self.rows, self.columns),
+						   dtype = np.uint8)
+		settled[board_numbers, new_rows[board_numbers, rows, columns],
+				columns] = grids[gapped][board_numbers, rows, columns]
+		grids[gapped] = settled
+
+	def _find_matches(self, grids):
+		"""
+		Find three or more blocks of the same colour in a line, then every
+		block of that colour joined to them, as the game's
+		_check_blocks_for_match() and _find_adjacent_blocks() do.
+		"""
+		filled = grids != EMPTY
+		# Positions that are the same colour as the position to their
+		#	right, and the position above.
+		same_right = filled[:, :, :-1] & (grids[:, :, :-1] == grids[:, :, 1:])
+		same_up = filled[:, :-1, :] & (grids[:, :-1, :] == grids[:, 1:, :])
+
+		matched = np.zeros(grids.shape, dtype = bool)
+		line_across = same_right[:, :, :-1] & same_right[:, :, 1:]
+		matched[:, :, :-2] |= line_across
+		matched[:, :, 1:-1] |= line_across
+		matched[:, :, 2:] |= line_across
+		line_up = same_up[:, :-1, :] & same_up[:, 1:, :]
+		matched[:, :-2, :] |= line_up
+		matched[:, 1:-1, :] |= line_up
+		matched[:, 2:, :] |= line_up
+
+		# Spread the matches to joined blocks of the same colour until no
+		#	more are found. Only boards with matches need spreading.
+		boards = np.flatnonzero(matched.any(axis = (1, 2)))
+		if not len(boards):
+			return matched
+		spreading = matched[boards]
+		same_right = same_right[boards]
+		same_up = same_up[boards]
+		while True:
+			spread = spreading.copy()
+			spread[:, :, 1:] |= spreading[:, :, :-1] & same_right
+			spread[:, :, :-1] |= spreading[:, :, 1:] & same_right
+			spread[:, 1:, :] |= spreading[:, :-1, :] & same_up
+			spread[:, :-1, :] |= spreading[:, 1:, :] & same_up
+			if np.array_equal(spread, spreading):
+				break
+			spreading = spread
+		matched[boards] = spreading
+		return matched
+
+	def _add_new_rows(self, boards):
+		"""
+		Move every block on the boards up a row and add a new row below
+		that makes no matches, as ColourMatch._add_new_row() does.
+		"""
+		grids = self.grids[boards]
+		grids[:, 1:] = grids[:, :-1].copy()
+		grids[:, 0] = self._generate_rows(len(boards), grids[:, 1],
+										  grids[:, 2])
+		self.grids[boards] = grids
+
+	def _check_end_conditions(self, boards):
+		"""Check the "game over" and "game won" conditions of the boards."""
+		grids = self.grids[boards]
+		self.game_won[boards] = ~grids.any(axis = (1, 2))
+		self.game_over[boards] = grids[:, -1].any(axis = 1)
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import sys
+import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Games are played again off-screen so no window is needed.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from settings import Settings
+from colour_match import ColourMatch
+from score_submission import ScoreSubmission, split_submissions
+
+class ScoreVerifier:
+	"""
+	Class to play submitted games again without a window, as fast as
+	possible, and accept only the scores they reproduce exactly.
+	"""
+
+	def __init__(self):
+		"""Initialise one game that every submission is played again in."""
+		settings = Settings()
+		settings.autosave = False
+		settings.submission_filename = None
+		settings.particle_effects = False
+
+		screen = pygame.Surface((settings.screen_width,
+								 settings.screen_height))
+		self.cm_game = ColourMatch(settings, screen)
+		self.submission = ScoreSubmission(self.cm_game)
+
+	def verify(self, data):
+		"""
+		Play a submission again. Returns the score it claims and the score
+		playing it again reproduced, or None if it couldn't be played.
+		"""
+		cm_game = self.cm_game
+		settings = cm_game.settings
+		submission = self.submission
+		try:
+			submission.from_bytes(data)
+		except (ValueError, struct.error):
+			return None, None
+
+		# High scores are only comparable on the standard board.
+		if ((submission.blocks_per_row, submission.blocks_per_column,
+			 submission.block_size) != (settings.blocks_per_row,
+			 settings.blocks_per_column, settings.block_width)):
+			return submission.score, None
+
+		# Playing a game again takes time, so claims of longer games than
+		#	can be played aren't.
+		if submission.ticks > settings.max_submission_ticks:
+			return submission.score, None
+
+		cm_game._restart_game()
+		submission.start_playback()
+		submission.play_ticks(0, submission.ticks)
+		if cm_game.game_ticks < submission.ticks:
+			# Submission claims ticks played after the game ended.
+			return submission.score, None
+		return submission.score, cm_game.stats.score
+
+
+# Verifier of each worker process.
+verifier = None
+
+
+def start_worker():
+	"""Create the verifier a worker process plays submissions in."""
+	global verifier
+	verifier = ScoreVerifier()
+
+
+def verify_submission(data):
+	"""Verify a submission on a worker process's verifier."""
+	return verifier.verify(data)
+
+
+def verify_submissions(submissions, workers = 1):
+	"""
+	Verify submissions, spread over a pool of worker processes if there is
+	more than one worker. Returns a (claimed score, reproduced score) pair
+	for each submission, in order.
+	"""
+	if workers <= 1:
+		start_worker()
+		return [verify_submission(data) for data in submissions]
+
+	# Submissions are sent to the workers in chunks, so the time spent
+	#	passing them between processes is small next to playing them.
+	chunksize = max(1, len(submissions) // (workers * 8))
+	with ProcessPoolExecutor(max_workers = workers,
+							 initializer = start_worker) as pool:
+		return list(pool.map(verify_submission, submissions,
+							 chunksize = chunksize))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Verify submitted Colour Match scores by playing the "
+					  "games again.")
+	parser.add_argument("submissions", nargs = "?",
+						default = "score_submissions.bin",
+						help = "file of score submissions")
+	parser.add_argument("--workers", type = int, default = os.cpu_count(),
+						help = "processes to play the games on")
+	parser.add_argument("--high-scores", metavar = "FILE",
+						help = "write the verified high scores to a file")
+	args = parser.parse_args()
+
+	with open(args.submissions, 'rb') as file_object:
+		try:
+			submissions = split_submissions(file_object.read())
+		except ValueError as error:
+			sys.exit(f"Can't read {args.submissions}: {error}")
+
+	results = verify_submissions(submissions, args.workers)
+	verified_scores = []
+	for number, (claimed, reproduced) in enumerate(results):
+		if claimed is not None and claimed == reproduced:
+			verified_scores.append(claimed)
+		else:
+			print(f"Submission {number}: claimed {claimed}, "
+				  f"reproduced {reproduced}: rejected")
+	print(f"{len(verified_scores)} of {len(results)} scores verified")
+
+	if args.high_scores:
+		# Written in the same form as high_score.txt.
+		max_high_scores = Settings().max_high_scores
+		high_scores = sorted(verified_scores, reverse = True)[:max_high_scores]
+		with open(args.high_scores, 'w') as file_object:
+			file_object.write("".join(f"{score}\n" for score in high_scores))
\ No newline at end of file
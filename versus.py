@@ -0,0 +1,498 @@
+import os
+import sys
+import time
+import zlib
+import random
+import select
+import socket
+import struct
+import argparse
+import subprocess
+
+import pygame
+
+from settings import Settings
+from multi_board import MultiBoard
+
+# Kinds of message sent between the two players. Every message is a kind,
+#	a tick and a value.
+HELLO = 1		# Sent by the host. Tick is the input delay, value the seed.
+DIFFICULTY = 4	# Sent by the host. Value is the difficulty's index.
+INPUT = 2		# Keys a player pressed before the tick, as KEY_BITS.
+CHECKSUM = 3	# CRC of both games' state before the tick.
+
+message_format = struct.Struct('<BIQ')
+
+difficulties = ["easy", "medium", "hard"]
+
+# Key events each bit of a player's input stands for.
+KEY_BITS = [(pygame.KEYDOWN, pygame.K_LEFT), (pygame.KEYDOWN, pygame.K_RIGHT),
+			(pygame.KEYDOWN, pygame.K_DOWN), (pygame.KEYUP, pygame.K_DOWN)]
+
+# State SaveFile doesn't hold that a game needs to carry on exactly as it
+#	would have: game active, game over and game won flags and game ticks,
+#	followed by each grid position changed since the pile was checked.
+game_state_format = struct.Struct('<???I')
+position_format = struct.Struct('<HH')
+# Garbage rows each player has sent.
+rows_sent_format = struct.Struct('<II')
+
+
+class LockstepConnection:
+	"""
+	Class to send and receive the messages of a lockstep versus game over a
+	TCP socket. Messages can be held back for a number of ticks before they
+	are sent, to test how the game copes with a slow connection.
+	"""
+
+	def __init__(self, sock, lag_ticks = 0):
+		"""Initialise the connection over a connected socket."""
+		self.sock = sock
+		self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		self.lag_ticks = lag_ticks
+
+		# Messages held back as (tick to send at, message) pairs.
+		self.held_messages = []
+		# Bytes received that don't yet make up a whole message.
+		self.received = b''
+		self.closed = False
+
+	def send(self, kind, tick, value, now = 0):
+		"""Send a message, or hold it back until lag_ticks after now."""
+		message = message_format.pack(kind, tick, value)
+		if self.lag_ticks:
+			self.held_messages.append((now + self.lag_ticks, message))
+		else:
+			self._send_bytes(message)
+
+	def send_held(self, now):
+		"""Send the held back messages whose time has come."""
+		ready = [message for send_at, message in self.held_messages
+				 if send_at <= now]
+		if ready:
+			self.held_messages = self.held_messages[len(ready):]
+			self._send_bytes(b''.join(ready))
+
+	def receive(self, wait = 0.0):
+		"""
+		Return the messages that have arrived as (kind, tick, value)
+		tuples, waiting up to wait seconds for the first one.
+		"""
+		readable, writable, errors = select.select([self.sock], [], [], wait)
+		if readable:
+			try:
+				data = self.sock.recv(65536)
+			except OSError:
+				data = b''
+			if not data:
+				self.closed = True
+			self.received += data
+
+		whole = len(self.received) - len(self.received) % message_format.size
+		messages = list(message_format.iter_unpack(self.received[:whole]))
+		self.received = self.received[whole:]
+		return messages
+
+	def close(self):
+		"""Close the socket."""
+		self.sock.close()
+
+	def _send_bytes(self, data):
+		"""Send bytes, noting if the other player has gone."""
+		try:
+			self.sock.sendall(data)
+		except OSError:
+			self.closed = True
+
+
+class LockstepVersus(MultiBoard):
+	"""
+	Class to play a versus game against another player over a socket, with
+	both players' games run on both computers in deterministic lockstep.
+
+	Only the keys each player presses are sent, stamped with the tick they
+	are for. A player's keys are used input_delay ticks after they are
+	pressed, so they usually reach the other computer in time. When they
+	don't, the game carries on assuming the other player pressed nothing,
+	and if they did press keys the game is rolled back to a snapshot from
+	before those keys and the ticks since are played again.
+
+	Clearing blocks sends garbage rows to the other player, added to the
+	bottom of their pile by _add_new_row(). Every so often each computer
+	sends a checksum of both games so that any difference between them is
+	found at once.
+	"""
+
+	def __init__(self, connection, local_player, seed, input_delay = None,
+				 difficulty = "easy", block_size = 25, bot = False):
+		"""
+		Create the window and both players' games. The host is player 0
+		and the player who joins is player 1.
+		"""
+		super().__init__(2, difficulty, block_size)
+		self.connection = connection
+		self.local_player = local_player
+		self.remote_player = 1 - local_player
+		self.bot = bot
+		self.bot_rng = random.Random(seed + local_player)
+
+		settings = self.settings
+		self.tick_rate = settings.versus_tick_rate
+		self.fps_target = settings.versus_fps_target
+		self.input_delay = (settings.versus_input_delay
+							if input_delay is None else input_delay)
+		self.max_rollback = settings.versus_max_rollback
+
+		# Both games start from the same seeded state on both computers.
+		#	Setting them up plays their first frame.
+		for player, (cm_game, offset) in enumerate(self.boards):
+			cm_game.rng.seed(seed * 2 + player)
+			# Particles don't change the games, and would be shown twice
+			#	for ticks that are played again.
+			cm_game.particles = None
+			cm_game._update_game()
+			self._settle_game(cm_game)
+
+		# Keys each player pressed before each tick. No keys are pressed in
+		#	the ticks before the first keys can arrive.
+		self.inputs = [{tick: 0 for tick in range(self.input_delay)}
+					   for player in range(2)]
+		self.local_keys = 0
+		# Last tick the other player's keys have arrived for.
+		self.remote_confirmed = self.input_delay - 1
+
+		self.tick = 0
+		self.rows_sent = [0, 0]
+		# Snapshots of the state before each tick that may be rolled back.
+		self.snapshots = {}
+
+		# Checksums of each computer's state before every checksum_interval
+		#	ticks, kept until the other computer's checksum is compared.
+		self.checksum_interval = settings.versus_checksum_interval
+		self.next_checksum_tick = 0
+		self.local_checksums = {}
+		self.remote_checksums = {}
+		self.checksums_matched = 0
+
+		# Statistics of the rollbacks played.
+		self.rollbacks = 0
+		self.ticks_replayed = 0
+		self.longest_rollback = 0
+		self.max_rollback_time = 0.0
+
+	def run_game(self, max_ticks = None):
+		"""
+		Start the main loop, drawing frames at versus_fps_target frames per
+		second with the ticks due in each frame played before it is drawn.
+		Returns after max_ticks ticks if given, or when the other player
+		leaves.
+		"""
+		clock = pygame.time.Clock()
+		ticks_per_frame = max(1, self.tick_rate // self.fps_target)
+		while max_ticks is None or self.tick < max_ticks:
+			self._start_frame()
+			self._check_events()
+			self._receive_messages()
+			if self.connection.closed:
+				break
+			for tick in range(ticks_per_frame):
+				# Wait for the other player if their keys are too far behind
+				#	to roll back to.
+				if self.tick > self.remote_confirmed + self.max_rollback:
+					break
+				self._play_tick()
+			self.connection.send_held(self.tick)
+			if not self.bot:
+				self._update_screen()
+			self._run_deferred()
+			clock.tick(self.fps_target)
+
+	def _check_events(self):
+		"""Collect the local player's keys for the next tick played."""
+		# Keys pressed while waiting for the other player are kept for the
+		#	next tick played.
+		for event in pygame.event.get():
+			if event.type == pygame.QUIT:
+				self._quit_game()
+			elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+				if event.key == pygame.K_q or event.key == pygame.K_ESCAPE:
+					self._quit_game()
+				key = self.player_keys[0].get(event.key)
+				if (event.type, key) in KEY_BITS:
+					self.local_keys |= 1 << KEY_BITS.index((event.type, key))
+
+		if self.bot:
+			# Stand-in player that moves its block at random.
+			if self.bot_rng.random() < 0.2:
+				self.local_keys |= self.bot_rng.choice([1, 2])
+
+	def _quit_game(self):
+		"""Leave the game, letting the other player know."""
+		self.connection.close()
+		sys.exit()
+
+	def _receive_messages(self):
+		"""Handle the messages from the other computer."""
+		rollback_tick = None
+		for kind, tick, value in self.connection.receive():
+			if kind == INPUT:
+				self.inputs[self.remote_player][tick] = value
+				self.remote_confirmed = tick
+				# Ticks already played assumed no keys were pressed.
+				if tick < self.tick and value:
+					if rollback_tick is None:
+						rollback_tick = tick
+			elif kind == CHECKSUM:
+				self.remote_checksums[tick] = value
+				self._compare_checksums(tick)
+
+		if rollback_tick is not None:
+			self._roll_back(rollback_tick)
+		self._confirm_snapshots()
+
+	def _play_tick(self):
+		"""Send the local keys and play the next tick of both games."""
+		self.inputs[self.local_player][self.tick + self.input_delay] = (
+															self.local_keys)
+		self.connection.send(INPUT, self.tick + self.input_delay,
+							 self.local_keys, self.tick)
+		self.local_keys = 0
+
+		self._keep_snapshot(self.tick)
+		self._simulate_tick(self.tick)
+		self.tick += 1
+
+	def _simulate_tick(self, tick):
+		"""Play a tick of both games with the keys known for it."""
+		for player, (cm_game, offset) in enumerate(self.boards):
+			keys = self.inputs[player].get(tick, 0)
+			if keys and cm_game.settings.game_active:
+				for bit, (event_type, key) in enumerate(KEY_BITS):
+					if keys & (1 << bit):
+						event = pygame.event.Event(event_type, key = key)
+						cm_game._handle_event(event)
+			cm_game._update_game()
+
+		# Every garbage_blocks_per_row blocks a player clears sends a row to
+		#	the other player.
+		for player, (cm_game, offset) in enumerate(self.boards):
+			rows = (cm_game.stats.score // self.settings.garbage_blocks_per_row
+					- self.rows_sent[player])
+			self.rows_sent[player] += rows
+			opponent = self.boards[1 - player][0]
+			if opponent.settings.game_active:
+				for row in range(rows):
+					opponent._add_new_row()
+
+		# The first player whose pile reaches the top loses.
+		games = [cm_game for cm_game, offset in self.boards]
+		for player, cm_game in enumerate(games):
+			opponent = games[1 - player]
+			if cm_game.settings.game_over and opponent.settings.game_active:
+				opponent.settings.game_active = False
+				opponent.settings.game_won = True
+
+		# Pile blocks only need settling if grid positions have changed.
+		#	Otherwise the last time the pile was checked settled them.
+		for cm_game in games:
+			if cm_game.changed_positions:
+				self._settle_game(cm_game)
+
+	def _settle_game(self, cm_game):
+		"""
+		Bring the positions of the pile blocks up to date after a tick, as
+		restoring a snapshot does, so games played on from a snapshot and
+		games that carried on are the same.
+		"""
+		cm_game._update_pile_index()
+
+	def _roll_back(self, tick):
+		"""Restore the snapshot from before a tick and play the ticks since."""
+		start = time.perf_counter()
+		self._restore_snapshot(self.snapshots[tick])
+		for replayed_tick in range(tick, self.tick):
+			self._keep_snapshot(replayed_tick)
+			self._simulate_tick(replayed_tick)
+
+		self.rollbacks += 1
+		self.ticks_replayed += self.tick - tick
+		self.longest_rollback = max(self.longest_rollback, self.tick - tick)
+		self.max_rollback_time = max(self.max_rollback_time,
+									 time.perf_counter() - start)
+
+	def _keep_snapshot(self, tick):
+		"""
+		Take a snapshot before a tick if it may be rolled back to or its
+		checksum is to be sent. Ticks the other player's keys have arrived
+		for won't be rolled back to.
+		"""
+		if (tick > self.remote_confirmed
+			or tick % self.checksum_interval == 0):
+			self.snapshots[tick] = self._take_snapshot()
+
+	def _take_snapshot(self):
+		"""Return the state of both games and the garbage rows sent."""
+		parts = []
+		for cm_game, offset in self.boards:
+			settings = cm_game.settings
+			changed_positions = sorted(cm_game.changed_positions)
+			parts.append((cm_game.save_file.to_bytes(),
+				game_state_format.pack(settings.game_active,
+					settings.game_over, settings.game_won,
+					cm_game.game_ticks)
+				+ b''.join(position_format.pack(*position)
+						   for position in changed_positions)))
+		parts.append(rows_sent_format.pack(*self.rows_sent))
+		return parts
+
+	def _restore_snapshot(self, snapshot):
+		"""Put both games back into the state of a snapshot."""
+		for (cm_game, offset), (saved_game, game_state) in zip(self.boards,
+															   snapshot):
+			settings = cm_game.settings
+			cm_game.save_file.restore(saved_game)
+			(settings.game_active, settings.game_over, settings.game_won,
+				cm_game.game_ticks) = (
+				game_state_format.unpack_from(game_state, 0))
+			cm_game.changed_positions = set(position_format.iter_unpack(
+				game_state[game_state_format.size:]))
+			self._settle_game(cm_game)
+		self.rows_sent = list(rows_sent_format.unpack(snapshot[-1]))
+
+	def _confirm_snapshots(self):
+		"""
+		Send checksums of snapshots that can no longer be rolled back, and
+		forget the snapshots and keys that are no longer needed.
+		"""
+		confirmed_tick = min(self.remote_confirmed + 1, self.tick - 1)
+		while self.next_checksum_tick <= confirmed_tick:
+			tick = self.next_checksum_tick
+			checksum = 0
+			for part in self.snapshots[tick]:
+				for data in ((part,) if isinstance(part, bytes) else part):
+					checksum = zlib.crc32(data, checksum)
+			self.local_checksums[tick] = checksum
+			self.connection.send(CHECKSUM, tick, checksum, self.tick)
+			self._compare_checksums(tick)
+			self.next_checksum_tick += self.checksum_interval
+
+		for tick in [tick for tick in self.snapshots
+					 if tick < confirmed_tick
+					 and tick < self.next_checksum_tick]:
+			del self.snapshots[tick]
+		for inputs in self.inputs:
+			for tick in [tick for tick in inputs if tick < confirmed_tick]:
+				del inputs[tick]
+
+	def _compare_checksums(self, tick):
+		"""Check both computers' games were the same before a tick."""
+		if tick in self.local_checksums and tick in self.remote_checksums:
+			if self.local_checksums.pop(tick) != self.remote_checksums.pop(
+																	tick):
+				raise RuntimeError(
+					f"The games have gone out of step at tick {tick}.")
+			self.checksums_matched += 1
+
+
+def listen_for_player(port):
+	"""Return a socket listening for the other player on a port."""
+	server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+	server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+	server_socket.bind(('', port))
+	server_socket.listen(1)
+	return server_socket
+
+
+def host_game(server_socket, seed, input_delay, difficulty,
+			  lag_ticks = 0):
+	"""
+	Wait for the other player to join and send them the seed, input delay
+	and difficulty. Returns the connection.
+	"""
+	sock, address = server_socket.accept()
+	server_socket.close()
+	sock.sendall(message_format.pack(HELLO, input_delay, seed)
+				 + message_format.pack(DIFFICULTY, 0,
+									   difficulties.index(difficulty)))
+	return LockstepConnection(sock, lag_ticks)
+
+
+def join_game(host, port, lag_ticks = 0):
+	"""
+	Join a game hosted on another computer. Returns the connection and the
+	seed, input delay and difficulty sent by the host.
+	"""
+	sock = socket.create_connection((host, port))
+	size = 2 * message_format.size
+	data = b''
+	while len(data) < size:
+		received = sock.recv(size - len(data))
+		if not received:
+			raise ConnectionError("The host closed the connection.")
+		data += received
+	(kind, input_delay, seed), (difficulty_kind, tick, difficulty) = (
+		message_format.iter_unpack(data))
+	if kind != HELLO or difficulty_kind != DIFFICULTY:
+		raise ValueError("Not a Colour Match versus game.")
+	return (LockstepConnection(sock, lag_ticks), seed, input_delay,
+			difficulties[difficulty])
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(
+		description = "Play Colour Match against another player over a "
+					  "network.")
+	group = parser.add_mutually_exclusive_group(required = True)
+	group.add_argument("--host", type = int, metavar = "PORT",
+					   help = "host a game on a port")
+	group.add_argument("--join", metavar = "HOST:PORT",
+					   help = "join a game hosted on another computer")
+	group.add_argument("--against-bot", action = "store_true",
+					   help = "play against a stand-in player on this "
+							  "computer")
+	parser.add_argument("--bot", action = "store_true",
+						help = "play as a stand-in player without a window")
+	parser.add_argument("--port", type = int, default = 5050,
+						help = "port used with --against-bot")
+	parser.add_argument("--difficulty", default = "easy",
+						choices = difficulties,
+						help = "difficulty of the game, if hosting")
+	parser.add_argument("--block-size", type = int, default = 25,
+						help = "size of each block in pixels")
+	parser.add_argument("--input-delay", type = int,
+						help = "ticks each player's keys are delayed by")
+	parser.add_argument("--lag-ticks", type = int, default = 0,
+						help = "ticks to hold back the keys sent, to test "
+							   "rollbacks")
+	parser.add_argument("--seed", type = int,
+						help = "seed for both players' games")
+	args = parser.parse_args()
+
+	if args.bot:
+		os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+	if args.join:
+		host, port = args.join.rsplit(':', 1)
+		connection, seed, input_delay, difficulty = join_game(
+										host, int(port), args.lag_ticks)
+		local_player = 1
+	else:
+		seed = args.seed
+		if seed is None:
+			seed = random.getrandbits(63)
+		input_delay = args.input_delay
+		if input_delay is None:
+			input_delay = Settings().versus_input_delay
+		port = args.port if args.against_bot else args.host
+		server_socket = listen_for_player(port)
+		if args.against_bot:
+			subprocess.Popen([sys.executable, __file__, "--join",
+							  f"localhost:{port}", "--bot"])
+		difficulty = args.difficulty
+		connection = host_game(server_socket, seed, input_delay, difficulty,
+							   args.lag_ticks)
+		local_player = 0
+
+	versus = LockstepVersus(connection, local_player, seed, input_delay,
+							difficulty, args.block_size, args.bot)
+	versus.run_game()
+	connection.close()
\ No newline at end of file